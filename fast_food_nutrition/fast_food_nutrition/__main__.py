@@ -0,0 +1,5 @@
+import sys
+
+from fast_food_nutrition.cli import main
+
+sys.exit(main())
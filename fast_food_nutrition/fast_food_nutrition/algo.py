@@ -1,8 +1,95 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
 from fast_food_nutrition.model import Nutrition
-from fast_food_nutrition.model import FOOD_INTAKE_CONF, FoodIntakeType, FoodRankingType, Sex
+from fast_food_nutrition.model import (COMPOSITE_SCORE_WEIGHTS,
+                                       FOOD_INTAKE_CONF,
+                                       FOOD_INTAKE_FEATURES,
+                                       FOOD_INTAKE_SCORES,
+                                       NUTRIENTS,
+                                       CHAIN,
+                                       FoodIntakeScore,
+                                       FoodNutritionFeatures,
+                                       FoodIntakeType,
+                                       FoodRankingType,
+                                       Sex)
+
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
+
+
+FOOD_INTAKE_TYPE_ORDINALS = {food_intake_type: ordinal for ordinal, food_intake_type in enumerate(FoodIntakeType)}
+SEX_ORDINALS = {sex: ordinal for ordinal, sex in enumerate(Sex)}
+
+
+def compile_daily_food_intake(food_intake_conf: Dict[FoodIntakeType, Dict[Sex, Dict[FoodRankingType, float]]]) -> np.ndarray:
+    """
+    Compiles the daily food intake targets of every (`FoodIntakeType`, `Sex`) pair, `Sex.COMBINE` included, into a
+    read-only array indexed by `FOOD_INTAKE_TYPE_ORDINALS` and `SEX_ORDINALS`.
+    """
+    daily_food_intake = np.empty((len(FoodIntakeType), len(Sex)))
+
+    for food_intake_type, food_intake_type_ordinal in FOOD_INTAKE_TYPE_ORDINALS.items():
+        food_contents = food_intake_conf[food_intake_type]
+        male_min = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.MALE][FoodRankingType.MINIMUM]
+        male_max = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.MALE][FoodRankingType.MAXIMUM]
+        female_min = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.FEMALE][FoodRankingType.MINIMUM]
+        female_max = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.FEMALE][FoodRankingType.MAXIMUM]
+
+        for sex, sex_ordinal in SEX_ORDINALS.items():
+            if sex == Sex.COMBINE:
+                min_intake = (male_min + female_min) / 2
+                max_intake = (male_max + female_max) / 2
+            elif sex == Sex.MALE:
+                min_intake = male_min
+                max_intake = male_max
+            elif sex == Sex.FEMALE:
+                min_intake = female_min
+                max_intake = female_max
+
+            daily_food_intake[food_intake_type_ordinal, sex_ordinal] = (min_intake + max_intake) / 2
+
+    daily_food_intake.setflags(write=False)
+
+    return daily_food_intake
+
+
+def compile_food_intake_limits(food_intake_conf: Dict[FoodIntakeType, Dict[Sex, Dict[FoodRankingType, float]]]) -> np.ndarray:
+    """
+    Compiles the recommended minimum and maximum daily intake of every (`FoodIntakeType`, `Sex`) pair into a read-only
+    array of shape (food intake types, sexes, 2).  `Sex.COMBINE` is the average of the male and female limits.
+    """
+    food_intake_limits = np.empty((len(FoodIntakeType), len(Sex), 2))
+
+    for food_intake_type, food_intake_type_ordinal in FOOD_INTAKE_TYPE_ORDINALS.items():
+        for ranking_ordinal, food_ranking_type in enumerate([FoodRankingType.MINIMUM, FoodRankingType.MAXIMUM]):
+            male = food_intake_conf[food_intake_type][Sex.MALE][food_ranking_type]
+            female = food_intake_conf[food_intake_type][Sex.FEMALE][food_ranking_type]
+
+            food_intake_limits[food_intake_type_ordinal, SEX_ORDINALS[Sex.MALE], ranking_ordinal] = male
+            food_intake_limits[food_intake_type_ordinal, SEX_ORDINALS[Sex.FEMALE], ranking_ordinal] = female
+            food_intake_limits[food_intake_type_ordinal, SEX_ORDINALS[Sex.COMBINE], ranking_ordinal] = (male + female) / 2
+
+    food_intake_limits.setflags(write=False)
+
+    return food_intake_limits
 
 
 class NutritionCalculator:
+    food_intake_conf = FOOD_INTAKE_CONF
+    daily_food_intake = compile_daily_food_intake(FOOD_INTAKE_CONF)
+    food_intake_limits = compile_food_intake_limits(FOOD_INTAKE_CONF)
+
+    @staticmethod
+    def load_food_intake_conf(food_intake_conf: Dict[FoodIntakeType, Dict[Sex, Dict[FoodRankingType, float]]]) -> None:
+        """
+        Swaps the intake configuration (e.g. a custom dietary profile) and recompiles the daily targets once.
+        """
+        NutritionCalculator.daily_food_intake = compile_daily_food_intake(food_intake_conf)
+        NutritionCalculator.food_intake_limits = compile_food_intake_limits(food_intake_conf)
+        NutritionCalculator.food_intake_conf = food_intake_conf
 
     @staticmethod
     def get_caloric_intake_score(nutrition: Nutrition,
@@ -32,38 +119,48 @@ class NutritionCalculator:
     @staticmethod
     def get_composite_nutrition_score(nutrition: Nutrition,
                                       sex=Sex.COMBINE) -> float:
-        return NutritionCalculator._calculate(nutrition, FoodIntakeType.CALORIES, sex) * .35 + \
-               NutritionCalculator._calculate(nutrition, FoodIntakeType.FAT, sex) * .30 + \
-               NutritionCalculator._calculate(nutrition, FoodIntakeType.CARBOHYDRATES, sex) * .20 + \
-               NutritionCalculator._calculate(nutrition, FoodIntakeType.FIBER, sex) * .10 + \
-               NutritionCalculator._calculate(nutrition, FoodIntakeType.PROTEIN, sex) * .05
+        return sum(NutritionCalculator._calculate(nutrition, food_intake_type, sex) * weight
+                   for food_intake_type, weight in COMPOSITE_SCORE_WEIGHTS.items())
+
+    @staticmethod
+    def score_frame(menu: DataFrame,
+                    sex=Sex.COMBINE,
+                    min_meals: int = 1,
+                    max_meals: int = 3) -> DataFrame:
+        """
+        Vectorized equivalent of the `get_*_intake_score` and `get_composite_nutrition_score` methods over a whole
+        menu as loaded by the ETL.  Returns a copy of the menu with one column per `FoodIntakeScore`.
+        """
+        scores = {}
+        composite_score = np.zeros(len(menu))
+        daily_food_intake_for_sex = NutritionCalculator.daily_food_intake[:, SEX_ORDINALS[sex]]
+
+        for food_intake_type, weight in COMPOSITE_SCORE_WEIGHTS.items():
+            nutrition_for_intake_type = menu[FOOD_INTAKE_FEATURES[food_intake_type]].to_numpy(dtype=np.float64)
+            daily_food_intake = daily_food_intake_for_sex[FOOD_INTAKE_TYPE_ORDINALS[food_intake_type]]
+            score = (min_meals * (nutrition_for_intake_type / daily_food_intake)) / max_meals
+
+            scores[FOOD_INTAKE_SCORES[food_intake_type]] = score
+            composite_score += score * weight
+
+        scores[FoodIntakeScore.COMPOSITE.value] = composite_score
+
+        return menu.assign(**scores)
 
     @staticmethod
     def _calculate(nutrition: Nutrition,
                    food_intake_type: FoodIntakeType,
                    sex: Sex) -> float:
-        food_contents = FOOD_INTAKE_CONF[food_intake_type]
-        male_min = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.MALE][FoodRankingType.MINIMUM]
-        male_max = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.MALE][FoodRankingType.MAXIMUM]
-        female_min = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.FEMALE][FoodRankingType.MINIMUM]
-        female_max = food_contents[Sex.MALE][FoodRankingType.MINIMUM] + food_contents[Sex.FEMALE][FoodRankingType.MAXIMUM]
-
-        if sex == Sex.COMBINE:
-            min_intake = (male_min + female_min) / 2
-            max_intake = (male_max + female_max) / 2
-        elif sex == Sex.MALE:
-            min_intake = male_min
-            max_intake = male_max
-        elif sex == Sex.FEMALE:
-            min_intake = female_min
-            max_intake = female_max
-
-        daily_food_intake = (min_intake + max_intake) / 2
+        daily_food_intake = NutritionCalculator.get_daily_food_intake(food_intake_type, sex)
 
         nutrition_for_intake_type = NutritionCalculator.get_nutrition_for_intake_type(nutrition, food_intake_type)
 
         return (nutrition.min_meals * (nutrition_for_intake_type / daily_food_intake)) / nutrition.max_meals
 
+    @staticmethod
+    def get_daily_food_intake(food_intake_type: FoodIntakeType, sex: Sex) -> float:
+        return NutritionCalculator.daily_food_intake[FOOD_INTAKE_TYPE_ORDINALS[food_intake_type], SEX_ORDINALS[sex]]
+
     @staticmethod
     def get_nutrition_for_intake_type(nutrition: Nutrition, food_intake_type) -> float:
         if food_intake_type == FoodIntakeType.CALORIES:
@@ -76,3 +173,379 @@ class NutritionCalculator:
             return nutrition.carb
         elif food_intake_type == FoodIntakeType.PROTEIN:
             return nutrition.protein
+
+
+ITEMS = "items"
+ROWS = "rows"
+DEVIATION = "deviation"
+PAIR_BLOCK_SIZE = 256
+
+
+class MealPlanner:
+    """
+    Searches for the combinations of 1 to `max_items` menu items closest to the `NutritionCalculator` daily intake
+    targets, weighted like the composite score, without exceeding the recommended maximum calories or fat.
+    """
+    def __init__(self,
+                 sex: Sex = Sex.COMBINE,
+                 max_items: int = 3,
+                 daily_share: float = 1.0):
+        if max_items not in (1, 2, 3):
+            raise ValueError("A meal combination must have between 1 and 3 items")
+
+        self.sex = sex
+        self.max_items = max_items
+        self.daily_share = daily_share
+
+    def plan(self, menu: DataFrame, k: int = 10) -> DataFrame:
+        MealPlanner.validate_k(k)
+
+        daily_food_intake = NutritionCalculator.daily_food_intake[:, SEX_ORDINALS[self.sex]] * self.daily_share
+        food_intake_limits = NutritionCalculator.food_intake_limits[:, SEX_ORDINALS[self.sex]] * self.daily_share
+        food_intake_types = list(COMPOSITE_SCORE_WEIGHTS.keys())
+        targets = np.array([daily_food_intake[FOOD_INTAKE_TYPE_ORDINALS[food_intake_type]]
+                            for food_intake_type in food_intake_types])
+        weights = np.array(list(COMPOSITE_SCORE_WEIGHTS.values()))
+        ceilings = np.full(len(food_intake_types), np.inf)
+
+        for food_intake_type in [FoodIntakeType.CALORIES, FoodIntakeType.FAT]:
+            ceilings[food_intake_types.index(food_intake_type)] = \
+                food_intake_limits[FOOD_INTAKE_TYPE_ORDINALS[food_intake_type], 1] / targets[food_intake_types.index(food_intake_type)]
+
+        nutrients = menu[[FOOD_INTAKE_FEATURES[food_intake_type] for food_intake_type in food_intake_types]].to_numpy(dtype=np.float64)
+        candidates = np.flatnonzero(~np.isnan(nutrients).any(axis=1) & (nutrients / targets <= ceilings).all(axis=1))
+        calories = food_intake_types.index(FoodIntakeType.CALORIES)
+        candidates = candidates[np.argsort(nutrients[candidates, calories], kind="stable")]
+        fractions = nutrients[candidates] / targets
+
+        combinations, deviations = self.search(fractions, weights, ceilings, k, calories)
+
+        return self.describe(menu, candidates, fractions, combinations, deviations, targets, food_intake_types)
+
+    def plan_by_chain(self, menu: DataFrame, k: int = 10, by: str = CHAIN) -> DataFrame:
+        MealPlanner.validate_k(k)
+
+        plans = [self.plan(chain_menu, k).assign(**{by: chain})
+                 for chain, chain_menu in menu.groupby(by, sort=False, observed=True)]
+
+        return pd.concat(plans, ignore_index=True)
+
+    def search(self,
+               fractions: np.ndarray,
+               weights: np.ndarray,
+               ceilings: np.ndarray,
+               k: int,
+               order_by: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the k best combinations as rows of item positions (-1 padded) and their deviations.  `fractions`
+        must be sorted ascending by the `order_by` nutrient.
+        """
+        MealPlanner.validate_k(k)
+
+        n = len(fractions)
+        combinations = [np.column_stack((np.arange(n), np.full((n, 2), -1)))]
+        deviations = [self.deviation(fractions, weights)]
+
+        if self.max_items >= 2 and n >= 2:
+            pairs, pair_fractions = self.feasible_pairs(fractions, ceilings)
+            pair_deviations = self.deviation(pair_fractions, weights)
+            bound = self.kth_smallest(np.concatenate([deviations[0], pair_deviations]), k)
+            best_pairs = pair_deviations <= bound
+            combinations.append(np.column_stack((pairs[best_pairs], np.full(best_pairs.sum(), -1))))
+            deviations.append(pair_deviations[best_pairs])
+
+            if self.max_items >= 3 and n >= 3 and len(pairs):
+                triples, triple_deviations = self.best_triples(fractions, weights, ceilings, pairs, pair_fractions, k, bound,
+                                                               order_by)
+                combinations.append(triples)
+                deviations.append(triple_deviations)
+
+        combinations = np.concatenate(combinations)
+        deviations = np.concatenate(deviations)
+        order = np.lexsort((combinations[:, 2], combinations[:, 1], combinations[:, 0], deviations))[:k]
+
+        return combinations[order], deviations[order]
+
+    @staticmethod
+    def validate_k(k: int) -> None:
+        if k < 1:
+            raise ValueError(f"Unsupported number of combinations: {k}")
+
+    @staticmethod
+    def kth_smallest(values: np.ndarray, k: int) -> float:
+        return np.partition(values, min(k, len(values)) - 1)[min(k, len(values)) - 1]
+
+    @staticmethod
+    def deviation(fractions: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        return np.abs(fractions - 1) @ weights
+
+    @staticmethod
+    def feasible_pairs(fractions: np.ndarray, ceilings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(fractions)
+        pairs = []
+
+        for start in range(0, n, PAIR_BLOCK_SIZE):
+            stop = min(start + PAIR_BLOCK_SIZE, n)
+            totals = fractions[start:stop, None, :] + fractions[None, :, :]
+            feasible = (totals <= ceilings).all(axis=2)
+            feasible &= np.arange(start, stop)[:, None] < np.arange(n)[None, :]
+            first, second = np.nonzero(feasible)
+            pairs.append(np.column_stack((first + start, second)))
+
+        pairs = np.concatenate(pairs)
+
+        return pairs, fractions[pairs[:, 0]] + fractions[pairs[:, 1]]
+
+    def best_triples(self,
+                     fractions: np.ndarray,
+                     weights: np.ndarray,
+                     ceilings: np.ndarray,
+                     pairs: np.ndarray,
+                     pair_fractions: np.ndarray,
+                     k: int,
+                     bound: float,
+                     order_by: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Completes the pairs with a third item.  The deviation of a triple is the weighted L1 distance between the pair
+        and the third item's remaining gap to the target, so a KD-tree over the pairs answers, for every item, which
+        pairs complete it best.  A top-k triple is among the k nearest valid pairs of its third item, and only the
+        ordering where the third item has the highest position is kept.
+        """
+        from scipy.spatial import cKDTree
+
+        # The third item has the highest position, so it has at least as much of `order_by` as the second item
+        extensible = pair_fractions[:, order_by] + fractions[pairs[:, 1], order_by] <= ceilings[order_by]
+        # Adding an item never lowers a nutrient, so a pair already over the target by `bound` cannot beat it
+        extensible &= np.maximum(pair_fractions - 1, 0) @ weights <= bound
+        pairs, pair_fractions = pairs[extensible], pair_fractions[extensible]
+
+        n_pairs = len(pairs)
+        triples = [np.empty((0, 3), dtype=np.intp)]
+
+        if n_pairs == 0:
+            return triples[0], np.empty(0)
+
+        tree = cKDTree(pair_fractions * weights, balanced_tree=False, compact_nodes=False)
+        n_neighbours = min(k, n_pairs)
+        n_searched = 0
+        # Widen the radius slightly so triples tied with the bound are not lost to rounding
+        distance_upper_bound = bound * (1 + 1e-9) + 1e-12
+        pending = np.arange(len(fractions))
+
+        while len(pending):
+            _, neighbours = tree.query((1 - fractions[pending]) * weights,
+                                       k=n_neighbours,
+                                       p=1,
+                                       distance_upper_bound=distance_upper_bound)
+            neighbours = neighbours.reshape(len(pending), -1)
+            found = neighbours < n_pairs
+            neighbour_pairs = pairs[np.where(found, neighbours, 0)]
+            third = pending[:, None]
+            invalid = found & ((neighbour_pairs[:, :, 0] == third) |
+                               (neighbour_pairs[:, :, 1] == third) |
+                               ~(pair_fractions[np.where(found, neighbours, 0)] + fractions[pending, None, :] <= ceilings).all(axis=2))
+            canonical = found & ~invalid & (neighbour_pairs[:, :, 1] < third)
+            # The nearest neighbours were already collected by the previous, narrower search
+            canonical[:, :n_searched] = False
+
+            rows, columns = np.nonzero(canonical)
+            triples.append(np.column_stack((neighbour_pairs[rows, columns], pending[rows])))
+
+            # Invalid pairs took the place of valid ones, so widen the search for those items
+            truncated = invalid.any(axis=1) & found[:, -1]
+            pending = pending[truncated] if n_neighbours < n_pairs else pending[:0]
+            n_searched = n_neighbours
+            n_neighbours = min(2 * n_neighbours, n_pairs)
+
+        triples = np.concatenate(triples)
+
+        return triples, self.deviation(fractions[triples].sum(axis=1), weights)
+
+    def describe(self,
+                 menu: DataFrame,
+                 candidates: np.ndarray,
+                 fractions: np.ndarray,
+                 combinations: np.ndarray,
+                 deviations: np.ndarray,
+                 targets: np.ndarray,
+                 food_intake_types: List[FoodIntakeType]) -> DataFrame:
+        composite_scores = NutritionCalculator.score_frame(menu, self.sex)[FoodIntakeScore.COMPOSITE.value].to_numpy()
+        menu_items = menu[FoodNutritionFeatures.MENU_ITEM.value].to_numpy()
+        present = combinations >= 0
+        positions = np.where(present, candidates[np.where(present, combinations, 0)], -1)
+        totals = (np.where(present[:, :, None], fractions[np.where(present, combinations, 0)], 0).sum(axis=1)) * targets
+
+        plan = {ITEMS: [tuple(menu_items[position] for position in row if position >= 0) for row in positions],
+                ROWS: [tuple(menu.index[position] for position in row if position >= 0) for row in positions],
+                DEVIATION: deviations}
+        plan.update({FOOD_INTAKE_FEATURES[food_intake_type]: totals[:, i] for i, food_intake_type in enumerate(food_intake_types)})
+        plan[FoodIntakeScore.COMPOSITE.value] = np.where(present, composite_scores[np.maximum(positions, 0)], 0).sum(axis=1)
+
+        return DataFrame(plan)
+
+
+POSITION = "position"
+SWAP_POSITION = "swap_position"
+SWAP_MENU_ITEM = "swap_menu_item"
+DISTANCE = "distance"
+SCORE_DELTA = "score_delta"
+
+
+class SwapIndex:
+    """
+    Finds "healthier swaps": the menu items nearest to an item by their z-scored `NUTRIENTS` whose composite nutrition
+    score is lower by more than `min_score_delta`, optionally within the same `by` group (e.g. the `CHAIN`).
+    """
+    def __init__(self, menu: DataFrame, sex: Sex = Sex.COMBINE, by: Optional[str] = None):
+        nutrients = menu[NUTRIENTS].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(nutrients).any(axis=1)
+        mean, std = nutrients[valid].mean(axis=0), nutrients[valid].std(axis=0)
+
+        self.menu = menu
+        self.by = by
+        self.vectors = (nutrients - mean) / np.where(std > 0, std, 1)
+        self.scores = NutritionCalculator.score_frame(menu, sex)[FoodIntakeScore.COMPOSITE.value].to_numpy()
+        self.valid = valid
+        self.groups = {None: self.build(np.flatnonzero(valid))}
+
+        if by is not None:
+            group_codes, group_names = pd.factorize(menu[by])
+            self.group_codes = group_codes
+            self.group_names = list(group_names)
+            self.groups.update({group: self.build(np.flatnonzero(valid & (group_codes == code)))
+                                for code, group in enumerate(self.group_names)})
+
+    def build(self, members: np.ndarray) -> Tuple["cKDTree", np.ndarray, np.ndarray]:
+        from scipy.spatial import cKDTree
+
+        members = members[np.argsort(self.scores[members], kind="stable")]
+
+        return cKDTree(self.vectors[members]), members, self.scores[members]
+
+    def query(self,
+              positions: np.ndarray,
+              k: int = 5,
+              min_score_delta: float = 0.0,
+              chain: Optional[str] = None,
+              same_chain: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns, for every row position in `positions`, the positions of its k nearest swaps (-1 padded) and their
+        distances (inf padded), nearest first.  Swaps are taken from the `chain` group or, with `same_chain`, from the
+        item's own group; both need the index to be built with `by`.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        swaps = np.full((len(positions), k), -1, dtype=np.intp)
+        distances = np.full((len(positions), k), np.inf)
+
+        if (chain is not None or same_chain) and self.by is None:
+            raise ValueError("Swaps can only be restricted to a chain when the index is built with `by`")
+
+        if same_chain:
+            groups = [(group, self.group_codes[positions] == code) for code, group in enumerate(self.group_names)]
+        elif chain is not None:
+            if chain not in self.groups:
+                raise ValueError(f"Unsupported chain: {chain}")
+
+            groups = [(chain, np.ones(len(positions), dtype=bool))]
+        else:
+            groups = [(None, np.ones(len(positions), dtype=bool))]
+
+        for group, selected in groups:
+            selected &= self.valid[positions]
+
+            if selected.any():
+                swaps[selected], distances[selected] = self.nearest(self.groups[group], positions[selected], k,
+                                                                    min_score_delta)
+
+        return swaps, distances
+
+    def nearest(self,
+                group: Tuple["cKDTree", np.ndarray, np.ndarray],
+                positions: np.ndarray,
+                k: int,
+                min_score_delta: float) -> Tuple[np.ndarray, np.ndarray]:
+        tree, members, member_scores = group
+        swaps = np.full((len(positions), k), -1, dtype=np.intp)
+        distances = np.full((len(positions), k), np.inf)
+        # Members are sorted by score, so the cheaper candidates of an item are a prefix of them
+        n_candidates = np.searchsorted(member_scores, self.scores[positions] - min_score_delta, side="left")
+        pending = np.flatnonzero(n_candidates > 0)
+        n_neighbours = min(2 * k, len(members))
+
+        while len(pending):
+            direct = n_candidates[pending] <= n_neighbours
+            done = np.zeros(len(pending), dtype=bool)
+
+            # Few candidates: compare against all of them
+            rows = pending[direct]
+            candidates = np.broadcast_to(members[:n_neighbours], (len(rows), n_neighbours))
+            candidate_distances = np.linalg.norm(self.vectors[candidates] - self.vectors[positions[rows], None], axis=2)
+            found = np.arange(n_neighbours) < n_candidates[rows, None]
+            order = np.argsort(np.where(found, candidate_distances, np.inf), axis=1, kind="stable")
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            candidate_distances = np.take_along_axis(candidate_distances, order, axis=1)
+            found = np.take_along_axis(found, order, axis=1)
+            self.collect(swaps, distances, positions, rows, candidates, candidate_distances, found, min_score_delta)
+            done[direct] = True
+
+            # Many candidates: the nearest neighbours, widened until k of them are cheaper
+            rows = pending[~direct]
+
+            if len(rows):
+                candidate_distances, neighbours = tree.query(self.vectors[positions[rows]], k=n_neighbours)
+                neighbours = neighbours.reshape(len(rows), -1)
+                candidate_distances = candidate_distances.reshape(len(rows), -1)
+                candidates = members[neighbours]
+                n_found = self.collect(swaps, distances, positions, rows, candidates, candidate_distances,
+                                       np.ones(candidates.shape, dtype=bool), min_score_delta)
+                done[~direct] = n_found >= np.minimum(k, n_candidates[rows])
+
+            pending = pending[~done]
+            n_neighbours = min(2 * n_neighbours, len(members))
+
+        return swaps, distances
+
+    def collect(self,
+                swaps: np.ndarray,
+                distances: np.ndarray,
+                positions: np.ndarray,
+                rows: np.ndarray,
+                candidates: np.ndarray,
+                candidate_distances: np.ndarray,
+                found: np.ndarray,
+                min_score_delta: float) -> np.ndarray:
+        """
+        Keeps the first k candidates (in distance order) of every row that are cheaper than its item, and returns how
+        many were kept per row.
+        """
+        k = swaps.shape[1]
+        items = positions[rows, None]
+        found = found & (candidates != items) & (self.scores[items] - self.scores[candidates] > min_score_delta)
+        order = np.argsort(~found, axis=1, kind="stable")[:, :k]
+        found = np.take_along_axis(found, order, axis=1)
+        width = found.shape[1]
+
+        swaps[rows, :width] = np.where(found, np.take_along_axis(candidates, order, axis=1), -1)
+        distances[rows, :width] = np.where(found, np.take_along_axis(candidate_distances, order, axis=1), np.inf)
+
+        return found.sum(axis=1)
+
+    def swap_table(self,
+                   k: int = 1,
+                   min_score_delta: float = 0.0,
+                   same_chain: bool = False) -> DataFrame:
+        """
+        The k best swaps of every menu item in one batched query, one row per item and swap.
+        """
+        positions = np.arange(len(self.menu))
+        swaps, distances = self.query(positions, k, min_score_delta, same_chain=same_chain)
+        items, ranks = np.nonzero(swaps >= 0)
+        swap_positions = swaps[items, ranks]
+        menu_items = self.menu[FoodNutritionFeatures.MENU_ITEM.value].to_numpy()
+
+        return DataFrame({POSITION: items,
+                          FoodNutritionFeatures.MENU_ITEM.value: menu_items[items],
+                          SWAP_POSITION: swap_positions,
+                          SWAP_MENU_ITEM: menu_items[swap_positions],
+                          DISTANCE: distances[items, ranks],
+                          SCORE_DELTA: self.scores[items] - self.scores[swap_positions]})
@@ -1,34 +1,390 @@
+from collections import OrderedDict
 import math
+from threading import Lock
 
 import numpy as np
 import pandas as pd
 from pandas import DataFrame, Series
-from scipy.stats import chi2, norm, t as t_test
-import scipy.stats as stats
-from typing import List, Tuple, Union
-
-from fast_food_nutrition.model import HypothesisTestConclusion, HypothesisTestMethod, Test
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from fast_food_nutrition.model import (CI_LOWER,
+                                       CI_UPPER,
+                                       CONCLUSION,
+                                       HYPOTHESIS_TEST_RESULT,
+                                       NUTRIENTS,
+                                       P_VALUE,
+                                       STATISTIC,
+                                       CorrelationMatrix,
+                                       Distribution,
+                                       HypothesisTestConclusion,
+                                       HypothesisTestMethod,
+                                       MultipleComparisonCorrection,
+                                       OutlierMethod,
+                                       Test)
+from fast_food_nutrition.sketch import QuantileSketch
+
+ArrayLike = Union[np.ndarray, List[float], float]
+
+
+IQR_FENCE_FACTOR = 1.5
+# Scales the median absolute deviation to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+OUTLIER_THRESHOLDS = {OutlierMethod.IQR: IQR_FENCE_FACTOR,
+                      OutlierMethod.MAD: 3.5,
+                      OutlierMethod.Z_SCORE: 3.0}
+LOWER_FENCE = "lower"
+UPPER_FENCE = "upper"
 
 
 class Outliers:
+    """
+    Tukey fences: values outside [Q1 - 1.5 IQR, Q3 + 1.5 IQR] of any of the columns are outliers.  The quartiles are
+    either exact, from one `np.nanpercentile` call over all the columns, or approximate, from one `QuantileSketch` per
+    column built in a single pass over a chunk stream.
+    """
+    @staticmethod
+    def filter_outliers(menu: DataFrame, columns: List[str]) -> DataFrame:
+        lower_bounds, upper_bounds = Outliers.calculate_fences(menu, columns)
+
+        return Outliers.apply_fences(menu, columns, lower_bounds, upper_bounds)
+
     @staticmethod
-    def filter_outliers(menu: DataFrame, columns: List[str]):
-        def remove_outliers(column: Series) -> DataFrame:
-            Q1 = column.quantile(0.25)
-            Q3 = column.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+    def calculate_fences(menu: DataFrame, columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        Q1, Q3 = np.nanpercentile(menu[columns].to_numpy(dtype=np.float64), [25, 75], axis=0)
+
+        return Outliers.to_fences(Q1, Q3)
 
-            return (column >= lower_bound) & (column <= upper_bound)
+    @staticmethod
+    def calculate_sketch_fences(chunks: Iterable[DataFrame],
+                                columns: List[str],
+                                k: int = 200,
+                                seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fences from quartiles approximated to about 1.7 / k in rank, without holding more than one chunk in memory.
+        """
+        sketches = Outliers.build_sketches(chunks, columns, k, seed)
 
-        mask = pd.Series([True] * len(menu))
+        return Outliers.calculate_fences_from_sketches([sketches[column] for column in columns])
+
+    @staticmethod
+    def build_sketches(chunks: Iterable[DataFrame],
+                       columns: List[str],
+                       k: int = 200,
+                       seed: Optional[int] = None) -> Dict[str, QuantileSketch]:
+        """
+        One `QuantileSketch` per column; sketches built over partitions of the data can be merged before computing the
+        fences with `calculate_fences_from_sketches`.
+        """
+        sketches = {column: QuantileSketch(k, seed) for column in columns}
+
+        for chunk in chunks:
+            for column in columns:
+                sketches[column].update(chunk[column].to_numpy(dtype=np.float64))
+
+        return sketches
+
+    @staticmethod
+    def calculate_fences_from_sketches(sketches: List[QuantileSketch]) -> Tuple[np.ndarray, np.ndarray]:
+        quartiles = np.array([sketch.quantile(np.array([0.25, 0.75])) for sketch in sketches])
+
+        return Outliers.to_fences(quartiles[:, 0], quartiles[:, 1])
+
+    @staticmethod
+    def to_fences(Q1: np.ndarray, Q3: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        IQR = Q3 - Q1
+
+        return Q1 - IQR_FENCE_FACTOR * IQR, Q3 + IQR_FENCE_FACTOR * IQR
+
+    @staticmethod
+    def calculate_grouped_fences(menu: DataFrame,
+                                 columns: List[str],
+                                 by: Union[str, List[str]],
+                                 method: OutlierMethod = OutlierMethod.IQR,
+                                 threshold: Optional[float] = None) -> Tuple[Series, DataFrame]:
+        """
+        Fences of every group of `by` (a chain, a category, a store...) so that an item is only compared with its own
+        group.  `OutlierMethod.IQR` uses the Tukey fences, `OutlierMethod.MAD` the median +/- `threshold` scaled median
+        absolute deviations and `OutlierMethod.Z_SCORE` the mean +/- `threshold` standard deviations; `threshold`
+        defaults to `OUTLIER_THRESHOLDS`.
+
+        The group statistics come from cythonized groupby aggregations and are broadcast back to the rows by group
+        number, so there is no Python loop over the groups.  Returns the mask of the rows within the fences of every
+        column, aligned with the menu, and the fences per group with (column, `LOWER_FENCE` / `UPPER_FENCE`) columns.
+        """
+        threshold = OUTLIER_THRESHOLDS[method] if threshold is None else threshold
+        grouped = menu.groupby(by, sort=False, observed=True, dropna=False)
+        group_numbers = grouped.ngroup().to_numpy()
+
+        if method == OutlierMethod.IQR:
+            Q1 = grouped[columns].quantile(0.25)
+            Q3 = grouped[columns].quantile(0.75)
+            lower_bounds = Q1 - threshold * (Q3 - Q1)
+            upper_bounds = Q3 + threshold * (Q3 - Q1)
+        elif method == OutlierMethod.MAD:
+            medians = grouped[columns].median()
+            deviations = (menu[columns] - medians.to_numpy()[group_numbers]).abs()
+            MAD = deviations.groupby(group_numbers).median().set_axis(medians.index)
+            lower_bounds = medians - threshold * MAD_SCALE * MAD
+            upper_bounds = medians + threshold * MAD_SCALE * MAD
+        elif method == OutlierMethod.Z_SCORE:
+            means = grouped[columns].mean()
+            stds = grouped[columns].std()
+            lower_bounds = means - threshold * stds
+            upper_bounds = means + threshold * stds
+        else:
+            raise ValueError(f"Unsupported outlier method: {method}")
 
-        for col in columns:
-            mask &= remove_outliers(menu[col])
+        # A group too small or too sparse for the statistic (e.g. the std of one row) has no fence
+        lower_bounds = lower_bounds.fillna(-np.inf)
+        upper_bounds = upper_bounds.fillna(np.inf)
+        values = menu[columns].to_numpy(dtype=np.float64)
+        mask = ((values >= lower_bounds.to_numpy()[group_numbers]) &
+                (values <= upper_bounds.to_numpy()[group_numbers])).all(axis=1)
+        fences = pd.concat({LOWER_FENCE: lower_bounds, UPPER_FENCE: upper_bounds}, axis=1).swaplevel(axis=1)
+
+        return Series(mask, index=menu.index), fences[[(column, fence) for column in columns
+                                                       for fence in [LOWER_FENCE, UPPER_FENCE]]]
+
+    @staticmethod
+    def filter_grouped_outliers(menu: DataFrame,
+                                columns: List[str],
+                                by: Union[str, List[str]],
+                                method: OutlierMethod = OutlierMethod.IQR,
+                                threshold: Optional[float] = None) -> DataFrame:
+        mask, _ = Outliers.calculate_grouped_fences(menu, columns, by, method, threshold)
 
         return menu[mask]
 
+    @staticmethod
+    def apply_fences(menu: DataFrame, columns: List[str], lower_bounds: np.ndarray, upper_bounds: np.ndarray) -> DataFrame:
+        """
+        Keeps the rows within the fences of every column.  The mask is positional, so the menu index can be anything.
+        """
+        values = menu[columns].to_numpy(dtype=np.float64)
+        mask = ((values >= lower_bounds) & (values <= upper_bounds)).all(axis=1)
+
+        return menu[mask]
+
+
+class HypothesisTestBatch:
+    """
+    Shared evaluation of a batch of test statistics.  The cases are grouped by `Test` so that the p-values and the
+    critical values of every tail type come from one vectorized call each.
+    """
+    @staticmethod
+    def as_arrays(*values: ArrayLike) -> List[np.ndarray]:
+        return [np.asarray(value, dtype=np.float64) for value in np.broadcast_arrays(*[np.atleast_1d(value)
+                                                                                       for value in values])]
+
+    @staticmethod
+    def as_tests(tests: Union[Test, List[Test], np.ndarray], size: int) -> np.ndarray:
+        return np.broadcast_to(np.asarray(tests, dtype=object), (size,))
+
+    @staticmethod
+    def evaluate(statistics: np.ndarray,
+                 tests: np.ndarray,
+                 alpha: np.ndarray,
+                 distribution,
+                 *args: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the p-values, the critical values (the positive quantile also used for the confidence intervals) and
+        whether H0 is rejected by the critical value method.  `args` are the per-case distribution parameters (e.g.
+        the degrees of freedom of the t distribution).
+        """
+        p_values = np.full(len(statistics), np.nan)
+        critical_values = np.full(len(statistics), np.nan)
+        rejects = np.zeros(len(statistics), dtype=bool)
+
+        for test in Test:
+            mask = tests == test
+
+            if not mask.any():
+                continue
+
+            statistic = statistics[mask]
+            test_args = [arg[mask] for arg in args]
+
+            if test == Test.TWO_TAILED:
+                p_values[mask] = 2 * distribution.sf(np.abs(statistic), *test_args)
+                critical_values[mask] = distribution.ppf(1 - alpha[mask] / 2, *test_args)
+                rejects[mask] = np.abs(statistic) >= critical_values[mask]
+            elif test == Test.LEFT_TAILED:
+                p_values[mask] = distribution.cdf(statistic, *test_args)
+                critical_values[mask] = distribution.ppf(1 - alpha[mask], *test_args)
+                rejects[mask] = statistic <= -critical_values[mask]
+            elif test == Test.RIGHT_TAILED:
+                p_values[mask] = distribution.sf(statistic, *test_args)
+                critical_values[mask] = distribution.ppf(1 - alpha[mask], *test_args)
+                rejects[mask] = statistic >= critical_values[mask]
+
+        return p_values, critical_values, rejects
+
+    @staticmethod
+    def to_results(statistics: np.ndarray,
+                   p_values: np.ndarray,
+                   ci_lower: np.ndarray,
+                   ci_upper: np.ndarray,
+                   rejects: np.ndarray) -> np.ndarray:
+        results = np.empty(len(statistics), dtype=HYPOTHESIS_TEST_RESULT)
+        results[STATISTIC] = statistics
+        results[P_VALUE] = p_values
+        results[CI_LOWER] = ci_lower
+        results[CI_UPPER] = ci_upper
+        results[CONCLUSION] = np.where(rejects, HypothesisTestConclusion.REJECT_H_0, HypothesisTestConclusion.FAIL_TO_REJECT_H0)
+
+        return results
+
+
+class MultipleComparison:
+    """
+    Corrects the p-values of a batch of hypothesis tests for the number of tests run.  Bonferroni and Holm control the
+    family-wise error rate, Benjamini-Hochberg the false discovery rate.  Missing p-values are ignored and left missing.
+    """
+    @staticmethod
+    def adjust_p_values(p_values: ArrayLike, correction: MultipleComparisonCorrection) -> np.ndarray:
+        p_values = np.asarray(p_values, dtype=np.float64)
+        adjusted_p_values = np.full(p_values.shape, np.nan)
+        present = ~np.isnan(p_values)
+        m = present.sum()
+
+        if correction == MultipleComparisonCorrection.BONFERRONI:
+            adjusted_p_values[present] = p_values[present] * m
+        elif correction in (MultipleComparisonCorrection.HOLM, MultipleComparisonCorrection.BENJAMINI_HOCHBERG):
+            order = np.argsort(p_values[present], kind="stable")
+            sorted_p_values = p_values[present][order]
+            rank = np.arange(1, m + 1)
+
+            if correction == MultipleComparisonCorrection.HOLM:
+                # Step-down: p_(i) * (m - i + 1), kept monotone from the smallest p-value up
+                sorted_adjusted_p_values = np.maximum.accumulate(sorted_p_values * (m - rank + 1))
+            else:
+                # Step-up: p_(i) * m / i, kept monotone from the largest p-value down
+                sorted_adjusted_p_values = np.minimum.accumulate((sorted_p_values * m / rank)[::-1])[::-1]
+
+            present_adjusted_p_values = np.empty(m)
+            present_adjusted_p_values[order] = sorted_adjusted_p_values
+            adjusted_p_values[present] = present_adjusted_p_values
+        else:
+            raise ValueError(f"Unsupported multiple comparison correction: {correction}")
+
+        return np.minimum(adjusted_p_values, 1)
+
+    @staticmethod
+    def calculate_p_value_test_method(p_values: ArrayLike,
+                                      alpha: float,
+                                      correction: MultipleComparisonCorrection) -> np.ndarray:
+        """
+        Array version of `ZTest.calculate_p_value_test_method` on the corrected p-values.
+        """
+        rejects = MultipleComparison.adjust_p_values(p_values, correction) <= alpha
+
+        return np.where(rejects, HypothesisTestConclusion.REJECT_H_0, HypothesisTestConclusion.FAIL_TO_REJECT_H0)
+
+    @staticmethod
+    def correct(results: np.ndarray, alpha: float, correction: MultipleComparisonCorrection) -> np.ndarray:
+        """
+        Returns a copy of the `HYPOTHESIS_TEST_RESULT` records of a batch with the p-values corrected and the
+        conclusions drawn from them.
+        """
+        corrected_results = results.copy()
+        corrected_results[P_VALUE] = MultipleComparison.adjust_p_values(results[P_VALUE], correction)
+        corrected_results[CONCLUSION] = np.where(corrected_results[P_VALUE] <= alpha,
+                                                 HypothesisTestConclusion.REJECT_H_0,
+                                                 HypothesisTestConclusion.FAIL_TO_REJECT_H0)
+
+        return corrected_results
+
+
+class QuantileCache:
+    """
+    Bounded LRU cache of the critical values `ppf(1 - alpha / 2)` (two-tailed) or `ppf(1 - alpha)` (one-tailed) keyed
+    on (`Distribution`, alpha, df, `Test`).  The lower critical values are their negation, so every test shares one
+    entry per key.  `prebuild` additionally tabulates the t quantiles of every integer df up to `max_df` for the given
+    alphas; Welch's fractional df are then interpolated linearly in 1 / df, which is accurate to ~1e-6 from
+    `min_interpolation_df` on.  Smaller fractional df are always computed exactly.
+    """
+    def __init__(self, maxsize: int = 4096, min_interpolation_df: float = 30):
+        self.maxsize = maxsize
+        self.min_interpolation_df = min_interpolation_df
+        self.cache: OrderedDict = OrderedDict()
+        # (1 / df, critical value) knots per (alpha, test), in increasing 1 / df
+        self.tables: Dict[Tuple[float, Test], Tuple[np.ndarray, np.ndarray]] = {}
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.interpolations = 0
+
+    def get_critical_value(self, distribution: Distribution, alpha: float, test: Test, df: Optional[float] = None) -> float:
+        if distribution == Distribution.STUDENT_T and df is None:
+            raise ValueError(f"Unsupported df for {distribution}: {df}")
+
+        if distribution == Distribution.STUDENT_T and (alpha, test) in self.tables:
+            inverse_dfs, critical_values = self.tables[(alpha, test)]
+
+            if self.min_interpolation_df <= df <= len(inverse_dfs):
+                with self.lock:
+                    self.interpolations += 1
+
+                # Integer df fall exactly on the table knots
+                return float(np.interp(1 / df, inverse_dfs, critical_values))
+
+        key = (distribution, alpha, df if distribution == Distribution.STUDENT_T else None, test)
+
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+
+                return self.cache[key]
+
+            self.misses += 1
+
+        critical_value = float(QuantileCache.calculate_critical_value(*key))
+
+        with self.lock:
+            self.cache[key] = critical_value
+
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+        return critical_value
+
+    def prebuild(self, alphas: List[float], max_df: int, tests: List[Test] = tuple(Test)) -> None:
+        dfs = np.arange(max_df, 0, -1)
+        inverse_dfs = 1 / dfs
+
+        for alpha in alphas:
+            for test in tests:
+                self.tables[(alpha, test)] = (inverse_dfs,
+                                              QuantileCache.calculate_critical_value(Distribution.STUDENT_T, alpha, dfs, test))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+            self.tables.clear()
+            self.hits = 0
+            self.misses = 0
+            self.interpolations = 0
+
+    @staticmethod
+    def calculate_critical_value(distribution: Distribution,
+                                 alpha: float,
+                                 df: Optional[Union[float, np.ndarray]],
+                                 test: Test) -> Union[float, np.ndarray]:
+        from scipy.stats import norm, t as t_test
+
+        probability = 1 - (alpha / 2) if test == Test.TWO_TAILED else 1 - alpha
+
+        if distribution == Distribution.NORMAL:
+            return norm.ppf(probability)
+        elif distribution == Distribution.STUDENT_T:
+            return t_test.ppf(probability, df)
+        else:
+            raise ValueError(f"Unsupported distribution: {distribution}")
+
+
+QUANTILES = QuantileCache()
+
 
 class ZTest:
     """
@@ -36,6 +392,8 @@ class ZTest:
     """
     @staticmethod
     def calculate(p0: int, phat: float, n: int, level_of_significance=0.05):
+        from scipy.stats import norm
+
         # Calculate the z-score
         z = (phat - p0) / ((p0 * (1 - p0) / n) ** level_of_significance)
 
@@ -56,27 +414,44 @@ class ZTest:
 
         return round(z, 2), round(p_value, 3)
 
+    @staticmethod
+    def calculate_proportion_batch(p0: ArrayLike,
+                                   x: ArrayLike,
+                                   n: ArrayLike,
+                                   tests: Union[Test, List[Test], np.ndarray],
+                                   alpha: ArrayLike = 0.05) -> np.ndarray:
+        """
+        Array version of `calculate_proportion`, `calculate_proporation_confidence_interval` and
+        `calculate_hypothesis_critical_value_test_method`.  Returns a `HYPOTHESIS_TEST_RESULT` record per test case;
+        the values are not rounded.
+        """
+        from scipy.stats import norm
+
+        p0, x, n, alpha = HypothesisTestBatch.as_arrays(p0, x, n, alpha)
+        tests = HypothesisTestBatch.as_tests(tests, len(x))
+        p_hat = x / n
+        z = (p_hat - p0) / np.sqrt((p0 * (1 - p0)) / n)
+
+        p_values, critical_values, rejects = HypothesisTestBatch.evaluate(z, tests, alpha, norm)
+        E = critical_values * np.sqrt((p_hat * (1 - p_hat)) / n)
+
+        return HypothesisTestBatch.to_results(z, p_values, p_hat - E, p_hat + E, rejects)
+
     @staticmethod
     def calculate_hypothesis_critical_value_test_method(z: float, alpha: float, test: Test) -> HypothesisTestConclusion:
-        if test == Test.TWO_TAILED:
-            z_alpha_2 = 1 - (alpha / 2)
-            critical_value_upper = norm.ppf(z_alpha_2)
-            critical_value_lower = norm.ppf(1 - z_alpha_2)
+        critical_value = QUANTILES.get_critical_value(Distribution.NORMAL, alpha, test)
 
-            if z <= critical_value_lower or z >= critical_value_upper:
+        if test == Test.TWO_TAILED:
+            if z <= -critical_value or z >= critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
                 return HypothesisTestConclusion.FAIL_TO_REJECT_H0
         elif test == Test.LEFT_TAILED:
-            critical_value = norm.ppf(alpha)
-
-            if z <= critical_value:
+            if z <= -critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
                 return HypothesisTestConclusion.FAIL_TO_REJECT_H0
         elif test == Test.RIGHT_TAILED:
-            critical_value = norm.ppf(1 - alpha)
-
             if z >= critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
@@ -123,6 +498,28 @@ class ZTest:
 
         return round(z, 2), round(p_value, 3)
 
+    @staticmethod
+    def calculate_mean_batch(x_bar: ArrayLike,
+                             mu: ArrayLike,
+                             sigma: ArrayLike,
+                             n: ArrayLike,
+                             tests: Union[Test, List[Test], np.ndarray],
+                             alpha: ArrayLike = 0.05) -> np.ndarray:
+        """
+        Array version of `calculate_mean` and `calculate_mean_confidence_interval`.
+        """
+        from scipy.stats import norm
+
+        x_bar, mu, sigma, n, alpha = HypothesisTestBatch.as_arrays(x_bar, mu, sigma, n, alpha)
+        tests = HypothesisTestBatch.as_tests(tests, len(x_bar))
+        standard_error = sigma / np.sqrt(n)
+        z = (x_bar - mu) / standard_error
+
+        p_values, critical_values, rejects = HypothesisTestBatch.evaluate(z, tests, alpha, norm)
+        E = critical_values * standard_error
+
+        return HypothesisTestBatch.to_results(z, p_values, x_bar - E, x_bar + E, rejects)
+
     @staticmethod
     def calculate_mean_confidence_interval(x_bar: float,
                                            sigma: float,
@@ -141,15 +538,12 @@ class ZTest:
 
     @staticmethod
     def get_z_score_table_value(alpha: float, test: Test) -> float:
-        if test == Test.TWO_TAILED:
-            probalility = 1 - (alpha / 2)
-        else:
-            probalility = 1 - alpha
-
-        return norm.ppf(probalility)
+        return QUANTILES.get_critical_value(Distribution.NORMAL, alpha, test)
 
     @staticmethod
     def get_p_value_table_value(z: float, test: Test) -> float:
+        from scipy.stats import norm
+
         if test == Test.TWO_TAILED:  # Calculate the p-value for a two-tailed test
             p_value = 2 * (1 - norm.cdf(abs(z)))
         elif test == Test.LEFT_TAILED:  # Calculate the p-value for a left-tailed test
@@ -163,6 +557,8 @@ class ZTest:
 class TTest:
     @staticmethod
     def calculate(x_bar: float, mu_0: float, n: int, s: float):
+        from scipy.stats import t as t_test
+
         # Calculate the t statistic
         t = (x_bar - mu_0) / (s / (n ** 0.5))
 
@@ -194,6 +590,38 @@ class TTest:
 
         return round(t, 2), round(p_value, 3)
 
+    @staticmethod
+    def calculate_two_means_batch(x_bar_1: ArrayLike,
+                                  x_bar_2: ArrayLike,
+                                  mu_1: ArrayLike,
+                                  mu_2: ArrayLike,
+                                  sigma_1: ArrayLike,
+                                  sigma_2: ArrayLike,
+                                  n_1: ArrayLike,
+                                  n_2: ArrayLike,
+                                  tests: Union[Test, List[Test], np.ndarray],
+                                  alpha: ArrayLike = 0.05) -> np.ndarray:
+        """
+        Array version of `calculate_two_means`, `calculate_two_means_confidence_interval` and
+        `calculate_hypothesis_critical_value_test_method`.
+        """
+        from scipy.stats import t as t_test
+
+        x_bar_1, x_bar_2, mu_1, mu_2, sigma_1, sigma_2, n_1, n_2, alpha = \
+            HypothesisTestBatch.as_arrays(x_bar_1, x_bar_2, mu_1, mu_2, sigma_1, sigma_2, n_1, n_2, alpha)
+        tests = HypothesisTestBatch.as_tests(tests, len(x_bar_1))
+        A = TTest.A(sigma_1, n_1)
+        B = TTest.B(sigma_2, n_2)
+        standard_error = np.sqrt(A + B)
+        t = ((x_bar_1 - x_bar_2) - (mu_1 - mu_2)) / standard_error
+        df = TTest.df(A, B, n_1, n_2)
+
+        p_values, critical_values, rejects = HypothesisTestBatch.evaluate(t, tests, alpha, t_test, df)
+        E = critical_values * standard_error
+        x_bar_dif = x_bar_1 - x_bar_2
+
+        return HypothesisTestBatch.to_results(t, p_values, x_bar_dif - E, x_bar_dif + E, rejects)
+
     @staticmethod
     def calculate_r(x: np.ndarray[Union[float, int]],
                     y: np.ndarray[Union[float, int]],
@@ -211,18 +639,20 @@ class TTest:
 
     @staticmethod
     def A(sigma_1: float, n_1: int) -> float:
-        return math.pow(sigma_1, 2) / n_1
+        return sigma_1 ** 2 / n_1
 
     @staticmethod
     def B(sigma_2: float, n_2: int) -> float:
-        return math.pow(sigma_2, 2) / n_2
+        return sigma_2 ** 2 / n_2
 
     @staticmethod
     def df(A: int, B: int, n_1: int, n_2: int) -> float:
-        return math.pow(A + B, 2) / ((math.pow(A, 2) / (n_1 - 1)) + (math.pow(A, 2) / (n_2 - 1)))
+        return (A + B) ** 2 / ((A ** 2 / (n_1 - 1)) + (B ** 2 / (n_2 - 1)))
 
     @staticmethod
     def get_p_value_table_value(t: float, df: float, test: Test) -> float:
+        from scipy.stats import t as t_test
+
         if test == Test.RIGHT_TAILED:
             p_value = t_test.sf(t, df)
         elif test == Test.LEFT_TAILED:
@@ -235,6 +665,17 @@ class TTest:
 
         return p_value
 
+    @staticmethod
+    def get_p_value_table_values(t: np.ndarray, df: Union[np.ndarray, float], test: Test) -> np.ndarray:
+        from scipy.stats import t as t_test
+
+        if test == Test.RIGHT_TAILED:
+            return t_test.sf(t, df)
+        elif test == Test.LEFT_TAILED:
+            return t_test.cdf(t, df)
+        elif test == Test.TWO_TAILED:
+            return 2 * t_test.sf(np.abs(t), df)
+
     @staticmethod
     def calculate_two_means_confidence_interval(x_bar_1: float,
                                                 x_bar_2: float,
@@ -258,35 +699,24 @@ class TTest:
 
     @staticmethod
     def get_t_score_table_value(alpha: float, df: int, test: Test) -> float:
-        if test == Test.TWO_TAILED:
-            probability = 1 - (alpha / 2)
-        else:
-            probability = 1 - alpha
-
-        return t_test.ppf(probability, df)
+        return QUANTILES.get_critical_value(Distribution.STUDENT_T, alpha, test, df)
 
     @staticmethod
     def calculate_hypothesis_critical_value_test_method(t: float, alpha: float, df: int, test: Test) -> HypothesisTestConclusion:
-        if test == Test.TWO_TAILED:
-            t_alpha_2 = 1 - (alpha / 2)
-            critial_value_upper = t_test.ppf(t_alpha_2, df)
-            crital_value_lower = t_test.ppf(1 - t_alpha_2, df)
+        critical_value = QUANTILES.get_critical_value(Distribution.STUDENT_T, alpha, test, df)
 
-            if t <= crital_value_lower or t >= critial_value_upper:
+        if test == Test.TWO_TAILED:
+            if t <= -critical_value or t >= critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
                 return HypothesisTestConclusion.FAIL_TO_REJECT_H0
 
         elif test == Test.LEFT_TAILED:
-            critical_value = t_test.ppf(alpha, df)
-
-            if t <= critical_value:
+            if t <= -critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
                 return HypothesisTestConclusion.FAIL_TO_REJECT_H0
         elif test == Test.RIGHT_TAILED:
-            critical_value = t_test.ppf(1 - alpha, df)
-
             if t >= critical_value:
                 return HypothesisTestConclusion.REJECT_H_0
             else:
@@ -303,6 +733,8 @@ class TTest:
 class ChiSquaredTest:
     @staticmethod
     def calculate(n: int, s: float, sigma_0):
+        from scipy.stats import chi2
+
         # Calculate the chi-squared statistic
         chi_squared_statistic = ((n - 1) * s ** 2) / (sigma_0 ** 2)
 
@@ -318,42 +750,82 @@ class ChiSquaredTest:
 class CoLinearity:
     @staticmethod
     def calculate_r(x: np.ndarray[Union[float, int]], y: np.ndarray[Union[float, int]]) -> float:
-        def sum_x(x: np.ndarray[Union[float, int]]) -> float:
-            return np.sum(x)
+        if len(x) != len(y):
+            raise ValueError("The number of samples for each list must be equal")
 
-        def sum_x_squared(x: np.ndarray[Union[float, int]]) -> float:
-            return (x ** 2).sum()
+        r = CoLinearity.calculate_r_matrix(np.column_stack((x, y)))[0, 1]
 
-        def sum_y(y: np.ndarray[Union[float, int]]) -> float:
-            return np.sum(y)
+        return round(r, 3)
 
-        def sum_y_squared(y: np.ndarray[Union[float, int]]) -> float:
-            return (y ** 2).sum()
+    @staticmethod
+    def calculate_r_matrix(values: np.ndarray) -> np.ndarray:
+        """
+        Pearson r of every pair of columns of an (n, k) array from a single centered cross-product.
+        """
+        centered = values - values.mean(axis=0)
+        cross_product = centered.T @ centered
+        norms = np.sqrt(np.diag(cross_product))
 
-        def sum_x_y(x: np.ndarray[Union[float, int]], y: np.ndarray[Union[float, int]]) -> float:
-            xy = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = cross_product / np.outer(norms, norms)
 
-            for x_1, y_1 in zip(x, y):
-                xy += x_1 * y_1
+        return np.clip(r, -1, 1)
 
-            return xy
+    @staticmethod
+    def calculate_correlation_matrix(menu: DataFrame,
+                                     columns: Optional[List[str]] = None,
+                                     alpha: float = 0.05,
+                                     test: Test = Test.TWO_TAILED) -> CorrelationMatrix:
+        """
+        Computes r, the t statistic, the p-value and the Fisher-z confidence interval of every pair of `columns`
+        (the nutrients by default) at once.  Rows missing any of the columns are dropped so that every pair is
+        computed over the same rows.
+        """
+        from scipy.stats import norm
+
+        columns = list(columns) if columns is not None else NUTRIENTS
+        values = menu[columns].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        n = len(values)
+        df = n - 2
 
-        n_1 = len(x)
-        n_2 = len(y)
+        r = CoLinearity.calculate_r_matrix(values)
 
-        if n_1 != n_2:
-            raise ValueError("The number of samples for each list must be equal")
-        else:
-            n = n_1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = r / np.sqrt((1 - r ** 2) / df)
+            p_value = TTest.get_p_value_table_values(t, df, test)
 
-        r = (n * sum_x_y(x, y) - sum_x(x) * sum_y(y)) / \
-            ((math.sqrt(n * sum_x_squared(x) - math.pow(sum_x(x), 2))) *
-             (math.sqrt(n * sum_y_squared(y) - math.pow(sum_y(y), 2))))
+            # Fisher's z and its standard error
+            r_z = np.arctanh(r)
+            moe = norm.ppf(1 - alpha / 2) / np.sqrt(n - 3)
 
-        return round(r, 3)
+        def label(matrix: np.ndarray) -> DataFrame:
+            return DataFrame(matrix, index=columns, columns=columns)
+
+        return CorrelationMatrix(columns=columns,
+                                 n=n,
+                                 r=label(r),
+                                 t=label(t),
+                                 p_value=label(p_value),
+                                 ci_lower=label(np.tanh(r_z - moe)),
+                                 ci_upper=label(np.tanh(r_z + moe)))
+
+    @staticmethod
+    def calculate_correlation_matrices(menu: DataFrame,
+                                       by: str,
+                                       columns: Optional[List[str]] = None,
+                                       alpha: float = 0.05,
+                                       test: Test = Test.TWO_TAILED) -> Dict[str, CorrelationMatrix]:
+        """
+        One `CorrelationMatrix` per group of `by` (e.g. the chain or a category column).
+        """
+        return {group: CoLinearity.calculate_correlation_matrix(group_menu, columns, alpha, test)
+                for group, group_menu in menu.groupby(by, sort=False, observed=True)}
 
     @staticmethod
     def pearson_r_confidence_interval(x: int, y: int, alpha=float) -> Tuple[float, float]:
+        import scipy.stats as stats
+
         # Calculate Pearson correlation coefficient
         r, _ = stats.pearsonr(x, y)
 
@@ -379,3 +851,108 @@ class CoLinearity:
         return round(r_ci_lower, 3), round(r_ci_upper, 3)
 
 
+class RunningStatistics:
+    """
+    Online count, mean, variance, minimum, maximum and threshold counts of `columns`, updated one chunk at a time so no
+    raw rows are kept.  Each chunk is summarized in a vectorized pass and folded in with Chan's parallel form of
+    Welford's update, and two accumulators (e.g. from different workers) merge the same way.  Missing values are
+    skipped.  `thresholds` maps a column to the values whose exceedances are counted for proportion tests.
+    """
+    def __init__(self, columns: Optional[List[str]] = None, thresholds: Optional[Dict[str, List[float]]] = None):
+        self.columns = list(columns) if columns is not None else NUTRIENTS
+        self.thresholds = {column: list(column_thresholds) for column, column_thresholds in (thresholds or {}).items()}
+        self.count = np.zeros(len(self.columns), dtype=np.int64)
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+        self.minimum = np.full(len(self.columns), np.inf)
+        self.maximum = np.full(len(self.columns), -np.inf)
+        self.threshold_counts = {column: np.zeros(len(column_thresholds), dtype=np.int64)
+                                 for column, column_thresholds in self.thresholds.items()}
+
+    def update(self, menu: DataFrame) -> "RunningStatistics":
+        values = menu[self.columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(present, values, 0).sum(axis=0) / count
+
+        m2 = np.where(present, values - mean, 0) ** 2
+
+        self.combine(count, np.nan_to_num(mean), m2.sum(axis=0))
+        self.minimum = np.fmin(self.minimum, np.fmin.reduce(values, axis=0, initial=np.inf))
+        self.maximum = np.fmax(self.maximum, np.fmax.reduce(values, axis=0, initial=-np.inf))
+
+        for column, column_thresholds in self.thresholds.items():
+            column_values = menu[column].to_numpy(dtype=np.float64)
+            self.threshold_counts[column] += (column_values[:, None] > np.array(column_thresholds)).sum(axis=0)
+
+        return self
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        if other.columns != self.columns or other.thresholds != self.thresholds:
+            raise ValueError("Only statistics of the same columns and thresholds can be merged")
+
+        self.combine(other.count, other.mean, other.m2)
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+
+        for column in self.threshold_counts:
+            self.threshold_counts[column] += other.threshold_counts[column]
+
+        return self
+
+    def combine(self, count: np.ndarray, mean: np.ndarray, m2: np.ndarray) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.where(total > 0, self.mean + delta * (count / total), 0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta ** 2 * (self.count * count / total), 0)
+
+        self.count = total
+
+    def get_count(self, column: str) -> int:
+        return int(self.count[self.columns.index(column)])
+
+    def get_mean(self, column: str) -> float:
+        return float(self.mean[self.columns.index(column)])
+
+    def get_variance(self, column: str, ddof: int = 1) -> float:
+        i = self.columns.index(column)
+
+        return float(self.m2[i] / (self.count[i] - ddof)) if self.count[i] > ddof else np.nan
+
+    def get_std(self, column: str, ddof: int = 1) -> float:
+        return math.sqrt(self.get_variance(column, ddof))
+
+    def get_min(self, column: str) -> float:
+        return float(self.minimum[self.columns.index(column)])
+
+    def get_max(self, column: str) -> float:
+        return float(self.maximum[self.columns.index(column)])
+
+    def get_threshold_count(self, column: str, threshold: float) -> Tuple[int, int]:
+        """
+        Returns (x, n): the number of values above `threshold` and the number of values, as taken by
+        `ZTest.calculate_proportion`.
+        """
+        return int(self.threshold_counts[column][self.thresholds[column].index(threshold)]), self.get_count(column)
+
+    @staticmethod
+    def from_chunks(chunks: Iterable[Tuple[str, DataFrame]],
+                    columns: Optional[List[str]] = None,
+                    thresholds: Optional[Dict[str, List[float]]] = None) -> Dict[str, "RunningStatistics"]:
+        """
+        Accumulates a (group, chunk) stream such as `FastFoodMenuETL.iter_menu_items_by_chain` into one
+        `RunningStatistics` per group.
+        """
+        statistics: Dict[str, RunningStatistics] = {}
+
+        for group, chunk in chunks:
+            if group not in statistics:
+                statistics[group] = RunningStatistics(columns, thresholds)
+
+            statistics[group].update(chunk)
+
+        return statistics
@@ -0,0 +1,376 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.analysis import CoLinearity
+from fast_food_nutrition.etl import FastFoodMenuETL, FastFoodMenuETLInterface
+from fast_food_nutrition.model import (MENU_CHAINS,
+                                       MENU_COLUMNS,
+                                       NUTRIENTS,
+                                       ExecutorType,
+                                       FigureType,
+                                       FoodIntakeScore,
+                                       FoodNutritionFeatures,
+                                       Nutrition,
+                                       ScatterMode,
+                                       Sex)
+from fast_food_nutrition.util import TEST_DIR, get_full_qualified_file_name
+
+WALL_TIME = "wall_time"
+PEAK_ALLOCATED_BYTES = "peak_allocated_bytes"
+PEAK_RSS_BYTES = "peak_rss_bytes"
+ROWS = "rows"
+HOT_PATH = "hot_path"
+SCALE = "scale"
+METADATA = "metadata"
+RESULTS = "results"
+BASELINE = "baseline"
+CURRENT = "current"
+METRIC = "metric"
+RATIO = "ratio"
+REGRESSION = "regression"
+SCALES = [1, 100, 10000]
+REGRESSION_THRESHOLD = 0.2
+JITTER = 0.1
+
+
+def replicate_test_data(data_dir: str, replication: int) -> None:
+    """
+    Writes every registered menu source into `data_dir` with its data rows repeated `replication` times.
+    """
+    for sources in MENU_CHAINS.values():
+        for source in sources:
+            with open(get_full_qualified_file_name(source.file_name, TEST_DIR), encoding=source.encoding) as menu_file:
+                header, *rows = menu_file.read().splitlines()
+
+            replicated_file_name = get_full_qualified_file_name(source.file_name, data_dir)
+            os.makedirs(os.path.dirname(replicated_file_name), exist_ok=True)
+
+            with open(replicated_file_name, "w", encoding=source.encoding) as replicated_file:
+                replicated_file.write(header + "\n")
+
+                for _ in range(replication):
+                    replicated_file.write("\n".join(rows) + "\n")
+
+
+def load_menu_items_post_hoc_astype(data_dir: str) -> DataFrame:
+    """
+    Reference implementation of the former ETL: every column of every source is parsed, the unused columns are
+    dropped afterwards and `astype` runs once per chain and once more on the combined menu.
+    """
+    converter = FastFoodMenuETL()
+    chain_menus = []
+
+    for sources in MENU_CHAINS.values():
+        source_menus = []
+
+        for source in sources:
+            menu = pd.read_csv(get_full_qualified_file_name(source.file_name, data_dir),
+                               encoding=source.encoding,
+                               index_col=False)
+
+            if source.menu_item_columns:
+                menu[FoodNutritionFeatures.MENU_ITEM.value] = menu[list(source.menu_item_columns)].agg(" ".join, axis=1)
+
+            menu = menu.rename(columns=source.columns)
+
+            if source.row_filters:
+                menu = menu[~(menu[NUTRIENTS].isin(source.na_values)).all(axis=1)]
+
+            source_menus.append(menu[MENU_COLUMNS])
+
+        chain_menus.append(converter.convert_data_types(pd.concat(source_menus, ignore_index=True)))
+
+    return converter.convert_data_types(pd.concat(chain_menus, ignore_index=True))
+
+
+def measure(load: Callable[[], DataFrame]) -> Dict[str, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    try:
+        menu = load()
+        wall_time = time.perf_counter() - start
+        _, peak_allocated_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {WALL_TIME: wall_time, PEAK_ALLOCATED_BYTES: peak_allocated_bytes, ROWS: len(menu)}
+
+
+def benchmark_dtype_pushdown(replication: int = 100) -> Dict[str, Dict[str, float]]:
+    """
+    Compares the typed single-pass ETL against parsing everything and converting with `astype` afterwards on the
+    bundled menus replicated `replication` times.
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        replicate_test_data(data_dir, replication)
+        menu_etl: FastFoodMenuETLInterface = FastFoodMenuETL(executor_type=ExecutorType.SERIAL, data_dir=data_dir)
+
+        return {"post_hoc_astype": measure(lambda: load_menu_items_post_hoc_astype(data_dir)),
+                "dtype_pushdown": measure(menu_etl.load_menu_items)}
+
+
+def score_menu_items(menu: DataFrame, sex: Sex) -> DataFrame:
+    """
+    Reference implementation of scoring a menu one `Nutrition` at a time through the scalar calculator.
+    """
+    scores = {score.value: [] for score in FoodIntakeScore}
+
+    for row in menu.itertuples(index=False):
+        nutrition = Nutrition(item=row.menu_item,
+                              calories=row.calories,
+                              fiber=row.fiber,
+                              fat=row.fat,
+                              carb=row.carbohydrates,
+                              protein=row.protein)
+
+        scores[FoodIntakeScore.CALORIES.value].append(NutritionCalculator.get_caloric_intake_score(nutrition, sex))
+        scores[FoodIntakeScore.FAT.value].append(NutritionCalculator.get_fat_intake_score(nutrition, sex))
+        scores[FoodIntakeScore.CARBOHYDRATES.value].append(NutritionCalculator.get_carbohyrate_intake_score(nutrition, sex))
+        scores[FoodIntakeScore.FIBER.value].append(NutritionCalculator.get_fiber_intake_score(nutrition, sex))
+        scores[FoodIntakeScore.PROTEIN.value].append(NutritionCalculator.get_protein_intake_score(nutrition, sex))
+        scores[FoodIntakeScore.COMPOSITE.value].append(NutritionCalculator.get_composite_nutrition_score(nutrition, sex))
+
+    return menu.assign(**scores)
+
+
+def benchmark_score_frame(replication: int = 10, sex: Sex = Sex.COMBINE) -> Dict[str, Dict[str, float]]:
+    """
+    Compares per-item scalar scoring against `NutritionCalculator.score_frame` on the combined menu replicated
+    `replication` times.
+    """
+    menu = FastFoodMenuETL().load_menu_items()
+    menu = pd.concat([menu] * replication, ignore_index=True)
+
+    return {"scalar_scoring": measure(lambda: score_menu_items(menu, sex)),
+            "score_frame": measure(lambda: NutritionCalculator.score_frame(menu, sex))}
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = []
+
+    for name, result in results.items():
+        lines.append(f"{name:<20} rows={result[ROWS]:>9,} "
+                     f"wall_time={result[WALL_TIME]:8.3f}s "
+                     f"peak_allocated={result[PEAK_ALLOCATED_BYTES] / (1 << 20):9.1f} MiB")
+
+    return "\n".join(lines)
+
+
+def synthesize_menu(scale: int, seed: int = 0) -> DataFrame:
+    """
+    The bundled menu repeated `scale` times.  Every copy but the first has its nutrients jittered by up to +/- 10%
+    from `seed`, so the large menus keep a realistic spread instead of exact duplicates, and the menu item names are
+    categorical so that even the 10,000x menu fits in memory.
+    """
+    menu = FastFoodMenuETL(executor_type=ExecutorType.SERIAL).load_menu_items()
+    rng = np.random.default_rng(seed)
+    nutrients = np.tile(menu[NUTRIENTS].to_numpy(dtype=np.float64), (scale, 1))
+    nutrients[len(menu):] *= rng.uniform(1 - JITTER, 1 + JITTER, size=(len(nutrients) - len(menu), len(NUTRIENTS)))
+    name_codes, names = pd.factorize(menu[FoodNutritionFeatures.MENU_ITEM.value])
+    synthetic_menu = {FoodNutritionFeatures.MENU_ITEM.value: pd.Categorical.from_codes(np.tile(name_codes, scale), names)}
+    synthetic_menu.update({nutrient: nutrients[:, i] for i, nutrient in enumerate(NUTRIENTS)})
+
+    return DataFrame(synthetic_menu, columns=MENU_COLUMNS)
+
+
+@contextmanager
+def load_menu_items_hot_path(scale: int, seed: int) -> Iterator[Tuple[Callable[[], Any], int]]:
+    with tempfile.TemporaryDirectory() as data_dir:
+        replicate_test_data(data_dir, scale)
+        menu_etl = FastFoodMenuETL(data_dir=data_dir)
+
+        yield menu_etl.load_menu_items, scale * len(FastFoodMenuETL(executor_type=ExecutorType.SERIAL).load_menu_items())
+
+
+@contextmanager
+def score_frame_hot_path(scale: int, seed: int) -> Iterator[Tuple[Callable[[], Any], int]]:
+    menu = synthesize_menu(scale, seed)
+
+    yield lambda: NutritionCalculator.score_frame(menu), len(menu)
+
+
+@contextmanager
+def calculate_r_hot_path(scale: int, seed: int) -> Iterator[Tuple[Callable[[], Any], int]]:
+    menu = synthesize_menu(scale, seed)
+    x = menu[FoodNutritionFeatures.CALORIES.value].to_numpy()
+    y = menu[FoodNutritionFeatures.FAT.value].to_numpy()
+
+    yield lambda: CoLinearity.calculate_r(x, y), len(menu)
+
+
+def scatter_plots_hot_path(mode: ScatterMode):
+    @contextmanager
+    def hot_path(scale: int, seed: int) -> Iterator[Tuple[Callable[[], Any], int]]:
+        # `generate_scatter_plots` draws the same figure, but onto an interactive pyplot window
+        from fast_food_nutrition.viz import FastFoodNutritionVisualizer
+
+        menu = synthesize_menu(scale, seed)
+
+        yield lambda: FastFoodNutritionVisualizer.render(FigureType.SCATTER_PLOTS, menu, mode=mode), len(menu)
+
+    return hot_path
+
+
+# Hot path name -> (setup of the measured function, largest scale run by default or None for every scale)
+HOT_PATHS = {"load_menu_items": (load_menu_items_hot_path, 1000),
+             "score_frame": (score_frame_hot_path, None),
+             "calculate_r": (calculate_r_hot_path, None),
+             "scatter_plots": (scatter_plots_hot_path(ScatterMode.MARKERS), 100),
+             "scatter_plots_histogram_2d": (scatter_plots_hot_path(ScatterMode.HISTOGRAM_2D), None)}
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def measure_hot_path(hot_path: str, scale: int, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    Runs a hot path `repeat` times for its median wall time, then once more under tracemalloc for its peak allocated
+    bytes, since tracing slows down allocation-heavy code.  The peak RSS is that of the whole process, including the
+    interpreter and the setup of the hot path.
+    """
+    setup, _ = HOT_PATHS[hot_path]
+
+    with setup(scale, seed) as (run, rows):
+        wall_times = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            wall_times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+
+        try:
+            run()
+            _, peak_allocated_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {HOT_PATH: hot_path,
+            SCALE: scale,
+            ROWS: rows,
+            WALL_TIME: statistics.median(wall_times),
+            PEAK_ALLOCATED_BYTES: peak_allocated_bytes,
+            PEAK_RSS_BYTES: get_peak_rss_bytes()}
+
+
+def run_suite(scales: Optional[List[int]] = None,
+              hot_paths: Optional[List[str]] = None,
+              repeat: int = 3,
+              seed: int = 0,
+              isolate: bool = True,
+              max_scales: Optional[Dict[str, Optional[int]]] = None) -> Dict[str, Any]:
+    """
+    Measures every hot path at every scale of the bundled menu and returns the results with the metadata of the run.
+    A hot path is skipped above its largest scale (`HOT_PATHS`, overridden by `max_scales`).  With `isolate`, every
+    measurement runs in a freshly spawned interpreter so that its peak RSS and caches do not leak into the next one.
+    """
+    scales = scales if scales else SCALES
+    hot_paths = hot_paths if hot_paths else list(HOT_PATHS.keys())
+
+    for hot_path in list(hot_paths) + list(max_scales or {}):
+        if hot_path not in HOT_PATHS:
+            raise ValueError(f"Unsupported hot path: {hot_path}")
+
+    max_scales = {**{hot_path: max_scale for hot_path, (_, max_scale) in HOT_PATHS.items()}, **(max_scales or {})}
+    results = []
+
+    for hot_path in hot_paths:
+        for scale in scales:
+            if max_scales[hot_path] is not None and scale > max_scales[hot_path]:
+                continue
+
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    results.append(executor.submit(measure_hot_path, hot_path, scale, repeat, seed).result())
+            else:
+                results.append(measure_hot_path(hot_path, scale, repeat, seed))
+
+    metadata = {"created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "repeat": repeat,
+                "seed": seed,
+                "isolate": isolate}
+
+    return {METADATA: metadata, RESULTS: results}
+
+
+def save_results(results: Dict[str, Any], file_name: str) -> None:
+    with open(file_name, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+
+def load_results(file_name: str) -> Dict[str, Any]:
+    with open(file_name) as results_file:
+        return json.load(results_file)
+
+
+def compare_results(results: Dict[str, Any],
+                    baseline: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD,
+                    metrics: Optional[List[str]] = None) -> DataFrame:
+    """
+    Compares the metrics of every (hot path, scale) measured in both runs.  A metric regresses when it grew by more
+    than `threshold` (a fraction of the baseline).
+    """
+    metrics = metrics if metrics else [WALL_TIME, PEAK_ALLOCATED_BYTES, PEAK_RSS_BYTES]
+    keys = [HOT_PATH, SCALE]
+    comparison = DataFrame(baseline[RESULTS]).merge(DataFrame(results[RESULTS]), on=keys, suffixes=("_" + BASELINE, "_" + CURRENT))
+    comparison = pd.concat([DataFrame({HOT_PATH: comparison[HOT_PATH],
+                                       SCALE: comparison[SCALE],
+                                       METRIC: metric,
+                                       BASELINE: comparison[f"{metric}_{BASELINE}"].astype(np.float64),
+                                       CURRENT: comparison[f"{metric}_{CURRENT}"].astype(np.float64)})
+                            for metric in metrics],
+                           ignore_index=True)
+    comparison[RATIO] = comparison[CURRENT] / comparison[BASELINE]
+    comparison[REGRESSION] = comparison[RATIO] > 1 + threshold
+
+    return comparison
+
+
+def format_suite_results(results: Dict[str, Any]) -> str:
+    lines = []
+
+    for result in results[RESULTS]:
+        peak_rss = f"{result[PEAK_RSS_BYTES] / (1 << 20):9.1f} MiB" if result[PEAK_RSS_BYTES] is not None else "      n/a"
+        lines.append(f"{result[HOT_PATH]:<28} x{result[SCALE]:<6} rows={result[ROWS]:>11,} "
+                     f"wall_time={result[WALL_TIME]:8.3f}s "
+                     f"peak_allocated={result[PEAK_ALLOCATED_BYTES] / (1 << 20):9.1f} MiB "
+                     f"peak_rss={peak_rss}")
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Same options as `fast-food-nutrition bench`
+    from fast_food_nutrition.cli import main
+
+    sys.exit(main(["bench"] + sys.argv[1:]))
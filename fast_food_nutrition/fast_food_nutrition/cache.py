@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from pandas import DataFrame
+from typing import Dict, List, Optional, Tuple
+
+from fast_food_nutrition.etl import FastFoodMenuETL, FastFoodMenuETLInterface
+from fast_food_nutrition.model import CHAIN, DATA_TYPE, MENU_CHAINS, MENU_COLUMNS, CacheFormat, FoodNutritionMapping
+
+MANIFEST_FILE_NAME = "manifest"
+MENU_FILE_NAME = "menu"
+HASH_BLOCK_SIZE = 1 << 20
+
+MTIME = "mtime"
+SIZE = "size"
+SHA256 = "sha256"
+SCHEMA = "schema"
+CHAINS = "chains"
+
+
+def fingerprint_file(file_name: str) -> Dict[str, object]:
+    stat = os.stat(file_name)
+    sha256 = hashlib.sha256()
+
+    with open(file_name, "rb") as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+
+    return {MTIME: stat.st_mtime_ns, SIZE: stat.st_size, SHA256: sha256.hexdigest()}
+
+
+def fingerprint_schema(chains: List[str]) -> str:
+    """
+    Hash of everything besides the sources that shapes the normalized menu: the menu columns, their data types and the
+    `MenuSource` registrations (column mappings, missing values, row filters) of `chains`.
+    """
+    schema = (MENU_COLUMNS,
+              [FoodNutritionMapping[column][DATA_TYPE] for column in MENU_COLUMNS],
+              [(chain, MENU_CHAINS.get(chain)) for chain in chains])
+
+    return hashlib.sha256(repr(schema).encode()).hexdigest()
+
+
+def refresh_fingerprint(file_name: str, fingerprint: Dict[str, object]) -> Optional[Dict[str, object]]:
+    """
+    Checks a source file against its cached fingerprint and returns the fingerprint to keep, or None if the source
+    changed.  The content hash is only recomputed when the mtime or size differ, so an untouched source costs a single
+    stat() call; a merely touched source is not re-transformed and gets its new mtime and size so that the next check
+    is a single stat() call again.
+    """
+    if not os.path.exists(file_name):
+        return None
+
+    stat = os.stat(file_name)
+
+    if stat.st_mtime_ns == fingerprint[MTIME] and stat.st_size == fingerprint[SIZE]:
+        return fingerprint
+
+    current_fingerprint = fingerprint_file(file_name)
+
+    return current_fingerprint if current_fingerprint[SHA256] == fingerprint[SHA256] else None
+
+
+class CachedFastFoodMenuETL(FastFoodMenuETLInterface):
+    """
+    Persists the normalized menu as a single columnar file keyed by a fingerprint (mtime, size and content hash)
+    of every source file and of the menu schema.  A warm start is one columnar read; only the chains whose sources
+    changed are re-transformed, and a schema change re-transforms every chain.
+    """
+    def __init__(self,
+                 cache_dir: str,
+                 menu_etl: Optional[FastFoodMenuETL] = None,
+                 cache_format: CacheFormat = CacheFormat.FEATHER):
+        self.cache_dir = cache_dir
+        self.menu_etl = menu_etl if menu_etl else FastFoodMenuETL()
+        self.cache_format = cache_format
+        self.refreshed_chains: List[str] = []
+
+    @property
+    def menu_file_name(self) -> str:
+        return os.path.join(self.cache_dir, f"{MENU_FILE_NAME}.{self.cache_format.value}")
+
+    @property
+    def manifest_file_name(self) -> str:
+        # One manifest per format, as each format has its own menu file refreshed independently
+        return os.path.join(self.cache_dir, f"{MANIFEST_FILE_NAME}.{self.cache_format.value}.json")
+
+    def source_files(self) -> List[str]:
+        return self.menu_etl.source_files()
+
+    def load_menu_items(self) -> DataFrame:
+        return self.load_menu_items_with_chain().drop(columns=CHAIN)
+
+    def load_menu_items_with_chain(self) -> DataFrame:
+        manifest = self.read_manifest()
+        stale_chains, touched_files = self.get_stale_chains(manifest)
+
+        if not stale_chains:
+            if touched_files:
+                self.write_manifest(manifest)
+
+            self.refreshed_chains = []
+            return self.read_menu()
+
+        cached_menu = self.read_menu() if len(stale_chains) < len(self.menu_etl.menu_etls) else None
+        refreshed_menus = dict(zip(stale_chains,
+                                   self.menu_etl.run_menu_etls([self.menu_etl.menu_etls[chain] for chain in stale_chains])))
+
+        chain_menus = []
+
+        for chain in self.menu_etl.menu_etls.keys():
+            if chain in refreshed_menus:
+                chain_menu = refreshed_menus[chain]
+                manifest[CHAINS][chain] = {file_name: fingerprint_file(file_name)
+                                   for file_name in self.menu_etl.menu_etls[chain].source_files()}
+            else:
+                chain_menu = cached_menu[cached_menu[CHAIN] == chain].drop(columns=CHAIN)
+
+            chain_menus.append(chain_menu.assign(**{CHAIN: chain}))
+
+        menu = pd.concat(chain_menus, ignore_index=True)
+        # Registry order, like `FastFoodMenuETL.load_menu_items_with_chain`
+        menu[CHAIN] = pd.Categorical(menu[CHAIN], categories=list(self.menu_etl.menu_etls.keys()))
+
+        self.write_menu(menu)
+        self.write_manifest(manifest)
+        self.refreshed_chains = stale_chains
+
+        return menu
+
+    def get_stale_chains(self, manifest: Dict[str, object]) -> Tuple[List[str], List[str]]:
+        """
+        Returns the chains whose sources changed and the source files only touched (same content, new mtime or size),
+        whose fingerprints are updated in `manifest`.  A manifest of another schema is reset and every chain is stale.
+        """
+        chains = list(self.menu_etl.menu_etls.keys())
+        schema = fingerprint_schema(chains)
+
+        if not os.path.exists(self.menu_file_name) or manifest.get(SCHEMA) != schema:
+            manifest.clear()
+            manifest.update({SCHEMA: schema, CHAINS: {}})
+
+            return chains, []
+
+        stale_chains = []
+        touched_files = []
+
+        for chain, menu_etl in self.menu_etl.menu_etls.items():
+            fingerprints = manifest[CHAINS].get(chain, {})
+            source_files = menu_etl.source_files()
+
+            if set(source_files) != set(fingerprints.keys()):
+                stale_chains.append(chain)
+                continue
+
+            for file_name in source_files:
+                fingerprint = refresh_fingerprint(file_name, fingerprints[file_name])
+
+                if fingerprint is None:
+                    stale_chains.append(chain)
+                    break
+
+                if fingerprint is not fingerprints[file_name]:
+                    fingerprints[file_name] = fingerprint
+                    touched_files.append(file_name)
+
+        return stale_chains, touched_files
+
+    def read_manifest(self) -> Dict[str, object]:
+        if not os.path.exists(self.manifest_file_name):
+            return {}
+
+        with open(self.manifest_file_name) as manifest:
+            return json.load(manifest)
+
+    def write_manifest(self, manifest: Dict[str, object]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file_name = f"{self.manifest_file_name}.tmp"
+
+        with open(tmp_file_name, "w") as tmp_manifest:
+            json.dump(manifest, tmp_manifest, indent=2, sort_keys=True)
+
+        os.replace(tmp_file_name, self.manifest_file_name)
+
+    def read_menu(self) -> DataFrame:
+        if self.cache_format == CacheFormat.PARQUET:
+            return pd.read_parquet(self.menu_file_name)
+        else:
+            return pd.read_feather(self.menu_file_name)
+
+    def write_menu(self, menu: DataFrame) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write next to the target and swap it in so a concurrent reader never sees a partial file
+        tmp_file_name = f"{self.menu_file_name}.tmp"
+
+        if self.cache_format == CacheFormat.PARQUET:
+            menu.to_parquet(tmp_file_name, index=False)
+        else:
+            menu.to_feather(tmp_file_name)
+
+        os.replace(tmp_file_name, self.menu_file_name)
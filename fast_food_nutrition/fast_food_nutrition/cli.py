@@ -0,0 +1,280 @@
+import argparse
+import itertools
+import os
+import sys
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from fast_food_nutrition.model import (CHAIN,
+                                       FOOD_INTAKE_FEATURES,
+                                       FOOD_INTAKE_SCORES,
+                                       NUTRIENTS,
+                                       CacheFormat,
+                                       ExecutorType,
+                                       FigureType,
+                                       FoodIntakeScore,
+                                       FoodNutritionFeatures,
+                                       MultipleComparisonCorrection,
+                                       RenderFormat,
+                                       ScatterMode,
+                                       Sex,
+                                       Test)
+from fast_food_nutrition.util import TEST_DIR
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+PROGRAM = "fast-food-nutrition"
+
+
+def load_menu(args: argparse.Namespace) -> "DataFrame":
+    """
+    The menu with its chain column, read through the columnar cache when `--cache-dir` is given.
+    """
+    from fast_food_nutrition.etl import FastFoodMenuETL
+
+    menu_etl = FastFoodMenuETL(data_dir=args.data_dir)
+
+    if args.cache_dir:
+        from fast_food_nutrition.cache import CachedFastFoodMenuETL
+
+        return CachedFastFoodMenuETL(args.cache_dir, menu_etl, CacheFormat(args.cache_format)).load_menu_items_with_chain()
+
+    return menu_etl.load_menu_items_with_chain()
+
+
+def run_load(args: argparse.Namespace) -> int:
+    menu = load_menu(args)
+
+    if args.output:
+        menu.to_csv(args.output, index=False)
+    else:
+        print(menu.groupby(CHAIN, observed=True).size().rename("rows").to_string())
+        print(f"total {len(menu)}")
+
+    return 0
+
+
+def run_score(args: argparse.Namespace) -> int:
+    from fast_food_nutrition.algo import NutritionCalculator
+
+    menu = load_menu(args)
+
+    if args.chain:
+        menu = menu[menu[CHAIN] == args.chain]
+
+    scores = NutritionCalculator.score_frame(menu, Sex(args.sex))
+    scores = scores.sort_values(args.score, ascending=not args.descending, kind="stable", na_position="last")
+    columns = [FoodNutritionFeatures.MENU_ITEM.value, CHAIN] + [score.value for score in FoodIntakeScore]
+
+    scores[columns].head(args.top).to_csv(sys.stdout, index=False)
+
+    return 0
+
+
+def run_test(args: argparse.Namespace) -> int:
+    """
+    Welch's t-tests of the mean of a nutrient between every pair of the given chains, as one batch.
+    """
+    import numpy as np
+    from pandas import DataFrame
+
+    from fast_food_nutrition.analysis import MultipleComparison, TTest
+    from fast_food_nutrition.model import CI_LOWER, CI_UPPER, CONCLUSION, P_VALUE, STATISTIC
+
+    menu = load_menu(args)
+    chains = args.chains or list(menu[CHAIN].cat.categories)
+    samples = menu.groupby(CHAIN, observed=True)[args.nutrient].agg(["mean", "std", "count"])
+    missing_chains = [chain for chain in chains if chain not in samples.index]
+
+    if missing_chains:
+        raise ValueError(f"Unsupported chain: {', '.join(missing_chains)}")
+
+    pairs = list(itertools.combinations(chains, 2))
+    first, second = samples.loc[[pair[0] for pair in pairs]], samples.loc[[pair[1] for pair in pairs]]
+    results = TTest.calculate_two_means_batch(first["mean"].to_numpy(), second["mean"].to_numpy(), 0, 0,
+                                              first["std"].to_numpy(), second["std"].to_numpy(),
+                                              first["count"].to_numpy(), second["count"].to_numpy(),
+                                              Test(args.test), args.alpha)
+
+    if args.correction:
+        results = MultipleComparison.correct(results, args.alpha, MultipleComparisonCorrection(args.correction))
+
+    report = DataFrame({"chain_1": [pair[0] for pair in pairs], "chain_2": [pair[1] for pair in pairs]})
+
+    for field in [STATISTIC, P_VALUE, CI_LOWER, CI_UPPER, CONCLUSION]:
+        report[field] = results[field] if field == CONCLUSION else np.round(results[field], 6)
+
+    report.to_csv(sys.stdout, index=False)
+
+    return 0
+
+
+def run_plot(args: argparse.Namespace) -> int:
+    """
+    The regression figures regress the composite nutrition score on the intake scores, the others plot the nutrients.
+    """
+    from fast_food_nutrition.algo import NutritionCalculator
+    from fast_food_nutrition.viz import FastFoodNutritionVisualizer
+
+    menu = load_menu(args)
+    render_format = RenderFormat(args.format)
+    regression_options = {"independent_vars": {FOOD_INTAKE_SCORES[food_intake_type]: feature
+                                               for food_intake_type, feature in FOOD_INTAKE_FEATURES.items()},
+                          "target_var": FoodIntakeScore.COMPOSITE.value}
+    options = {FigureType.SCATTER_PLOTS: {"mode": ScatterMode(args.mode)},
+               FigureType.SINGLE_LINEAR_REGRESSION: regression_options,
+               FigureType.MULTI_LINEAR_REGRESSION: regression_options}
+    figure_types = [FigureType(figure) for figure in args.figures]
+    regression_figure_types = [FigureType.SINGLE_LINEAR_REGRESSION, FigureType.MULTI_LINEAR_REGRESSION]
+    scored_menu = NutritionCalculator.score_frame(menu, Sex(args.sex))[[CHAIN] + list(regression_options["independent_vars"]) +
+                                                                        [FoodIntakeScore.COMPOSITE.value]]
+    figure_menus = [(menu, [figure_type for figure_type in figure_types if figure_type not in regression_figure_types]),
+                    (scored_menu, [figure_type for figure_type in figure_types if figure_type in regression_figure_types])]
+    paths = []
+
+    for figure_menu, menu_figure_types in figure_menus:
+        if args.by_chain:
+            paths += FastFoodNutritionVisualizer.render_by_chain(figure_menu, menu_figure_types, args.output_dir,
+                                                                 render_format, options,
+                                                                 executor_type=ExecutorType(args.executor)).values()
+            continue
+
+        os.makedirs(args.output_dir, exist_ok=True)
+        paths += [FastFoodNutritionVisualizer.render(figure_type,
+                                                     figure_menu.drop(columns=[CHAIN]),
+                                                     render_format,
+                                                     os.path.join(args.output_dir, f"{figure_type.value}.{render_format.value}"),
+                                                     **options.get(figure_type, {}))
+                  for figure_type in menu_figure_types]
+
+    print("\n".join(paths))
+
+    return 0
+
+
+def parse_max_scale(value: str) -> Tuple[str, int]:
+    hot_path, _, max_scale = value.partition("=")
+
+    try:
+        return hot_path, int(max_scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOT_PATH=N, got {value!r}")
+
+
+def run_bench(args: argparse.Namespace) -> int:
+    """
+    Runs the benchmark suite and, with `--baseline`, exits with 1 when a metric regressed past the threshold.
+    """
+    from fast_food_nutrition import bench
+
+    if args.implementations:
+        print(bench.format_results(bench.benchmark_dtype_pushdown(args.replication)))
+        print(bench.format_results(bench.benchmark_score_frame(args.replication)))
+
+        return 0
+
+    results = bench.run_suite(args.scales, args.hot_paths, args.repeat, args.seed, not args.no_isolate,
+                              dict(args.max_scale or []))
+    print(bench.format_suite_results(results))
+
+    if args.output:
+        bench.save_results(results, args.output)
+
+    if args.baseline:
+        threshold = args.threshold if args.threshold is not None else bench.REGRESSION_THRESHOLD
+        comparison = bench.compare_results(results, bench.load_results(args.baseline), threshold)
+        regressions = comparison[comparison[bench.REGRESSION]]
+        print(regressions.to_string(index=False) if len(regressions) else f"No regression over {threshold:.0%}")
+
+        return 1 if len(regressions) else 0
+
+    return 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    from fast_food_nutrition.service import DEFAULT_HOST, DEFAULT_PORT, MenuService
+
+    MenuService(load_menu(args), executor_type=ExecutorType(args.executor)).run(args.host or DEFAULT_HOST,
+                                                                                args.port or DEFAULT_PORT)
+
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=PROGRAM, description="Fast food menu nutrition analysis")
+    menu_options = argparse.ArgumentParser(add_help=False)
+    menu_options.add_argument("--data-dir", default=TEST_DIR, help="directory of the menu CSV files")
+    menu_options.add_argument("--cache-dir", help="columnar cache of the normalized menu")
+    menu_options.add_argument("--cache-format", default=CacheFormat.FEATHER.value,
+                              choices=[cache_format.value for cache_format in CacheFormat])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load = subparsers.add_parser("load", parents=[menu_options], help="load the menu and count the items per chain")
+    load.add_argument("--output", help="write the menu as CSV instead")
+    load.set_defaults(run=run_load)
+
+    score = subparsers.add_parser("score", parents=[menu_options], help="rank the menu items by an intake score")
+    score.add_argument("--sex", default=Sex.COMBINE.value, choices=[sex.value for sex in Sex])
+    score.add_argument("--score", default=FoodIntakeScore.COMPOSITE.value, choices=[score.value for score in FoodIntakeScore])
+    score.add_argument("--chain")
+    score.add_argument("--top", type=int, default=10)
+    score.add_argument("--descending", action="store_true")
+    score.set_defaults(run=run_score)
+
+    test = subparsers.add_parser("test", parents=[menu_options], help="compare the mean of a nutrient between chains")
+    test.add_argument("--nutrient", default=FoodNutritionFeatures.CALORIES.value, choices=NUTRIENTS)
+    test.add_argument("--chains", nargs="+", help="chains to compare pairwise (every chain by default)")
+    test.add_argument("--test", default=Test.TWO_TAILED.value, choices=[test.value for test in Test])
+    test.add_argument("--alpha", type=float, default=0.05)
+    test.add_argument("--correction", choices=[correction.value for correction in MultipleComparisonCorrection])
+    test.set_defaults(run=run_test)
+
+    plot = subparsers.add_parser("plot", parents=[menu_options], help="render figures of the menu headlessly")
+    plot.add_argument("figures", nargs="+", choices=[figure_type.value for figure_type in FigureType])
+    plot.add_argument("--output-dir", default=".")
+    plot.add_argument("--format", default=RenderFormat.PNG.value, choices=[render_format.value for render_format in RenderFormat])
+    plot.add_argument("--mode", default=ScatterMode.MARKERS.value, choices=[mode.value for mode in ScatterMode])
+    plot.add_argument("--sex", default=Sex.COMBINE.value, choices=[sex.value for sex in Sex])
+    plot.add_argument("--by-chain", action="store_true", help="render every figure once per chain")
+    plot.add_argument("--executor", default=ExecutorType.PROCESS.value, choices=[executor.value for executor in ExecutorType])
+    plot.set_defaults(run=run_plot)
+
+    bench = subparsers.add_parser("bench", help="benchmark the hot paths on menus scaled from the bundled CSVs")
+    bench.add_argument("--scales", type=int, nargs="+", help="menu scales (1x, 100x and 10,000x by default)")
+    bench.add_argument("--hot-paths", nargs="+", help="hot paths to measure (every hot path by default)")
+    bench.add_argument("--max-scale", type=parse_max_scale, action="append", metavar="HOT_PATH=N",
+                       help="largest scale of a hot path, e.g. load_menu_items=10000 (1,000x for load_menu_items and "
+                            "100x for scatter_plots by default)")
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--no-isolate", action="store_true", help="measure in this process instead of a fresh one")
+    bench.add_argument("--output", help="write the results as JSON")
+    bench.add_argument("--baseline", help="JSON results to compare against")
+    bench.add_argument("--threshold", type=float, help="largest tolerated growth of a metric, as a fraction")
+    bench.add_argument("--implementations", action="store_true",
+                       help="compare the former and current ETL and scoring implementations instead")
+    bench.add_argument("--replication", type=int, default=10)
+    bench.set_defaults(run=run_bench)
+
+    serve = subparsers.add_parser("serve", parents=[menu_options], help="serve scoring and queries over local HTTP")
+    serve.add_argument("--host", help="interface to bind (localhost by default)")
+    serve.add_argument("--port", type=int)
+    serve.add_argument("--executor", default=ExecutorType.THREAD.value, choices=[executor.value for executor in ExecutorType])
+    serve.set_defaults(run=run_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        return args.run(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,323 +1,269 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 from pandas import DataFrame
-
-from fast_food_nutrition.model import DATA_TYPE, FoodNutritionFeatures, FoodNutritionMapping
-from fast_food_nutrition.util import get_full_qualified_file_name
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from fast_food_nutrition.model import (BURGER_KING,
+                                       CHAIN,
+                                       CHICK_FILA,
+                                       DATA_TYPE,
+                                       MCDONALDS,
+                                       MENU_CHAINS,
+                                       MENU_COLUMNS,
+                                       NUTRIENTS,
+                                       STARBUCKS,
+                                       STARBUCKS_DRINKS,
+                                       STARBUCKS_EXPANDED_DRINKS,
+                                       STARBUCKS_FOOD,
+                                       WENDYS,
+                                       ExecutorType,
+                                       FoodNutritionFeatures,
+                                       FoodNutritionMapping,
+                                       MenuSource,
+                                       RowFilter)
+from fast_food_nutrition.util import TEST_DIR, get_full_qualified_file_name
 
 
 class FastFoodMenuETLInterface(ABC):
     @abstractmethod
     def load_menu_items(self) -> DataFrame: pass
 
+    @abstractmethod
+    def source_files(self) -> List[str]: pass
+
+    def iter_menu_items(self, chunksize: int) -> Iterator[DataFrame]:
+        """
+        Yields the normalized, typed menu in chunks of at most `chunksize` rows.  ETLs that can read their sources
+        incrementally override this so that memory stays bounded by the chunk size rather than the source size.
+        """
+        menu = self.load_menu_items()
+
+        for start in range(0, len(menu), chunksize):
+            yield menu.iloc[start:start + chunksize]
+
     def convert_data_types(self, menu: DataFrame) -> DataFrame:
-        return menu.astype({FoodNutritionFeatures.MENU_ITEM.value: FoodNutritionMapping[FoodNutritionFeatures.MENU_ITEM.value][DATA_TYPE],
-                            FoodNutritionFeatures.CALORIES.value: FoodNutritionMapping[FoodNutritionFeatures.CALORIES.value][DATA_TYPE],
-                            FoodNutritionFeatures.FAT.value: FoodNutritionMapping[FoodNutritionFeatures.CALORIES.value][DATA_TYPE],
-                            FoodNutritionFeatures.CARBOHYDRATES.value: FoodNutritionMapping[FoodNutritionFeatures.CALORIES.value][DATA_TYPE],
-                            FoodNutritionFeatures.PROTEIN.value: FoodNutritionMapping[FoodNutritionFeatures.CALORIES.value][DATA_TYPE],
-                            FoodNutritionFeatures.FIBER.value: FoodNutritionMapping[FoodNutritionFeatures.CALORIES.value][DATA_TYPE]})
+        return menu.astype({feature: FoodNutritionMapping[feature][DATA_TYPE] for feature in MENU_COLUMNS})
 
 
 class FastFoodMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.star_bucks_menu_etl = StarbucksMenuETL()
-        self.mcdonalds_menu_etl = McDonaldsMenuETL()
-        self.burger_king_etl = BurgerKingMenuETL()
-        self.wendys_menu_etl = WendysdMenuETL()
-        self.chick_fila_menu_etl = ChickFilaMenuETL()
+    """
+    Loads every chain registered in `MENU_CHAINS` and merges them into a single menu.  Each chain ETL runs on its own
+    worker of the configured executor, so the wall-clock time is bounded by the slowest chain rather than the sum of
+    all chains.  The results are always merged in the order of `menu_etls` so the combined menu is deterministic.
+    """
+    def __init__(self,
+                 executor_type: ExecutorType = ExecutorType.THREAD,
+                 max_workers: Optional[int] = None,
+                 data_dir: str = TEST_DIR):
+        self.menu_etls: Dict[str, FastFoodMenuETLInterface] = {chain: MenuChainETL(chain, data_dir)
+                                                               for chain in MENU_CHAINS.keys()}
+
+        self.star_bucks_menu_etl = self.menu_etls[STARBUCKS]
+        self.mcdonalds_menu_etl = self.menu_etls[MCDONALDS]
+        self.burger_king_etl = self.menu_etls[BURGER_KING]
+        self.wendys_menu_etl = self.menu_etls[WENDYS]
+        self.chick_fila_menu_etl = self.menu_etls[CHICK_FILA]
+        self.executor_type = executor_type
+        self.max_workers = max_workers
 
     def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(pd.concat([self.star_bucks_menu_etl.load_menu_items(),
-                                                  self.mcdonalds_menu_etl.load_menu_items(),
-                                                  self.burger_king_etl.load_menu_items(),
-                                                  self.wendys_menu_etl.load_menu_items(),
-                                                  self.chick_fila_menu_etl.load_menu_items()], ignore_index=True))
-
-
-class StarbucksMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.BASE_DIR = "starbucks"
-        self.DRINKS_FILE_NAME = f"{self.BASE_DIR}/starbucks-menu-nutrition-drinks.csv"
-        self.FOOD_FILE_NAME = f"{self.BASE_DIR}/starbucks-menu-nutrition-food.csv"
-        self.EXPANDED_MENU_FILE = f"{self.BASE_DIR}/starbucks_drinkMenu_expanded.csv"
-        self.FOOD_AND_DRINK_RENAME_COLUMNS = ["Unnamed: 0",
-                                              "Calories",
-                                              "Fat (g)",
-                                              "Carb. (g)",
-                                              "Fiber (g)",
-                                              "Protein",
-                                              "Protein (g)",
-                                              "Total Fat (g)",
-                                              "Total Carbohydrates (g)",
-                                              "Dietary Fibre (g)",
-                                              "Protein (g)",
-                                              ]
-        self.DRINK_DROP_COLUMNS = ["Sodium"]
-        self.DRINK_EXPANDED_DROP_COLUMNS = ["Beverage_category",
-                                            "Beverage",
-                                            "Beverage_prep",
-                                            "Trans Fat (g)",
-                                            "Saturated Fat (g)",
-                                            "Sodium (mg)",
-                                            "Cholesterol (mg)",
-                                            "Sugars (g)",
-                                            "Vitamin A (% DV)",
-                                            "Vitamin C (% DV)",
-                                            "Calcium (% DV)",
-                                            "Iron (% DV)",
-                                            "Caffeine (mg)"]
+        # Every chain menu is typed by the reader, so the merge needs no further conversion
+        return pd.concat(self.load_menu_items_by_chain().values(), ignore_index=True)
 
-    def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(pd.concat([self.transform_starbucks_drinks(),
-                                                      self.transform_starbucks_food(),
-                                                      self.transform_starbucks_expanded_drinks()], ignore_index=True))
+    def source_files(self) -> List[str]:
+        return [file_name for menu_etl in self.menu_etls.values() for file_name in menu_etl.source_files()]
 
-    def extract_starbucks_drinks(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.DRINKS_FILE_NAME), index_col=False)
+    def load_menu_items_with_chain(self) -> DataFrame:
+        menus = self.load_menu_items_by_chain()
+        chains = pd.Categorical([chain for chain, menu in menus.items() for _ in range(len(menu))], categories=list(menus.keys()))
 
-    def transform_starbucks_drinks(self) -> DataFrame:
-        starbucks_drinks = self.extract_starbucks_drinks()
+        return pd.concat(menus.values(), ignore_index=True).assign(**{CHAIN: chains})
 
-        starbucks_drinks = starbucks_drinks[~(starbucks_drinks[self.FOOD_AND_DRINK_RENAME_COLUMNS[1:6]] == "-").all(axis=1)]
+    def iter_menu_items(self, chunksize: int) -> Iterator[DataFrame]:
+        for _, chunk in self.iter_menu_items_by_chain(chunksize):
+            yield chunk
 
-        starbucks_drinks.rename(columns={self.FOOD_AND_DRINK_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                         self.FOOD_AND_DRINK_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                         self.FOOD_AND_DRINK_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                         self.FOOD_AND_DRINK_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                         self.FOOD_AND_DRINK_RENAME_COLUMNS[4]: FoodNutritionFeatures.FIBER.value,
-                                         self.FOOD_AND_DRINK_RENAME_COLUMNS[5]: FoodNutritionFeatures.PROTEIN.value}, inplace=True)
+    def iter_menu_items_by_chain(self, chunksize: int) -> Iterator[Tuple[str, DataFrame]]:
+        for chain, menu_etl in self.menu_etls.items():
+            for chunk in menu_etl.iter_menu_items(chunksize):
+                yield chain, chunk
 
-        starbucks_drinks.drop(columns=self.DRINK_DROP_COLUMNS, inplace=True)
+    def load_menu_items_by_chain(self) -> Dict[str, DataFrame]:
+        chains = list(self.menu_etls.keys())
 
-        return starbucks_drinks
+        return dict(zip(chains, self.run_menu_etls(list(self.menu_etls.values()))))
 
-    def extract_starbucks_food(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.FOOD_FILE_NAME),
-                           encoding="utf-16",
-                           index_col=False)
+    def run_menu_etls(self, menu_etls: List[FastFoodMenuETLInterface]) -> List[DataFrame]:
+        if self.executor_type == ExecutorType.SERIAL or len(menu_etls) <= 1:
+            return [menu_etl.load_menu_items() for menu_etl in menu_etls]
 
-    def transform_starbucks_food(self) -> DataFrame:
-        starbucks_food = self.extract_starbucks_food()
+        with self.create_executor(len(menu_etls)) as executor:
+            # Executor.map yields in submission order regardless of completion order
+            return list(executor.map(_load_menu_items, menu_etls))
 
-        starbucks_food.rename(columns={self.FOOD_AND_DRINK_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                       self.FOOD_AND_DRINK_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                       self.FOOD_AND_DRINK_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                       self.FOOD_AND_DRINK_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                       self.FOOD_AND_DRINK_RENAME_COLUMNS[4]: FoodNutritionFeatures.FIBER.value,
-                                       self.FOOD_AND_DRINK_RENAME_COLUMNS[6]: FoodNutritionFeatures.PROTEIN.value},
-                              inplace=True)
+    def create_executor(self, n_tasks: int) -> Executor:
+        max_workers = self.max_workers if self.max_workers else n_tasks
 
-        return starbucks_food
+        if self.executor_type == ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        elif self.executor_type == ExecutorType.THREAD:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unsupported executor type: {self.executor_type}")
 
-    def extract_starbucks_expanded_drinks(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.EXPANDED_MENU_FILE),
-                           index_col=False)
 
-    def transform_starbucks_expanded_drinks(self) -> DataFrame:
-        starbucks_drinks_expanded = self.extract_starbucks_expanded_drinks()
-
-        starbucks_drinks_expanded[FoodNutritionFeatures.MENU_ITEM.value] = \
-            starbucks_drinks_expanded[self.DRINK_EXPANDED_DROP_COLUMNS[1]] + \
-            " " + \
-            starbucks_drinks_expanded[self.DRINK_EXPANDED_DROP_COLUMNS[2]]
-
-        starbucks_drinks_expanded.rename(columns={self.FOOD_AND_DRINK_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                                  self.FOOD_AND_DRINK_RENAME_COLUMNS[7]: FoodNutritionFeatures.FAT.value,
-                                                  self.FOOD_AND_DRINK_RENAME_COLUMNS[8]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                                  self.FOOD_AND_DRINK_RENAME_COLUMNS[9]: FoodNutritionFeatures.FIBER.value,
-                                                  self.FOOD_AND_DRINK_RENAME_COLUMNS[10]: FoodNutritionFeatures.PROTEIN.value},
-                                         inplace=True)
-
-        starbucks_drinks_expanded.drop(columns=self.DRINK_EXPANDED_DROP_COLUMNS, inplace=True)
-
-        return starbucks_drinks_expanded
-
-
-class McDonaldsMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.BASE_DIR = "mcdonalds"
-        self.MENU_FILE_NAME = f"{self.BASE_DIR}/mcdonalds.csv"
-        self.MENU_DROP_COLUMNS = ["Category",
-                                  "Serving Size",
-                                  "Calories from Fat",
-                                  "Total Fat (% Daily Value)",
-                                  "Saturated Fat",
-                                  "Saturated Fat (% Daily Value)",
-                                  "Trans Fat",
-                                  "Cholesterol",
-                                  "Cholesterol (% Daily Value)",
-                                  "Sodium",
-                                  "Sodium (% Daily Value)",
-                                  "Carbohydrates (% Daily Value)",
-                                  "Dietary Fiber (% Daily Value)",
-                                  "Sugars",
-                                  "Vitamin A (% Daily Value)",
-                                  "Vitamin C (% Daily Value)",
-                                  "Calcium (% Daily Value)",
-                                  "Iron (% Daily Value)"]
-
-        self.MENU_RENAME_COLUMNS = ["Item",
-                                    "Calories",
-                                    "Total Fat",
-                                    "Carbohydrates",
-                                    "Protein",
-                                    "Dietary Fiber"]
+def _load_menu_items(menu_etl: FastFoodMenuETLInterface) -> DataFrame:
+    return menu_etl.load_menu_items()
 
-    def extract_mcdonalds_menu(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.MENU_FILE_NAME),
-                           index_col=False)
 
-    def transform_mcdonalds_menu(self) -> DataFrame:
-        mcdonalds_menu = self.extract_mcdonalds_menu()
+class MenuSourceETL(FastFoodMenuETLInterface):
+    """
+    Generic ETL driven by a `MenuSource` description.  Only the mapped columns are parsed, so unused columns such as
+    vitamins, sodium and % daily values are never allocated.  The `FoodNutritionMapping` data types are pushed into the
+    reader and the source's sentinel values (e.g. the Starbucks "-" cells) are parsed as missing, so the menu comes
+    out of a single typed pass.
+    """
+    def __init__(self, source: MenuSource, data_dir: str = TEST_DIR):
+        self.source = source
+        self.data_dir = data_dir
 
-        mcdonalds_menu.drop(columns=self.MENU_DROP_COLUMNS, inplace=True)
+    def source_files(self) -> List[str]:
+        return [get_full_qualified_file_name(self.source.file_name, self.data_dir)]
 
-        mcdonalds_menu.rename(columns={self.MENU_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                       self.MENU_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                       self.MENU_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                       self.MENU_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                       self.MENU_RENAME_COLUMNS[4]: FoodNutritionFeatures.PROTEIN.value,
-                                       self.MENU_RENAME_COLUMNS[5]: FoodNutritionFeatures.FIBER.value},
-                              inplace=True)
+    def extract(self, chunksize: Optional[int] = None) -> Union[DataFrame, Iterator[DataFrame]]:
+        return pd.read_csv(get_full_qualified_file_name(self.source.file_name, self.data_dir),
+                           encoding=self.source.encoding,
+                           usecols=self.source.usecols,
+                           dtype=self.source_data_types(),
+                           na_values=list(self.source.na_values),
+                           index_col=False,
+                           chunksize=chunksize)
 
-        return mcdonalds_menu
+    def source_data_types(self) -> Dict[str, str]:
+        data_types = {column: FoodNutritionMapping[feature][DATA_TYPE] for column, feature in self.source.columns.items()}
+        data_types.update({column: FoodNutritionMapping[FoodNutritionFeatures.MENU_ITEM.value][DATA_TYPE]
+                           for column in self.source.menu_item_columns})
 
-    def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(self.transform_mcdonalds_menu())
-
-
-class BurgerKingMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.BASE_DIR = "burger-king"
-        self.MENU_FILE_NAME = f"{self.BASE_DIR}/burger-king.csv"
-        self.MENU_DROP_COLUMNS = ["Category",
-                                  "Fat Calories",
-                                  "Saturated Fat (g)",
-                                  "Trans Fat (g)",
-                                  "Cholesterol (mg)",
-                                  "Sodium (mg)",
-                                  "Sugars (g)",
-                                  "Weight Watchers"]
-
-        self.MENU_RENAME_COLUMNS = ["Item",
-                                    "Calories",
-                                    "Fat (g)",
-                                    "Total Carb (g)",
-                                    "Protein (g)",
-                                    "Dietary Fiber (g)"]
+        return data_types
 
-    def extract_burger_king_menu(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.MENU_FILE_NAME),
-                           index_col=False)
+    def transform(self) -> DataFrame:
+        return self.normalize(self.extract())
 
-    def transform_burger_king_menu(self) -> DataFrame:
-        burger_king_menu = self.extract_burger_king_menu()
+    def iter_menu_items(self, chunksize: int) -> Iterator[DataFrame]:
+        with self.extract(chunksize) as chunks:
+            for chunk in chunks:
+                menu = self.normalize(chunk)
 
-        burger_king_menu.drop(columns=self.MENU_DROP_COLUMNS, inplace=True)
+                if len(menu):
+                    yield menu
 
-        burger_king_menu.rename(columns={self.MENU_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                         self.MENU_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                         self.MENU_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                         self.MENU_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                         self.MENU_RENAME_COLUMNS[4]: FoodNutritionFeatures.PROTEIN.value,
-                                         self.MENU_RENAME_COLUMNS[5]: FoodNutritionFeatures.FIBER.value},
-                                inplace=True)
+    def normalize(self, menu: DataFrame) -> DataFrame:
+        if self.source.menu_item_columns:
+            first_column, *other_columns = self.source.menu_item_columns
+            menu[FoodNutritionFeatures.MENU_ITEM.value] = menu[first_column].str.cat([menu[column] for column in other_columns],
+                                                                                     sep=" ")
 
-        return burger_king_menu
+        menu = menu.rename(columns=self.source.columns)
 
-    def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(self.transform_burger_king_menu())
-
-
-class WendysdMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.BASE_DIR = "wendys"
-        self.MENU_FILE_NAME = f"{self.BASE_DIR}/wendys.csv"
-        self.MENU_DROP_COLUMNS = ["Category",
-                                  "Sat Fat (g)",
-                                  "Trans Fat (g)",
-                                  "Cholesterol (mg)",
-                                  "Sodium (mg)",
-                                  "Sugars (g)",
-                                  "Weight Watchers"]
-
-        self.MENU_RENAME_COLUMNS = ["Item",
-                                    "Calories",
-                                    "Fat (g)",
-                                    "Total Carb (g)",
-                                    "Protein (g)",
-                                    "Dietary Fiber (g)"]
+        for row_filter in self.source.row_filters:
+            menu = self.filter_rows(menu, row_filter)
 
-    def extract_wendys_menu(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.MENU_FILE_NAME),
-                           index_col=False)
+        return menu[MENU_COLUMNS]
 
-    def transform_wendys_menu(self) -> DataFrame:
-        wendys_menu = self.extract_wendys_menu()
+    def filter_rows(self, menu: DataFrame, row_filter: RowFilter) -> DataFrame:
+        if row_filter == RowFilter.DROP_ALL_NUTRIENTS_MISSING:
+            return menu[~menu[NUTRIENTS].isna().all(axis=1)]
+        else:
+            raise ValueError(f"Unsupported row filter: {row_filter}")
+
+    def load_menu_items(self) -> DataFrame:
+        return self.transform()
 
-        wendys_menu.drop(columns=self.MENU_DROP_COLUMNS, inplace=True)
 
-        wendys_menu.rename(columns={self.MENU_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                    self.MENU_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                    self.MENU_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                    self.MENU_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                    self.MENU_RENAME_COLUMNS[4]: FoodNutritionFeatures.PROTEIN.value,
-                                    self.MENU_RENAME_COLUMNS[5]: FoodNutritionFeatures.FIBER.value},
-                           inplace=True)
+class MenuChainETL(FastFoodMenuETLInterface):
+    """
+    Loads every `MenuSource` registered for a chain in `MENU_CHAINS`.  Onboarding a chain is a registry entry.
+    """
+    def __init__(self, chain: str, data_dir: str = TEST_DIR):
+        self.chain = chain
+        self.data_dir = data_dir
+        self.source_etls: Dict[str, MenuSourceETL] = {source.name: MenuSourceETL(source, data_dir)
+                                                      for source in MENU_CHAINS[chain]}
 
-        return wendys_menu
+    def source_files(self) -> List[str]:
+        return [file_name for source_etl in self.source_etls.values() for file_name in source_etl.source_files()]
 
     def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(self.transform_wendys_menu())
-
-
-class ChickFilaMenuETL(FastFoodMenuETLInterface):
-    def __init__(self):
-        self.BASE_DIR = "chick-fila"
-        self.MENU_FILE_NAME = f"{self.BASE_DIR}/chick-fila.csv"
-        self.MENU_DROP_COLUMNS = ["Serving size",
-                                  "Sat. Fat (G)",
-                                  "Trans Fat (G)",
-                                  "Cholesterol (MG)",
-                                  "Sodium (MG)",
-                                  "Sugar (G)"]
-
-        self.MENU_RENAME_COLUMNS = ["Menu",
-                                    "Calories",
-                                    "Fat (G)",
-                                    "Carbohydrates (G)",
-                                    "Protein (G)",
-                                    "Fiber (G)"]
+        return pd.concat([source_etl.transform() for source_etl in self.source_etls.values()], ignore_index=True)
 
-    def extract_chick_fila_menu(self) -> DataFrame:
-        return pd.read_csv(get_full_qualified_file_name(self.MENU_FILE_NAME),
-                           index_col=False)
+    def iter_menu_items(self, chunksize: int) -> Iterator[DataFrame]:
+        for source_etl in self.source_etls.values():
+            yield from source_etl.iter_menu_items(chunksize)
 
-    def transform_chick_fila_menu(self) -> DataFrame:
-        chick_fila = self.extract_chick_fila_menu()
 
-        chick_fila.drop(columns=self.MENU_DROP_COLUMNS, inplace=True)
+class StarbucksMenuETL(MenuChainETL):
+    def __init__(self, data_dir: str = TEST_DIR):
+        super().__init__(STARBUCKS, data_dir)
 
-        chick_fila.rename(columns={self.MENU_RENAME_COLUMNS[0]: FoodNutritionFeatures.MENU_ITEM.value,
-                                   self.MENU_RENAME_COLUMNS[1]: FoodNutritionFeatures.CALORIES.value,
-                                   self.MENU_RENAME_COLUMNS[2]: FoodNutritionFeatures.FAT.value,
-                                   self.MENU_RENAME_COLUMNS[3]: FoodNutritionFeatures.CARBOHYDRATES.value,
-                                   self.MENU_RENAME_COLUMNS[4]: FoodNutritionFeatures.PROTEIN.value,
-                                   self.MENU_RENAME_COLUMNS[5]: FoodNutritionFeatures.FIBER.value},
-                          inplace=True)
+    def extract_starbucks_drinks(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_DRINKS].extract()
 
-        return chick_fila
-    
-    def load_menu_items(self) -> DataFrame:
-        return self.convert_data_types(self.transform_chick_fila_menu())
+    def transform_starbucks_drinks(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_DRINKS].transform()
+
+    def extract_starbucks_food(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_FOOD].extract()
+
+    def transform_starbucks_food(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_FOOD].transform()
+
+    def extract_starbucks_expanded_drinks(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_EXPANDED_DRINKS].extract()
+
+    def transform_starbucks_expanded_drinks(self) -> DataFrame:
+        return self.source_etls[STARBUCKS_EXPANDED_DRINKS].transform()
+
+
+class McDonaldsMenuETL(MenuChainETL):
+    def __init__(self, data_dir: str = TEST_DIR):
+        super().__init__(MCDONALDS, data_dir)
 
+    def extract_mcdonalds_menu(self) -> DataFrame:
+        return self.source_etls[MCDONALDS].extract()
+
+    def transform_mcdonalds_menu(self) -> DataFrame:
+        return self.source_etls[MCDONALDS].transform()
+
+
+class BurgerKingMenuETL(MenuChainETL):
+    def __init__(self, data_dir: str = TEST_DIR):
+        super().__init__(BURGER_KING, data_dir)
+
+    def extract_burger_king_menu(self) -> DataFrame:
+        return self.source_etls[BURGER_KING].extract()
 
+    def transform_burger_king_menu(self) -> DataFrame:
+        return self.source_etls[BURGER_KING].transform()
 
 
+class WendysdMenuETL(MenuChainETL):
+    def __init__(self, data_dir: str = TEST_DIR):
+        super().__init__(WENDYS, data_dir)
 
+    def extract_wendys_menu(self) -> DataFrame:
+        return self.source_etls[WENDYS].extract()
 
+    def transform_wendys_menu(self) -> DataFrame:
+        return self.source_etls[WENDYS].transform()
 
 
+class ChickFilaMenuETL(MenuChainETL):
+    def __init__(self, data_dir: str = TEST_DIR):
+        super().__init__(CHICK_FILA, data_dir)
 
+    def extract_chick_fila_menu(self) -> DataFrame:
+        return self.source_etls[CHICK_FILA].extract()
 
+    def transform_chick_fila_menu(self) -> DataFrame:
+        return self.source_etls[CHICK_FILA].transform()
@@ -1,5 +1,12 @@
 from dataclasses import dataclass
 from enum import Enum
+import os
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 
 class Test(Enum):
@@ -8,6 +15,58 @@ class Test(Enum):
     TWO_TAILED = "TT"
 
 
+class ExecutorType(Enum):
+    SERIAL = "serial"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class CacheFormat(Enum):
+    FEATHER = "feather"
+    PARQUET = "parquet"
+
+
+class RowFilter(Enum):
+    DROP_ALL_NUTRIENTS_MISSING = "drop_all_nutrients_missing"
+
+
+class OutlierMethod(Enum):
+    IQR = "iqr"
+    MAD = "mad"
+    Z_SCORE = "z_score"
+
+
+class FigureType(Enum):
+    SCATTER_PLOTS = "scatter_plots"
+    BOX_PLOT = "box_plot"
+    HISTOGRAM_PLOTS = "histogram_plots"
+    SINGLE_LINEAR_REGRESSION = "single_linear_regression"
+    MULTI_LINEAR_REGRESSION = "multi_linear_regression"
+
+
+class ScatterMode(Enum):
+    MARKERS = "markers"
+    HISTOGRAM_2D = "histogram_2d"
+    HEXBIN = "hexbin"
+    SAMPLED = "sampled"
+
+
+class RenderFormat(Enum):
+    PNG = "png"
+    SVG = "svg"
+
+
+class Distribution(Enum):
+    NORMAL = "norm"
+    STUDENT_T = "t"
+
+
+class MultipleComparisonCorrection(Enum):
+    BONFERRONI = "bonferroni"
+    HOLM = "holm"
+    BENJAMINI_HOCHBERG = "benjamini_hochberg"
+
+
 class HypothesisTestMethod:
     P_VALUE_METHOD = "p_value"
     CRITICAL_VALUE_METHOD = "critical_value"
@@ -19,6 +78,20 @@ class HypothesisTestConclusion:
     FAIL_TO_REJECT_H0 = "do_not_reject_h_0"
 
 
+STATISTIC = "statistic"
+P_VALUE = "p_value"
+CI_LOWER = "ci_lower"
+CI_UPPER = "ci_upper"
+CONCLUSION = "conclusion"
+
+# Structured array returned by the batched hypothesis tests, one record per test case
+HYPOTHESIS_TEST_RESULT = np.dtype([(STATISTIC, np.float64),
+                                   (P_VALUE, np.float64),
+                                   (CI_LOWER, np.float64),
+                                   (CI_UPPER, np.float64),
+                                   (CONCLUSION, f"U{len(HypothesisTestConclusion.FAIL_TO_REJECT_H0)}")])
+
+
 class FoodNutritionFeatures(Enum):
     CALORIES = "calories"
     FAT = "fat"
@@ -28,6 +101,14 @@ class FoodNutritionFeatures(Enum):
     MENU_ITEM = "menu_item"
 
 
+NUTRIENTS = [FoodNutritionFeatures.CALORIES.value,
+             FoodNutritionFeatures.FAT.value,
+             FoodNutritionFeatures.CARBOHYDRATES.value,
+             FoodNutritionFeatures.FIBER.value,
+             FoodNutritionFeatures.PROTEIN.value]
+MENU_COLUMNS = [FoodNutritionFeatures.MENU_ITEM.value] + NUTRIENTS
+
+CHAIN = "chain"
 DATA_TYPE = "data_type"
 STRING = "string"
 FLOAT = "float64"
@@ -72,6 +153,35 @@ class FoodIntakeType(Enum):
     PROTEIN = 5
 
 
+class FoodIntakeScore(Enum):
+    CALORIES = "caloric_intake_score"
+    FAT = "fat_intake_score"
+    CARBOHYDRATES = "carbohydrate_intake_score"
+    FIBER = "fiber_intake_score"
+    PROTEIN = "protein_intake_score"
+    COMPOSITE = "composite_nutrition_score"
+
+
+FOOD_INTAKE_FEATURES = {FoodIntakeType.CALORIES: FoodNutritionFeatures.CALORIES.value,
+                        FoodIntakeType.FAT: FoodNutritionFeatures.FAT.value,
+                        FoodIntakeType.CARBOHYDRATES: FoodNutritionFeatures.CARBOHYDRATES.value,
+                        FoodIntakeType.FIBER: FoodNutritionFeatures.FIBER.value,
+                        FoodIntakeType.PROTEIN: FoodNutritionFeatures.PROTEIN.value}
+
+FOOD_INTAKE_SCORES = {FoodIntakeType.CALORIES: FoodIntakeScore.CALORIES.value,
+                      FoodIntakeType.FAT: FoodIntakeScore.FAT.value,
+                      FoodIntakeType.CARBOHYDRATES: FoodIntakeScore.CARBOHYDRATES.value,
+                      FoodIntakeType.FIBER: FoodIntakeScore.FIBER.value,
+                      FoodIntakeType.PROTEIN: FoodIntakeScore.PROTEIN.value}
+
+# High in Calories: 35%, High in Fat: 30%, High in Carbohydrates: 20%, Low in Fiber: 10%, Low in Protein: 5%
+COMPOSITE_SCORE_WEIGHTS = {FoodIntakeType.CALORIES: .35,
+                           FoodIntakeType.FAT: .30,
+                           FoodIntakeType.CARBOHYDRATES: .20,
+                           FoodIntakeType.FIBER: .10,
+                           FoodIntakeType.PROTEIN: .05}
+
+
 # CALORIC INTAKE
 MINIMUM_FEMALE_CALORIC_INTAKE = 1600
 MAXIMUM_FEMALE_CALORIC_INTAKE = 2400
@@ -168,3 +278,322 @@ class Nutrition:
     min_meals: int = 1
     max_meals: int = 3
 
+
+@dataclass(frozen=True)
+class CorrelationMatrix:
+    """
+    Pairwise Pearson correlation of `columns` over `n` complete rows.  Every matrix is labelled by `columns` on both
+    axes; `ci_lower` and `ci_upper` are the Fisher-z confidence interval bounds of r.
+    """
+    columns: List[str]
+    n: int
+    r: "DataFrame"
+    t: "DataFrame"
+    p_value: "DataFrame"
+    ci_lower: "DataFrame"
+    ci_upper: "DataFrame"
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    """
+    Observed statistic with its percentile bootstrap confidence interval.
+    """
+    statistic: float
+    ci_lower: float
+    ci_upper: float
+    n_resamples: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class PermutationTestResult:
+    statistic: float
+    p_value: float
+    n_resamples: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class LinearRegressionFit:
+    """
+    Ordinary least squares fit of `target` on `features`: target ~ intercept + features @ coefficients.
+    """
+    features: List[str]
+    target: str
+    intercept: float
+    coefficients: np.ndarray
+    r_squared: float
+    n: int
+
+
+NAMES_FILE = "names.npy"
+NAME_CODES_FILE = "name_codes.npy"
+
+
+class NutritionRow:
+    """
+    Read-only view of one row of a `NutritionTable` exposing the `Nutrition` attributes, so it can be passed to the
+    `NutritionCalculator` wherever a `Nutrition` is expected without materializing a per-row `__dict__`.
+    """
+    __slots__ = ("table", "position")
+
+    def __init__(self, table: "NutritionTable", position: int):
+        self.table = table
+        self.position = position
+
+    @property
+    def item(self) -> Optional[str]:
+        return self.table.get_name(self.position)
+
+    @property
+    def calories(self) -> float:
+        return self.table.columns[FoodNutritionFeatures.CALORIES.value][self.position]
+
+    @property
+    def fiber(self) -> float:
+        return self.table.columns[FoodNutritionFeatures.FIBER.value][self.position]
+
+    @property
+    def fat(self) -> float:
+        return self.table.columns[FoodNutritionFeatures.FAT.value][self.position]
+
+    @property
+    def carb(self) -> float:
+        return self.table.columns[FoodNutritionFeatures.CARBOHYDRATES.value][self.position]
+
+    @property
+    def protein(self) -> float:
+        return self.table.columns[FoodNutritionFeatures.PROTEIN.value][self.position]
+
+    @property
+    def min_meals(self) -> int:
+        return self.table.min_meals
+
+    @property
+    def max_meals(self) -> int:
+        return self.table.max_meals
+
+    def to_nutrition(self) -> Nutrition:
+        return Nutrition(item=self.item,
+                         calories=self.calories,
+                         fiber=self.fiber,
+                         fat=self.fat,
+                         carb=self.carb,
+                         protein=self.protein,
+                         min_meals=self.min_meals,
+                         max_meals=self.max_meals)
+
+
+class NutritionTable:
+    """
+    Struct-of-arrays menu: one 1-D float array per nutrient in `columns` and the menu item names interned into a pool
+    of unique `names` referenced by `name_codes` (-1 for a missing name).  Converting from and to the ETL `DataFrame`
+    shares the nutrient arrays instead of copying them, and `save` / `load` persist every array as `.npy` so a large
+    catalog can be memory-mapped instead of read.
+    """
+    def __init__(self,
+                 columns: Dict[str, np.ndarray],
+                 names: np.ndarray,
+                 name_codes: np.ndarray,
+                 min_meals: int = 1,
+                 max_meals: int = 3):
+        if any(len(columns[nutrient]) != len(name_codes) for nutrient in NUTRIENTS):
+            raise ValueError("Every nutrient column must have one value per menu item")
+
+        self.columns = {nutrient: columns[nutrient] for nutrient in NUTRIENTS}
+        self.names = names
+        self.name_codes = name_codes
+        self.min_meals = min_meals
+        self.max_meals = max_meals
+
+    def __len__(self) -> int:
+        return len(self.name_codes)
+
+    def __getitem__(self, position: int) -> NutritionRow:
+        if not -len(self) <= position < len(self):
+            raise IndexError(f"Menu item position {position} is out of range")
+
+        return NutritionRow(self, position % len(self))
+
+    def __iter__(self) -> Iterator[NutritionRow]:
+        return (NutritionRow(self, position) for position in range(len(self)))
+
+    def get_name(self, position: int) -> Optional[str]:
+        name_code = self.name_codes[position]
+
+        return str(self.names[name_code]) if name_code >= 0 else None
+
+    @staticmethod
+    def from_frame(menu: "DataFrame",
+                   dtype: Optional[str] = None,
+                   min_meals: int = 1,
+                   max_meals: int = 3) -> "NutritionTable":
+        """
+        Builds a table from a menu with the `MENU_COLUMNS`.  The nutrient arrays are views of the menu columns unless a
+        different `dtype` (e.g. float32) is requested.
+        """
+        import pandas as pd
+
+        name_codes, names = pd.factorize(menu[FoodNutritionFeatures.MENU_ITEM.value])
+        columns = {nutrient: menu[nutrient].to_numpy(dtype=dtype, copy=False) for nutrient in NUTRIENTS}
+
+        return NutritionTable(columns, names.to_numpy(dtype=str), name_codes.astype(np.int32), min_meals, max_meals)
+
+    @staticmethod
+    def from_nutritions(nutritions: List[Nutrition], dtype: str = FLOAT) -> "NutritionTable":
+        from pandas import DataFrame
+
+        menu = DataFrame({FoodNutritionFeatures.MENU_ITEM.value: [nutrition.item for nutrition in nutritions],
+                          FoodNutritionFeatures.CALORIES.value: [nutrition.calories for nutrition in nutritions],
+                          FoodNutritionFeatures.FAT.value: [nutrition.fat for nutrition in nutritions],
+                          FoodNutritionFeatures.CARBOHYDRATES.value: [nutrition.carb for nutrition in nutritions],
+                          FoodNutritionFeatures.FIBER.value: [nutrition.fiber for nutrition in nutritions],
+                          FoodNutritionFeatures.PROTEIN.value: [nutrition.protein for nutrition in nutritions]},
+                         columns=MENU_COLUMNS)
+        min_meals, max_meals = (nutritions[0].min_meals, nutritions[0].max_meals) if nutritions else (1, 3)
+
+        return NutritionTable.from_frame(menu, dtype, min_meals, max_meals)
+
+    def to_frame(self) -> "DataFrame":
+        """
+        Returns the menu with the `MENU_COLUMNS`.  The nutrient columns of the returned frame are views of the table
+        arrays; only the menu item names are decoded from the pool.
+        """
+        import pandas as pd
+
+        menu_items = pd.Categorical.from_codes(self.name_codes, self.names) \
+                       .astype(FoodNutritionMapping[FoodNutritionFeatures.MENU_ITEM.value][DATA_TYPE])
+        menu = {FoodNutritionFeatures.MENU_ITEM.value: menu_items}
+        menu.update(self.columns)
+
+        return pd.DataFrame(menu, columns=MENU_COLUMNS, copy=False)
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+
+        for nutrient, values in self.columns.items():
+            np.save(os.path.join(directory, f"{nutrient}.npy"), values)
+
+        np.save(os.path.join(directory, NAMES_FILE), self.names)
+        np.save(os.path.join(directory, NAME_CODES_FILE), self.name_codes)
+
+    @staticmethod
+    def load(directory: str,
+             mmap_mode: Optional[str] = "r",
+             min_meals: int = 1,
+             max_meals: int = 3) -> "NutritionTable":
+        """
+        Loads a table written by `save`.  With the default `mmap_mode` the arrays are memory-mapped read-only, so only
+        the pages that are actually touched are read from disk.
+        """
+        columns = {nutrient: np.load(os.path.join(directory, f"{nutrient}.npy"), mmap_mode=mmap_mode)
+                   for nutrient in NUTRIENTS}
+        names = np.load(os.path.join(directory, NAMES_FILE), mmap_mode=mmap_mode)
+        name_codes = np.load(os.path.join(directory, NAME_CODES_FILE), mmap_mode=mmap_mode)
+
+        return NutritionTable(columns, names, name_codes, min_meals, max_meals)
+
+
+@dataclass(frozen=True)
+class MenuSource:
+    """
+    Declarative description of a single menu CSV.  `columns` maps the source column names onto the food nutrition
+    features; only those columns (plus `menu_item_columns`) are ever parsed.  When the source has no single menu item
+    column, `menu_item_columns` are joined with a space to build it.  Cells matching `na_values` are parsed as missing.
+    """
+    name: str
+    file_name: str
+    columns: Dict[str, str]
+    encoding: Optional[str] = None
+    menu_item_columns: Tuple[str, ...] = ()
+    na_values: Tuple[str, ...] = ()
+    row_filters: Tuple[RowFilter, ...] = ()
+
+    @property
+    def usecols(self) -> List[str]:
+        return list(self.columns.keys()) + list(self.menu_item_columns)
+
+
+STARBUCKS = "starbucks"
+MCDONALDS = "mcdonalds"
+BURGER_KING = "burger_king"
+WENDYS = "wendys"
+CHICK_FILA = "chick_fila"
+
+STARBUCKS_DRINKS = "starbucks_drinks"
+STARBUCKS_FOOD = "starbucks_food"
+STARBUCKS_EXPANDED_DRINKS = "starbucks_expanded_drinks"
+
+
+MENU_CHAINS: Dict[str, List[MenuSource]] = {
+    STARBUCKS: [
+        MenuSource(name=STARBUCKS_DRINKS,
+                   file_name="starbucks/starbucks-menu-nutrition-drinks.csv",
+                   columns={"Unnamed: 0": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Fat (g)": FoodNutritionFeatures.FAT.value,
+                            "Carb. (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Fiber (g)": FoodNutritionFeatures.FIBER.value,
+                            "Protein": FoodNutritionFeatures.PROTEIN.value},
+                   na_values=("-",),
+                   row_filters=(RowFilter.DROP_ALL_NUTRIENTS_MISSING,)),
+        MenuSource(name=STARBUCKS_FOOD,
+                   file_name="starbucks/starbucks-menu-nutrition-food.csv",
+                   encoding="utf-16",
+                   columns={"Unnamed: 0": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Fat (g)": FoodNutritionFeatures.FAT.value,
+                            "Carb. (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Fiber (g)": FoodNutritionFeatures.FIBER.value,
+                            "Protein (g)": FoodNutritionFeatures.PROTEIN.value}),
+        MenuSource(name=STARBUCKS_EXPANDED_DRINKS,
+                   file_name="starbucks/starbucks_drinkMenu_expanded.csv",
+                   columns={"Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Total Fat (g)": FoodNutritionFeatures.FAT.value,
+                            "Total Carbohydrates (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Dietary Fibre (g)": FoodNutritionFeatures.FIBER.value,
+                            "Protein (g)": FoodNutritionFeatures.PROTEIN.value},
+                   menu_item_columns=("Beverage", "Beverage_prep"))
+    ],
+    MCDONALDS: [
+        MenuSource(name=MCDONALDS,
+                   file_name="mcdonalds/mcdonalds.csv",
+                   columns={"Item": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Total Fat": FoodNutritionFeatures.FAT.value,
+                            "Carbohydrates": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Dietary Fiber": FoodNutritionFeatures.FIBER.value,
+                            "Protein": FoodNutritionFeatures.PROTEIN.value})
+    ],
+    BURGER_KING: [
+        MenuSource(name=BURGER_KING,
+                   file_name="burger-king/burger-king.csv",
+                   columns={"Item": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Fat (g)": FoodNutritionFeatures.FAT.value,
+                            "Total Carb (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Dietary Fiber (g)": FoodNutritionFeatures.FIBER.value,
+                            "Protein (g)": FoodNutritionFeatures.PROTEIN.value})
+    ],
+    WENDYS: [
+        MenuSource(name=WENDYS,
+                   file_name="wendys/wendys.csv",
+                   columns={"Item": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Fat (g)": FoodNutritionFeatures.FAT.value,
+                            "Total Carb (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Dietary Fiber (g)": FoodNutritionFeatures.FIBER.value,
+                            "Protein (g)": FoodNutritionFeatures.PROTEIN.value})
+    ],
+    CHICK_FILA: [
+        MenuSource(name=CHICK_FILA,
+                   file_name="chick-fila/chick-fila.csv",
+                   columns={"Menu": FoodNutritionFeatures.MENU_ITEM.value,
+                            "Calories": FoodNutritionFeatures.CALORIES.value,
+                            "Fat (G)": FoodNutritionFeatures.FAT.value,
+                            "Carbohydrates (G)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                            "Fiber (G)": FoodNutritionFeatures.FIBER.value,
+                            "Protein (G)": FoodNutritionFeatures.PROTEIN.value})
+    ]
+}
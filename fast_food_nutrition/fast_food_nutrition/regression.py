@@ -0,0 +1,142 @@
+from collections import OrderedDict
+import hashlib
+from threading import Lock
+
+import numpy as np
+from pandas import DataFrame
+from typing import Callable, List, Tuple
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.analysis import TTest
+from fast_food_nutrition.model import NUTRIENTS, FoodIntakeScore, LinearRegressionFit, Sex, Test
+
+SLOPE = "slope"
+INTERCEPT = "intercept"
+R_VALUE = "r_value"
+P_VALUE = "p_value"
+STD_ERR = "std_err"
+
+
+class Regression:
+    """
+    Fits linear regressions once and keeps them in a bounded LRU cache keyed by a fingerprint of the columns involved,
+    so plotting, scoring and reporting the same menu reuse one fit.  Rows missing any of the columns are dropped.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.cache: OrderedDict = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fit_single(self, menu: DataFrame, features: List[str], target: str) -> DataFrame:
+        """
+        The simple regression of `target` on each feature, from one centered cross-product of all the features.
+        Returns the `scipy.stats.linregress` results (slope, intercept, r_value, p_value, std_err) indexed by feature.
+        """
+        return self.cached("single", menu, features, target, Regression.calculate_single_regressions)
+
+    def fit(self, menu: DataFrame, features: List[str], target: str) -> LinearRegressionFit:
+        return self.cached("multiple", menu, features, target, Regression.calculate_regression)
+
+    def fit_composite_score(self, menu: DataFrame, sex: Sex = Sex.COMBINE) -> LinearRegressionFit:
+        """
+        Multiple regression of the composite nutrition score on the nutrients.
+        """
+        scored_menu = NutritionCalculator.score_frame(menu, sex)
+
+        return self.fit(scored_menu, NUTRIENTS, FoodIntakeScore.COMPOSITE.value)
+
+    def cached(self,
+               kind: str,
+               menu: DataFrame,
+               features: List[str],
+               target: str,
+               calculate: Callable[[np.ndarray, np.ndarray, List[str], str], object]):
+        features = list(features)
+        X, y = Regression.get_design(menu, features, target)
+        key = (kind, Regression.fingerprint(X, y, features, target))
+
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+
+                return self.cache[key]
+
+            self.misses += 1
+
+        result = calculate(X, y, features, target)
+
+        with self.lock:
+            self.cache[key] = result
+
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+        return result
+
+    @staticmethod
+    def predict(fit: LinearRegressionFit, menu: DataFrame) -> np.ndarray:
+        return fit.intercept + menu[fit.features].to_numpy(dtype=np.float64) @ fit.coefficients
+
+    @staticmethod
+    def get_design(menu: DataFrame, features: List[str], target: str) -> Tuple[np.ndarray, np.ndarray]:
+        values = menu[features + [target]].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+
+        return values[:, :-1], values[:, -1]
+
+    @staticmethod
+    def fingerprint(X: np.ndarray, y: np.ndarray, features: List[str], target: str) -> str:
+        sha256 = hashlib.sha256("\0".join(features + [target]).encode())
+        sha256.update(np.ascontiguousarray(X).tobytes())
+        sha256.update(np.ascontiguousarray(y).tobytes())
+
+        return sha256.hexdigest()
+
+    @staticmethod
+    def calculate_single_regressions(X: np.ndarray, y: np.ndarray, features: List[str], target: str) -> DataFrame:
+        n = len(y)
+        df = n - 2
+        X_mean = X.mean(axis=0)
+        y_mean = y.mean()
+        X_centered = X - X_mean
+        y_centered = y - y_mean
+
+        s_xy = X_centered.T @ y_centered
+        s_xx = np.einsum("ij,ij->j", X_centered, X_centered)
+        s_yy = y_centered @ y_centered
+
+        # A constant feature has no slope nor correlation: NaN rather than a warning
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = s_xy / s_xx
+            r = np.clip(s_xy / np.sqrt(s_xx * s_yy), -1, 1)
+            t = r * np.sqrt(df / ((1 - r) * (1 + r)))
+            std_errs = np.sqrt((1 - r ** 2) * s_yy / s_xx / df)
+
+        return DataFrame({SLOPE: slopes,
+                          INTERCEPT: y_mean - slopes * X_mean,
+                          R_VALUE: r,
+                          P_VALUE: TTest.get_p_value_table_values(t, df, Test.TWO_TAILED),
+                          STD_ERR: std_errs},
+                         index=features)
+
+    @staticmethod
+    def calculate_regression(X: np.ndarray, y: np.ndarray, features: List[str], target: str) -> LinearRegressionFit:
+        design = np.column_stack((np.ones(len(y)), X))
+        # Least squares through the QR decomposition of the design matrix: R beta = Q^T y
+        Q, R = np.linalg.qr(design)
+        beta = np.linalg.solve(R, Q.T @ y)
+        residuals = y - design @ beta
+        y_centered = y - y.mean()
+
+        return LinearRegressionFit(features=features,
+                                   target=target,
+                                   intercept=float(beta[0]),
+                                   coefficients=beta[1:],
+                                   r_squared=float(1 - (residuals @ residuals) / (y_centered @ y_centered)),
+                                   n=len(y))
+
+
+REGRESSIONS = Regression()
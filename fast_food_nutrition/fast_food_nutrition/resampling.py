@@ -0,0 +1,189 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import time
+
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+from fast_food_nutrition.model import BootstrapResult, ExecutorType, PermutationTestResult, Test
+
+RESAMPLING_BATCH_SIZE = 1000
+RESAMPLING_SHARDS = 8
+
+# statistic_function(rng, n_resamples, *samples) -> one statistic per resample
+StatisticFunction = Callable[..., np.ndarray]
+
+
+class Resampling:
+    """
+    Nonparametric bootstrap confidence intervals and permutation tests for mean differences and correlations.
+
+    The resamples are drawn in batches of `batch_size` as 2-D index (or permutation) matrices, so every batch is a few
+    vectorized NumPy operations.  The `n_resamples` are split into `n_shards` shards, each seeded by its own child of
+    a `SeedSequence(seed)`, and the shards are mapped over the configured executor.  The shards do not depend on the
+    number of workers or the executor type, so a given seed always gives the same results.
+    """
+    def __init__(self,
+                 n_resamples: int = 10000,
+                 seed: Optional[int] = None,
+                 executor_type: ExecutorType = ExecutorType.PROCESS,
+                 max_workers: Optional[int] = None,
+                 n_shards: int = RESAMPLING_SHARDS,
+                 batch_size: int = RESAMPLING_BATCH_SIZE):
+        self.n_resamples = n_resamples
+        self.seed = seed
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.n_shards = n_shards
+        self.batch_size = batch_size
+
+    def bootstrap_mean_difference(self, x: np.ndarray, y: np.ndarray, alpha: float = 0.05) -> BootstrapResult:
+        x, y = Resampling.drop_missing(x), Resampling.drop_missing(y)
+
+        return self.bootstrap(Resampling.bootstrap_mean_differences, x.mean() - y.mean(), alpha, x, y)
+
+    def bootstrap_r(self, x: np.ndarray, y: np.ndarray, alpha: float = 0.05) -> BootstrapResult:
+        x, y = Resampling.drop_missing_pairs(x, y)
+
+        return self.bootstrap(Resampling.bootstrap_rs, np.corrcoef(x, y)[0, 1], alpha, x, y)
+
+    def permutation_test_mean_difference(self,
+                                         x: np.ndarray,
+                                         y: np.ndarray,
+                                         test: Test = Test.TWO_TAILED) -> PermutationTestResult:
+        """
+        Tests whether x and y have the same mean by shuffling the pooled values between the two samples.
+        """
+        x, y = Resampling.drop_missing(x), Resampling.drop_missing(y)
+
+        return self.permutation_test(Resampling.permuted_mean_differences, x.mean() - y.mean(), test,
+                                     np.concatenate([x, y]), len(x))
+
+    def permutation_test_r(self, x: np.ndarray, y: np.ndarray, test: Test = Test.TWO_TAILED) -> PermutationTestResult:
+        """
+        Tests whether x and y are uncorrelated by shuffling y against x.
+        """
+        x, y = Resampling.drop_missing_pairs(x, y)
+        x_centered = x - x.mean()
+        y_centered = y - y.mean()
+        y_standardized = y_centered / np.sqrt((x_centered ** 2).sum() * (y_centered ** 2).sum())
+
+        return self.permutation_test(Resampling.permuted_rs, x_centered @ y_standardized, test, x_centered,
+                                     y_standardized)
+
+    def bootstrap(self, statistic_function: StatisticFunction, statistic: float, alpha: float, *samples) -> BootstrapResult:
+        start = time.perf_counter()
+        statistics = self.resample(statistic_function, *samples)
+        ci_lower, ci_upper = np.percentile(statistics, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+
+        return BootstrapResult(statistic=float(statistic),
+                               ci_lower=float(ci_lower),
+                               ci_upper=float(ci_upper),
+                               n_resamples=self.n_resamples,
+                               elapsed_seconds=time.perf_counter() - start)
+
+    def permutation_test(self,
+                         statistic_function: StatisticFunction,
+                         statistic: float,
+                         test: Test,
+                         *samples) -> PermutationTestResult:
+        start = time.perf_counter()
+        statistics = self.resample(statistic_function, *samples)
+
+        if test == Test.TWO_TAILED:
+            extreme = np.abs(statistics) >= abs(statistic)
+        elif test == Test.LEFT_TAILED:
+            extreme = statistics <= statistic
+        elif test == Test.RIGHT_TAILED:
+            extreme = statistics >= statistic
+
+        # The observed arrangement counts as one of the permutations, so the p-value is never 0
+        p_value = (extreme.sum() + 1) / (self.n_resamples + 1)
+
+        return PermutationTestResult(statistic=float(statistic),
+                                     p_value=float(p_value),
+                                     n_resamples=self.n_resamples,
+                                     elapsed_seconds=time.perf_counter() - start)
+
+    def resample(self, statistic_function: StatisticFunction, *samples) -> np.ndarray:
+        shard_sizes = [len(shard) for shard in np.array_split(np.arange(self.n_resamples), self.n_shards)]
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(self.n_shards)
+        shards = [(statistic_function, samples, shard_size, seed_sequence, self.batch_size)
+                  for shard_size, seed_sequence in zip(shard_sizes, seed_sequences)]
+
+        if self.executor_type == ExecutorType.SERIAL:
+            return np.concatenate([Resampling.run_shard(*shard) for shard in shards])
+
+        with self.create_executor() as executor:
+            # Executor.map yields in submission order, so the shards are always concatenated in the same order
+            return np.concatenate(list(executor.map(Resampling.run_shard, *zip(*shards))))
+
+    def create_executor(self) -> Executor:
+        max_workers = self.max_workers if self.max_workers else self.n_shards
+
+        if self.executor_type == ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        elif self.executor_type == ExecutorType.THREAD:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unsupported executor type: {self.executor_type}")
+
+    @staticmethod
+    def run_shard(statistic_function: StatisticFunction,
+                  samples: Tuple[np.ndarray, ...],
+                  n_resamples: int,
+                  seed_sequence: np.random.SeedSequence,
+                  batch_size: int) -> np.ndarray:
+        rng = np.random.default_rng(seed_sequence)
+        batch_sizes = [min(batch_size, n_resamples - start) for start in range(0, n_resamples, batch_size)]
+
+        return np.concatenate([statistic_function(rng, size, *samples) for size in batch_sizes] + [np.empty(0)])
+
+    @staticmethod
+    def bootstrap_mean_differences(rng: np.random.Generator, n_resamples: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        x_means = x[rng.integers(0, len(x), (n_resamples, len(x)))].mean(axis=1)
+        y_means = y[rng.integers(0, len(y), (n_resamples, len(y)))].mean(axis=1)
+
+        return x_means - y_means
+
+    @staticmethod
+    def bootstrap_rs(rng: np.random.Generator, n_resamples: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        # The pairs are resampled together, one row of indices per resample
+        indices = rng.integers(0, len(x), (n_resamples, len(x)))
+        x_resampled = x[indices]
+        y_resampled = y[indices]
+        x_resampled -= x_resampled.mean(axis=1, keepdims=True)
+        y_resampled -= y_resampled.mean(axis=1, keepdims=True)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.einsum("ij,ij->i", x_resampled, y_resampled) / \
+                np.sqrt(np.einsum("ij,ij->i", x_resampled, x_resampled) * np.einsum("ij,ij->i", y_resampled, y_resampled))
+
+    @staticmethod
+    def permuted_mean_differences(rng: np.random.Generator, n_resamples: int, pooled: np.ndarray, n_x: int) -> np.ndarray:
+        permutations = rng.permuted(np.broadcast_to(np.arange(len(pooled)), (n_resamples, len(pooled))), axis=1)
+        x_sums = pooled[permutations[:, :n_x]].sum(axis=1)
+
+        return x_sums / n_x - (pooled.sum() - x_sums) / (len(pooled) - n_x)
+
+    @staticmethod
+    def permuted_rs(rng: np.random.Generator,
+                    n_resamples: int,
+                    x_centered: np.ndarray,
+                    y_standardized: np.ndarray) -> np.ndarray:
+        permutations = rng.permuted(np.broadcast_to(np.arange(len(x_centered)), (n_resamples, len(x_centered))), axis=1)
+
+        return y_standardized[permutations] @ x_centered
+
+    @staticmethod
+    def drop_missing(x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+
+        return x[~np.isnan(x)]
+
+    @staticmethod
+    def drop_missing_pairs(x: np.ndarray, y: np.ndarray) -> List[np.ndarray]:
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        present = ~(np.isnan(x) | np.isnan(y))
+
+        return [x[present], y[present]]
@@ -0,0 +1,238 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+from typing import Dict, List, Optional, Tuple
+
+from fast_food_nutrition.model import FoodNutritionFeatures, NutritionTable
+
+TOKEN_PATTERN = r"\w+"
+COMBINING_MARKS = r"[\u0300-\u036f]"
+GRAM_SIZE = 3
+GRAM_PADDING = "$"
+FUZZY_LIMIT = 10
+SEARCH_FILE_PREFIX = "search_"
+SEARCH_ARRAYS = ["tokens", "token_offsets", "token_names", "grams", "gram_offsets", "gram_tokens", "token_gram_counts",
+                 "name_offsets", "name_rows"]
+
+
+class MenuSearchIndex:
+    """
+    Search index over the menu item names of a menu, returning row positions into that menu.  Names are normalized
+    (accents stripped, case folded) and split into word tokens, so "grande caffe latte" finds "Grande Caffè Latte".
+
+    Everything is stored as sorted arrays with CSR-style offsets: the sorted token vocabulary is a flattened prefix
+    trie (the tokens sharing a prefix are one contiguous range, found by binary search) whose posting lists of name
+    ids are contiguous too, and the character trigrams of the vocabulary point back to the tokens for fuzzy matching.
+    Names are interned, so the many menu rows sharing a name cost one posting.  A query touches only the postings of
+    its own tokens instead of scanning the catalog, and `save` / `load` persist the arrays as `.npy` next to a saved
+    `NutritionTable` so the index can be memory-mapped rather than rebuilt.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.tokens = arrays["tokens"]
+        self.token_offsets = arrays["token_offsets"]
+        self.token_names = arrays["token_names"]
+        self.grams = arrays["grams"]
+        self.gram_offsets = arrays["gram_offsets"]
+        self.gram_tokens = arrays["gram_tokens"]
+        self.token_gram_counts = arrays["token_gram_counts"]
+        self.name_offsets = arrays["name_offsets"]
+        self.name_rows = arrays["name_rows"]
+
+    def __len__(self) -> int:
+        return len(self.name_rows)
+
+    @staticmethod
+    def from_frame(menu: DataFrame) -> "MenuSearchIndex":
+        name_codes, names = pd.factorize(menu[FoodNutritionFeatures.MENU_ITEM.value])
+
+        return MenuSearchIndex.from_names(names.to_numpy(dtype=str), name_codes)
+
+    @staticmethod
+    def from_table(table: NutritionTable) -> "MenuSearchIndex":
+        return MenuSearchIndex.from_names(np.asarray(table.names), table.name_codes)
+
+    @staticmethod
+    def from_names(names: np.ndarray, name_codes: np.ndarray) -> "MenuSearchIndex":
+        """
+        Builds the index from a pool of unique `names` and the `name_codes` of every row (-1 for a missing name), e.g.
+        the `names` / `name_codes` of a `NutritionTable`.
+        """
+        name_codes = np.asarray(name_codes)
+        arrays = {}
+
+        # Rows grouped by name; rows without a name are never returned
+        named_rows = np.flatnonzero(name_codes >= 0)
+        name_rows = named_rows[np.argsort(name_codes[named_rows], kind="stable")]
+        arrays["name_offsets"] = MenuSearchIndex.to_offsets(name_codes[name_rows], len(names))
+        arrays["name_rows"] = name_rows.astype(np.int64)
+
+        tokens = MenuSearchIndex.tokenize_names(Series(names, dtype=object))
+        # A name repeating a token posts it once
+        name_ids, tokens = tokens.index.to_numpy(), tokens.to_numpy(dtype=str)
+        token_codes, vocabulary = pd.factorize(tokens, sort=True)
+        order = np.lexsort((name_ids, token_codes))
+        token_codes, name_ids = token_codes[order], name_ids[order]
+        distinct = np.concatenate(([True], (np.diff(token_codes) != 0) | (np.diff(name_ids) != 0)))
+        arrays["tokens"] = np.asarray(vocabulary, dtype=str)
+        arrays["token_offsets"] = MenuSearchIndex.to_offsets(token_codes[distinct], len(vocabulary))
+        arrays["token_names"] = name_ids[distinct].astype(np.int32)
+
+        token_grams = [MenuSearchIndex.get_grams(token) for token in arrays["tokens"]]
+        grams = np.array([gram for grams in token_grams for gram in grams], dtype=str)
+        gram_token_ids = np.repeat(np.arange(len(token_grams), dtype=np.int32), [len(grams) for grams in token_grams])
+        gram_codes, gram_vocabulary = pd.factorize(grams, sort=True)
+        order = np.lexsort((gram_token_ids, gram_codes))
+        arrays["grams"] = np.asarray(gram_vocabulary, dtype=str)
+        arrays["gram_offsets"] = MenuSearchIndex.to_offsets(gram_codes[order], len(gram_vocabulary))
+        arrays["gram_tokens"] = gram_token_ids[order]
+        arrays["token_gram_counts"] = np.array([len(grams) for grams in token_grams], dtype=np.int32)
+
+        return MenuSearchIndex(arrays)
+
+    @staticmethod
+    def to_offsets(sorted_codes: np.ndarray, n_codes: int) -> np.ndarray:
+        return np.concatenate(([0], np.cumsum(np.bincount(sorted_codes, minlength=n_codes)))).astype(np.int64)
+
+    @staticmethod
+    def tokenize_names(names: Series) -> Series:
+        """
+        The normalized tokens of every name, indexed by the position of the name.
+        """
+        normalized = names.str.normalize("NFKD").str.replace(COMBINING_MARKS, "", regex=True).str.casefold()
+
+        return normalized.str.findall(TOKEN_PATTERN).explode().dropna()
+
+    @staticmethod
+    def tokenize(query: str) -> List[str]:
+        # Same normalization as `tokenize_names` without the pandas overhead on the query path
+        normalized = re.sub(COMBINING_MARKS, "", unicodedata.normalize("NFKD", query)).casefold()
+
+        return re.findall(TOKEN_PATTERN, normalized)
+
+    @staticmethod
+    def get_grams(token: str) -> List[str]:
+        padded = f"{GRAM_PADDING}{token}{GRAM_PADDING}"
+
+        return sorted({padded[i:i + GRAM_SIZE] for i in range(max(len(padded) - GRAM_SIZE + 1, 1))})
+
+    def search(self, query: str, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Rows matching every token of `query`, falling back to token prefixes (type-ahead) and then to fuzzy matching
+        when nothing matches exactly.  The fuzzy fallback returns at most `FUZZY_LIMIT` rows without a `limit`.
+        """
+        for search in (self.search_tokens, self.search_prefix):
+            positions = search(query)
+
+            if len(positions):
+                return positions[:limit]
+
+        limit = FUZZY_LIMIT if limit is None else limit
+        positions, _ = self.search_fuzzy(query, limit)
+
+        return positions[:limit]
+
+    def search_tokens(self, query: str) -> np.ndarray:
+        """
+        Sorted positions of the rows whose name contains every token of `query`.
+        """
+        return self.match(query, prefix=False)
+
+    def search_prefix(self, query: str) -> np.ndarray:
+        """
+        Sorted positions of the rows whose name has, for every token of `query`, a token starting with it.
+        """
+        return self.match(query, prefix=True)
+
+    def search_fuzzy(self, query: str,
+                     limit: Optional[int] = FUZZY_LIMIT,
+                     min_similarity: float = 0.4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions of the rows of the `limit` names most similar to `query`, with their similarity in [0, 1].  Each
+        query token is matched to the closest token of a name by the Dice coefficient of their trigrams, and a name
+        scores the average over the query tokens; names scoring below `min_similarity` are left out.
+        """
+        query_tokens = MenuSearchIndex.tokenize(query)
+        scores = np.zeros(len(self.name_offsets) - 1)
+
+        for token in query_tokens:
+            token_ids, similarities = self.match_grams(token, min_similarity)
+            name_scores = np.zeros_like(scores)
+            name_ids, name_similarities = self.get_token_names(token_ids, similarities)
+            np.maximum.at(name_scores, name_ids, name_similarities)
+            scores += name_scores
+
+        scores /= max(len(query_tokens), 1)
+        name_ids = np.flatnonzero(scores >= min_similarity) if query_tokens else np.empty(0, dtype=np.int64)
+        name_ids = name_ids[np.argsort(-scores[name_ids], kind="stable")][:limit]
+
+        return self.get_rows(name_ids), np.repeat(scores[name_ids], np.diff(self.name_offsets)[name_ids])
+
+    def match(self, query: str, prefix: bool) -> np.ndarray:
+        name_ids = None
+
+        for token in MenuSearchIndex.tokenize(query):
+            start = np.searchsorted(self.tokens, token, side="left")
+            # Tokens sharing a prefix are contiguous in the sorted vocabulary, and so are their postings
+            end = np.searchsorted(self.tokens, token + "\U0010ffff", side="left") if prefix else \
+                  start + int(start < len(self.tokens) and self.tokens[start] == token)
+            token_name_ids = np.unique(self.token_names[self.token_offsets[start]:self.token_offsets[end]])
+            name_ids = token_name_ids if name_ids is None else np.intersect1d(name_ids, token_name_ids,
+                                                                              assume_unique=True)
+
+            if len(name_ids) == 0:
+                break
+
+        if name_ids is None:
+            return np.empty(0, dtype=np.int64)
+
+        return np.sort(self.get_rows(name_ids))
+
+    def match_grams(self, token: str, min_similarity: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tokens of the vocabulary sharing trigrams with `token` and their Dice similarity, at least `min_similarity`.
+        """
+        grams = np.array(MenuSearchIndex.get_grams(token), dtype=str)
+        gram_ids = np.searchsorted(self.grams, grams)
+        gram_ids = gram_ids[(gram_ids < len(self.grams)) & (self.grams[np.minimum(gram_ids, len(self.grams) - 1)] == grams)]
+        token_ids = np.concatenate([self.gram_tokens[self.gram_offsets[gram_id]:self.gram_offsets[gram_id + 1]]
+                                    for gram_id in gram_ids] + [np.empty(0, dtype=np.int32)])
+        token_ids, shared = np.unique(token_ids, return_counts=True)
+        similarities = 2 * shared / (len(grams) + self.token_gram_counts[token_ids])
+        matched = similarities >= min_similarity
+
+        return token_ids[matched], similarities[matched]
+
+    def get_token_names(self, token_ids: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        lengths = self.token_offsets[token_ids + 1] - self.token_offsets[token_ids]
+
+        return self.token_names[MenuSearchIndex.get_ranges(self.token_offsets[token_ids], lengths)], np.repeat(values, lengths)
+
+    def get_rows(self, name_ids: np.ndarray) -> np.ndarray:
+        lengths = self.name_offsets[name_ids + 1] - self.name_offsets[name_ids]
+
+        return self.name_rows[MenuSearchIndex.get_ranges(self.name_offsets[name_ids], lengths)]
+
+    @staticmethod
+    def get_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        The concatenation of range(start, start + length) for every start and length.
+        """
+        ends = np.cumsum(lengths)
+
+        return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths - starts, lengths)
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+
+        for name in SEARCH_ARRAYS:
+            np.save(os.path.join(directory, f"{SEARCH_FILE_PREFIX}{name}.npy"), getattr(self, name))
+
+    @staticmethod
+    def load(directory: str, mmap_mode: Optional[str] = "r") -> "MenuSearchIndex":
+        return MenuSearchIndex({name: np.load(os.path.join(directory, f"{SEARCH_FILE_PREFIX}{name}.npy"),
+                                              mmap_mode=mmap_mode)
+                                for name in SEARCH_ARRAYS})
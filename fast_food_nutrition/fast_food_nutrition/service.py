@@ -0,0 +1,412 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+import json
+import time
+
+import numpy as np
+from pandas import DataFrame
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.analysis import MultipleComparison, TTest, ZTest
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import (CHAIN,
+                                       CI_LOWER,
+                                       CI_UPPER,
+                                       CONCLUSION,
+                                       MENU_COLUMNS,
+                                       P_VALUE,
+                                       STATISTIC,
+                                       ExecutorType,
+                                       FoodIntakeScore,
+                                       FoodNutritionFeatures,
+                                       MultipleComparisonCorrection,
+                                       Sex,
+                                       Test)
+from fast_food_nutrition.search import MenuSearchIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BATCH_SIZE = 256
+MAX_BATCH_DELAY = 0.002
+LATENCY_WINDOW = 10000
+POSITIONS = "positions"
+HYPOTHESIS_TESTS = {"proportion": (ZTest.calculate_proportion_batch, ["p0", "x", "n"]),
+                    "mean": (ZTest.calculate_mean_batch, ["x_bar", "mu", "sigma", "n"]),
+                    "two_means": (TTest.calculate_two_means_batch,
+                                  ["x_bar_1", "x_bar_2", "mu_1", "mu_2", "sigma_1", "sigma_2", "n_1", "n_2"])}
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the last `window` requests of every endpoint and reports their p50 / p99.
+    """
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.latencies: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+
+        for endpoint, latencies in self.latencies.items():
+            p50, p99 = np.percentile(np.fromiter(latencies, dtype=np.float64), [50, 99]) * 1000
+            summary[endpoint] = {"count": self.counts[endpoint], "p50_ms": p50, "p99_ms": p99}
+
+        return summary
+
+
+class MicroBatcher:
+    """
+    Coalesces the payloads submitted by concurrent requests into one call of `process`, which maps a list of payloads
+    to the list of their results.  A batch is flushed when it reaches `max_batch_size` or `max_delay` seconds after
+    its first payload, and runs on `executor` (or inline without one) so the event loop keeps accepting requests.
+    """
+    def __init__(self,
+                 process: Callable[[List[Any]], List[Any]],
+                 executor: Optional[Executor] = None,
+                 max_batch_size: int = MAX_BATCH_SIZE,
+                 max_delay: float = MAX_BATCH_DELAY):
+        self.process = process
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.batch: List[Tuple[Any, asyncio.Future]] = []
+        self.n_batches = 0
+        self.n_payloads = 0
+
+    async def submit(self, payload: Any) -> Any:
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.get_running_loop().create_task(self.run())
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((payload, future))
+
+        return await future
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self.batch = batch = [await self.queue.get()]
+
+            if self.queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_delay)
+
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            payloads = [payload for payload, _ in batch]
+            self.n_batches += 1
+            self.n_payloads += len(payloads)
+
+            try:
+                if self.executor is None:
+                    results = self.process(payloads)
+                else:
+                    results = await loop.run_in_executor(self.executor, self.process, payloads)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+            self.batch = []
+
+    def close(self) -> None:
+        """
+        Stops the worker and fails the payloads still queued or in flight, so that no request waits on a batch that will
+        never run.
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+        pending, self.batch = self.batch, []
+
+        while self.queue is not None and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("The batcher was closed"))
+
+
+class MenuService:
+    """
+    Local asyncio HTTP/1.1 service answering JSON queries against a menu that is loaded, scored and indexed once.
+
+    * `POST /score` scores `items` (menu items with the `MENU_COLUMNS`) or looks up the `positions` of menu items.
+    * `POST /rank` returns the `k` menu items with the lowest (or highest) `score`, optionally within a `chain`.
+    * `POST /search` returns the menu items matching `query` through the `MenuSearchIndex`.
+    * `POST /test` runs a batch of `proportion`, `mean` or `two_means` hypothesis tests, optionally corrected.
+    * `GET /stats` reports the p50 / p99 latency of every endpoint and the micro-batching efficiency.
+
+    Scoring and hypothesis tests submitted by concurrent requests are micro-batched into single vectorized calls that
+    run on the executor.  The service binds to localhost by default and never reaches out to the network.
+    """
+    def __init__(self,
+                 menu: Optional[DataFrame] = None,
+                 executor_type: ExecutorType = ExecutorType.THREAD,
+                 max_workers: Optional[int] = None,
+                 max_batch_size: int = MAX_BATCH_SIZE,
+                 max_delay: float = MAX_BATCH_DELAY):
+        self.menu = FastFoodMenuETL().load_menu_items_with_chain() if menu is None else menu.reset_index(drop=True)
+        self.menu_items = self.menu[FoodNutritionFeatures.MENU_ITEM.value].to_numpy(dtype=object)
+        self.chains = self.menu[CHAIN].to_numpy(dtype=object) if CHAIN in self.menu.columns else None
+        self.scores = {sex: NutritionCalculator.score_frame(self.menu[MENU_COLUMNS], sex) for sex in Sex}
+        self.rankings = {(sex, score.value): np.argsort(scores[score.value].to_numpy(), kind="stable")
+                         for sex, scores in self.scores.items() for score in FoodIntakeScore}
+        self.search_index = MenuSearchIndex.from_frame(self.menu)
+        self.executor_type = executor_type
+        self.executor = self.create_executor(max_workers)
+        self.score_batcher = MicroBatcher(_score_items, self.executor, max_batch_size, max_delay)
+        self.test_batchers = {kind: MicroBatcher(partial(_run_hypothesis_tests, kind), self.executor, max_batch_size,
+                                                 max_delay)
+                              for kind in HYPOTHESIS_TESTS}
+        self.latencies = LatencyTracker()
+        self.routes = {("POST", "/score"): self.score,
+                       ("POST", "/rank"): self.rank,
+                       ("POST", "/search"): self.search,
+                       ("POST", "/test"): self.test,
+                       ("GET", "/stats"): self.stats}
+
+    def create_executor(self, max_workers: Optional[int]) -> Optional[Executor]:
+        if self.executor_type == ExecutorType.SERIAL:
+            return None
+        elif self.executor_type == ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        elif self.executor_type == ExecutorType.THREAD:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unsupported executor type: {self.executor_type}")
+
+    async def score(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        sex = Sex(request.get("sex", Sex.COMBINE.value))
+
+        if POSITIONS in request:
+            positions = np.asarray(request[POSITIONS], dtype=np.intp)
+
+            if positions.ndim != 1 or ((positions < 0) | (positions >= len(self.menu))).any():
+                raise IndexError(f"Unsupported positions: {request[POSITIONS]}")
+
+            scores = self.scores[sex].iloc[positions]
+
+            return {POSITIONS: positions.tolist(),
+                    FoodNutritionFeatures.MENU_ITEM.value: self.menu_items[positions].tolist(),
+                    **{score.value: to_json(scores[score.value].to_numpy()) for score in FoodIntakeScore}}
+
+        items = request["items"]
+
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise TypeError(f"Unsupported items: {items!r}, expected a list of objects")
+
+        menu_items = [item.get(FoodNutritionFeatures.MENU_ITEM.value) for item in items]
+        nutrients = np.array([[item[column] for column in MENU_COLUMNS[1:]] for item in items], dtype=np.float64)
+
+        return await self.score_batcher.submit((sex, menu_items, nutrients.reshape(len(items), len(MENU_COLUMNS) - 1)))
+
+    async def rank(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        sex = Sex(request.get("sex", Sex.COMBINE.value))
+        score = FoodIntakeScore(request.get("score", FoodIntakeScore.COMPOSITE.value)).value
+        k = int(request.get("k", 10))
+
+        if k < 0:
+            raise ValueError(f"Unsupported k: {k}")
+
+        ranking = self.rankings[(sex, score)]
+        scores = self.scores[sex][score].to_numpy()
+        ranking = ranking[~np.isnan(scores[ranking])]
+
+        if request.get("descending", False):
+            ranking = ranking[::-1]
+
+        if request.get("chain") is not None:
+            if self.chains is None:
+                raise ValueError("The menu has no chain column")
+
+            ranking = ranking[self.chains[ranking] == request["chain"]]
+
+        positions = ranking[:k]
+
+        return {POSITIONS: positions.tolist(),
+                FoodNutritionFeatures.MENU_ITEM.value: self.menu_items[positions].tolist(),
+                score: to_json(scores[positions])}
+
+    async def search(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        positions = self.search_index.search(str(request["query"]), request.get("limit"))
+
+        return {POSITIONS: positions.tolist(), FoodNutritionFeatures.MENU_ITEM.value: self.menu_items[positions].tolist()}
+
+    async def test(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        kind = request["test"]
+
+        if kind not in HYPOTHESIS_TESTS:
+            raise ValueError(f"Unsupported hypothesis test: {kind}")
+
+        _, arguments = HYPOTHESIS_TESTS[kind]
+        cases = [np.atleast_1d(np.asarray(request["cases"][argument], dtype=np.float64)) for argument in arguments]
+        tests = np.array([Test(test) for test in np.atleast_1d(request.get("tests", Test.TWO_TAILED.value))], dtype=object)
+        alpha = np.atleast_1d(np.asarray(request.get("alpha", 0.05), dtype=np.float64))
+        cases = [np.ascontiguousarray(values) for values in np.broadcast_arrays(*cases, tests, alpha)]
+        correction = request.get("correction")
+
+        if correction is not None:
+            if len(np.unique(alpha)) != 1:
+                raise ValueError("A multiple comparison correction needs a single alpha")
+
+            correction = MultipleComparisonCorrection(correction)
+
+        return await self.test_batchers[kind].submit((cases, correction))
+
+    async def stats(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        batchers = {"score": self.score_batcher, **{f"test/{kind}": batcher for kind, batcher in self.test_batchers.items()}}
+
+        return {"latency": self.latencies.summary(),
+                "batches": {name: {"batches": batcher.n_batches, "requests": batcher.n_payloads}
+                            for name, batcher in batchers.items()}}
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        start = time.perf_counter()
+        endpoint = self.routes.get((method, path))
+
+        if endpoint is None:
+            status = HTTPStatus.METHOD_NOT_ALLOWED if any(route_path == path for _, route_path in self.routes) \
+                     else HTTPStatus.NOT_FOUND
+            return status, {"error": status.phrase}
+
+        try:
+            response = await endpoint(json.loads(body) if body else {})
+            status = HTTPStatus.OK
+        except (KeyError, TypeError, ValueError, IndexError) as error:
+            status, response = HTTPStatus.BAD_REQUEST, {"error": f"{type(error).__name__}: {error}"}
+        except Exception as error:
+            status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(error).__name__}: {error}"}
+
+        self.latencies.record(path, time.perf_counter() - start)
+
+        return status, response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+
+                if not request_line.strip():
+                    break
+
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+
+                while True:
+                    line = await reader.readline()
+
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response = await self.dispatch(method, target.split("?", 1)[0], body)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                payload = json.dumps(response).encode()
+
+                writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        server = await self.start(host, port)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def run(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        asyncio.run(self.serve(host, port))
+
+    def close(self) -> None:
+        for batcher in [self.score_batcher, *self.test_batchers.values()]:
+            batcher.close()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def to_json(values: np.ndarray) -> List[Optional[float]]:
+    # JSON has no NaN
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+def _score_items(payloads: List[Tuple[Sex, List[Optional[str]], np.ndarray]]) -> List[Dict[str, Any]]:
+    """
+    Scores the items of a batch of requests with one `score_frame` call per sex.
+    """
+    results = [None] * len(payloads)
+
+    for sex in {sex for sex, _, _ in payloads}:
+        requests = [i for i, (request_sex, _, _) in enumerate(payloads) if request_sex == sex]
+        menu = DataFrame(np.concatenate([payloads[i][2] for i in requests]), columns=MENU_COLUMNS[1:])
+        scores = NutritionCalculator.score_frame(menu, sex)
+        offsets = np.cumsum([0] + [len(payloads[i][2]) for i in requests])
+
+        for i, start, stop in zip(requests, offsets[:-1], offsets[1:]):
+            results[i] = {FoodNutritionFeatures.MENU_ITEM.value: payloads[i][1],
+                          **{score.value: to_json(scores[score.value].to_numpy()[start:stop]) for score in FoodIntakeScore}}
+
+    return results
+
+
+def _run_hypothesis_tests(kind: str,
+                          payloads: List[Tuple[List[np.ndarray], Optional[MultipleComparisonCorrection]]]) -> List[Dict[str, Any]]:
+    """
+    Runs the hypothesis tests of a batch of requests in one call of the batch test of `kind`.  Every request is its
+    own family for the multiple comparison correction.
+    """
+    calculate, _ = HYPOTHESIS_TESTS[kind]
+    *arguments, tests, alpha = [np.concatenate(columns) for columns in zip(*[cases for cases, _ in payloads])]
+    results = calculate(*arguments, tests=tests, alpha=alpha)
+    offsets = np.cumsum([0] + [len(cases[0]) for cases, _ in payloads])
+    responses = []
+
+    for (cases, correction), start, stop in zip(payloads, offsets[:-1], offsets[1:]):
+        request_results = results[start:stop]
+
+        if correction is not None:
+            request_results = MultipleComparison.correct(request_results, float(cases[-1][0]), correction)
+
+        responses.append({STATISTIC: to_json(request_results[STATISTIC]),
+                          P_VALUE: to_json(request_results[P_VALUE]),
+                          CI_LOWER: to_json(request_results[CI_LOWER]),
+                          CI_UPPER: to_json(request_results[CI_UPPER]),
+                          CONCLUSION: request_results[CONCLUSION].tolist()})
+
+    return responses
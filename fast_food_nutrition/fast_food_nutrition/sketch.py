@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+from typing import List, Optional, Union
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch.  Values are kept in a hierarchy of compactors where an item of level h stands for 2^h values;
+    when a level outgrows its capacity it is sorted and every other item (from a random offset) is promoted to the
+    next level.  The memory is O(k log(n / k)) and a quantile is off by about 1.7 / k in rank (1% for the default
+    k = 200), whatever the order of the values.  Sketches built over different chunks or workers `merge` into the
+    sketch of the whole data with the same guarantee.
+    """
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.compactors: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+
+    def update(self, values: Union[np.ndarray, List[float]]) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.count += len(values)
+        self.compress()
+
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for level, items in enumerate(other.compactors):
+            if level == len(self.compactors):
+                self.compactors.append(np.empty(0))
+
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+
+        self.count += other.count
+        self.compress()
+
+        return self
+
+    def capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def compress(self) -> None:
+        level = 0
+
+        while level < len(self.compactors):
+            items = self.compactors[level]
+
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+
+                items = np.sort(items)
+                # An odd item out stays behind so the promoted items carry exactly twice the weight
+                kept, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self.rng.integers(2)::2]
+
+                self.compactors[level] = kept
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+
+            level += 1
+
+    def quantile(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Returns the value of (approximate) rank `q` * n for each `q` in [0, 1], or NaN if the sketch is empty.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.compactors)])
+        order = np.argsort(items, kind="stable")
+        cumulative_weights = np.cumsum(weights[order])
+        ranks = np.asarray(q) * cumulative_weights[-1]
+        positions = np.minimum(np.searchsorted(cumulative_weights, ranks, side="left"), len(items) - 1)
+
+        return items[order][positions]
@@ -1,52 +1,190 @@
-import matplotlib.pyplot as plt
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import io
+import os
+
+import numpy as np
 from pandas import DataFrame
-from scipy.stats import linregress
-from sklearn.linear_model import LinearRegression
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from fast_food_nutrition.analysis import Outliers
+from fast_food_nutrition.model import (CHAIN,
+                                       COLOR,
+                                       ExecutorType,
+                                       FigureType,
+                                       FoodNutritionFeatures,
+                                       FoodNutritionMapping,
+                                       RenderFormat,
+                                       ScatterMode)
+from fast_food_nutrition.regression import INTERCEPT, REGRESSIONS, SLOPE, Regression
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 
-from fast_food_nutrition.model import COLOR, FoodNutritionFeatures, FoodNutritionMapping
+FIGURE_SIZES = {FigureType.SCATTER_PLOTS: (15, 15),
+                FigureType.BOX_PLOT: (20, 5),
+                FigureType.HISTOGRAM_PLOTS: (20, 5),
+                FigureType.SINGLE_LINEAR_REGRESSION: (15, 10),
+                FigureType.MULTI_LINEAR_REGRESSION: (10, 6)}
+DENSITY_BINS = 64
+DENSITY_SAMPLE_SIZE = 10000
+POSITION = "position"
 
 
 class FastFoodNutritionVisualizer:
+    """
+    Every figure is drawn by a `draw_*` method onto a given `Figure`.  The `generate_*` methods draw onto a pyplot
+    figure and show it, as in a notebook; `render` draws onto a standalone Agg figure that never touches pyplot or a
+    GUI backend and returns the PNG/SVG bytes or writes them to a file, so it can run in batch jobs and worker processes.
+    """
+    @staticmethod
+    def generate_scatter_plots(menu: DataFrame, mode: ScatterMode = ScatterMode.MARKERS, **options: Any):
+        FastFoodNutritionVisualizer.show(FigureType.SCATTER_PLOTS, menu, mode=mode, **options)
 
     @staticmethod
-    def generate_scatter_plots(menu: DataFrame):
+    def draw_scatter_plots(fig: "Figure",
+                           menu: DataFrame,
+                           mode: ScatterMode = ScatterMode.MARKERS,
+                           bins: int = DENSITY_BINS,
+                           sample_size: int = DENSITY_SAMPLE_SIZE,
+                           by: Optional[str] = None,
+                           seed: Optional[int] = None):
+        """
+        `ScatterMode.MARKERS` draws every row.  For large menus, `ScatterMode.HISTOGRAM_2D` bins every variable once and
+        draws each pair as a `bins` x `bins` count image, and `ScatterMode.HEXBIN` as hexagonal bins, so the drawing
+        cost does not grow with the number of rows.  `ScatterMode.SAMPLED` draws the markers of at most about
+        `sample_size` rows: every Tukey outlier plus a sample of the other rows stratified by `by` (e.g. the chain).
+        """
+        from matplotlib.colors import LinearSegmentedColormap, LogNorm
+
+        if mode == ScatterMode.SAMPLED:
+            menu = FastFoodNutritionVisualizer.sample_menu(menu, sample_size, by, seed)
+
         menu = FastFoodNutritionVisualizer.filter_menu(menu)
 
         variables = menu.columns
         n = len(variables)
 
-        fig, axes = plt.subplots(nrows=n, ncols=n, figsize=(15, 15))
+        # Shared axes let every cell reuse the tick locators and labels of its row and column
+        axes = fig.subplots(nrows=n, ncols=n, sharex="col", sharey="row", squeeze=False)
+        values = {variable: menu[variable].to_numpy(dtype=np.float64) for variable in variables}
+
+        if mode == ScatterMode.HISTOGRAM_2D:
+            bin_codes = {variable: FastFoodNutritionVisualizer.calculate_bin_codes(values[variable], bins)
+                         for variable in variables}
 
         for i, var1 in enumerate(variables):
+            color = FoodNutritionMapping[var1][COLOR]
+            # A single item is drawn in the variable color, as a marker would be, and denser bins darker
+            density_colors = LinearSegmentedColormap.from_list(var1, [color, "black"])
+
             for j, var2 in enumerate(variables):
-                if i == j:  # Diagonal: Plot a histogram
-                    axes[i, j].hist(menu[var1], color=[FoodNutritionMapping[var1][COLOR]])
+                if i == j:  # Diagonal: Plot a histogram on a twin axis so the counts keep their own y scale
+                    histogram_axes = axes[i, j].twinx()
+                    histogram_axes.hist(values[var1][~np.isnan(values[var1])], color=color)
+                    histogram_axes.set_yticks([])
+                elif mode == ScatterMode.HISTOGRAM_2D:  # Off-diagonal: Plot the pair counts as an image
+                    (x_codes, x_edges), (y_codes, y_edges) = bin_codes[var2], bin_codes[var1]
+                    counts = FastFoodNutritionVisualizer.calculate_pair_counts(x_codes, y_codes, bins)
+                    axes[i, j].imshow(np.ma.masked_equal(counts, 0),
+                                      extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+                                      origin="lower",
+                                      aspect="auto",
+                                      interpolation="nearest",
+                                      cmap=density_colors,
+                                      norm=LogNorm(vmin=1))
+                elif mode == ScatterMode.HEXBIN:
+                    axes[i, j].hexbin(values[var2], values[var1], gridsize=bins // 2, mincnt=1, bins="log",
+                                      cmap=density_colors)
                 else:  # Off-diagonal: Plot scatter
-                    axes[i, j].scatter(menu[var2], menu[var1], color=[FoodNutritionMapping[var1][COLOR]])
+                    # A marker-only line is a single artist, much cheaper to draw than a scatter collection
+                    axes[i, j].plot(values[var2], values[var1], linestyle="", marker="o", color=color)
                 if j == 0:  # Y-axis labels only on the first column
                     axes[i, j].set_ylabel(var1)
                 if i == n - 1:  # X-axis labels only on the last row
                     axes[i, j].set_xlabel(var2)
-                if i < n - 1:  # Remove x-axis labels for all but the last row
-                    axes[i, j].set_xticklabels([])
-                if j > 0:  # Remove y-axis labels for all but the first column
-                    axes[i, j].set_yticklabels([])
 
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+
+    @staticmethod
+    def calculate_bin_codes(values: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the bin of every value (-1 if missing) over `bins` equal-width bins spanning the values, and the edges.
+        """
+        present = ~np.isnan(values)
+        low, high = (values[present].min(), values[present].max()) if present.any() else (0.0, 1.0)
+        high = high if high > low else low + 1
+        edges = np.linspace(low, high, bins + 1)
+        codes = np.full(len(values), -1, dtype=np.int64)
+        codes[present] = np.clip(((values[present] - low) / (high - low) * bins).astype(np.int64), 0, bins - 1)
+
+        return codes, edges
+
+    @staticmethod
+    def calculate_pair_counts(x_codes: np.ndarray, y_codes: np.ndarray, bins: int) -> np.ndarray:
+        """
+        Counts of the (y, x) bin pairs as a `bins` x `bins` image, rows being y bins.
+        """
+        present = (x_codes >= 0) & (y_codes >= 0)
+
+        return np.bincount(y_codes[present] * bins + x_codes[present], minlength=bins * bins).reshape(bins, bins)
+
+    @staticmethod
+    def sample_menu(menu: DataFrame, sample_size: int, by: Optional[str] = None, seed: Optional[int] = None) -> DataFrame:
+        """
+        Keeps the rows outside the Tukey fences of any variable and samples the other rows, proportionally within each
+        group of `by` if given, so that about `sample_size` rows are left.  Skewed menus can have many outliers, so at
+        most half of `sample_size` are kept: the furthest from their fences.  The menu order is preserved.
+        """
+        variables = list(FastFoodNutritionVisualizer.filter_menu(menu).columns)
+        lower_bounds, upper_bounds = Outliers.calculate_fences(menu, variables)
+        values = menu[variables].to_numpy(dtype=np.float64)
+        # Distance outside the fences in IQRs (the fences are 4 IQRs apart)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distances = np.fmax(lower_bounds - values, values - upper_bounds) / ((upper_bounds - lower_bounds) / 4)
+
+        distances = np.nan_to_num(np.fmax.reduce(distances, axis=1, initial=0), nan=0, posinf=np.finfo(np.float64).max)
+        keep = distances > 0
+        n_outliers = min(keep.sum(), sample_size // 2)
+
+        if keep.sum() > n_outliers:
+            keep[:] = False
+            keep[np.argpartition(-distances, n_outliers)[:n_outliers]] = True
+
+        n_samples = sample_size - n_outliers
+
+        if len(menu) - keep.sum() <= n_samples:
+            return menu
+
+        candidates = DataFrame({POSITION: np.flatnonzero(~keep)})
+
+        if by is not None:
+            candidates[by] = menu[by].to_numpy()[~keep]
+            samples = candidates.groupby(by, observed=True).sample(frac=n_samples / len(candidates), random_state=seed)
+        else:
+            samples = candidates.sample(n=n_samples, random_state=seed)
+
+        keep[samples[POSITION].to_numpy()] = True
+
+        return menu[keep]
 
     @staticmethod
     def generate_box_plot(menu, merge=False):
+        FastFoodNutritionVisualizer.show(FigureType.BOX_PLOT, menu, merge=merge)
+
+    @staticmethod
+    def draw_box_plot(fig: "Figure", menu: DataFrame, merge=False):
+        menu = FastFoodNutritionVisualizer.filter_menu(menu)
         variables = menu.columns
         n = len(variables)
 
         if merge:
-            plt.figure(figsize=(20, 5))
-            plt.boxplot([menu[column] for column in variables], labels=variables, patch_artist=True)
-            plt.grid(True)
+            ax = fig.subplots()
+            ax.boxplot([menu[column] for column in variables], patch_artist=True)
+            ax.set_xticks(range(1, n + 1), variables)
+            ax.grid(True)
         else:
-            fig, axes = plt.subplots(1, n, figsize=(20, 5))
+            axes = fig.subplots(1, n, squeeze=False)[0]
 
             for i, (ax, column) in enumerate(zip(axes, variables)):
                 boxplot = ax.boxplot(menu[column], patch_artist=True)
@@ -63,45 +201,55 @@ class FastFoodNutritionVisualizer:
                 ax.set_title(column)
                 ax.grid(True)
 
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
 
     @staticmethod
     def generate_histogram_plots(menu: DataFrame):
+        FastFoodNutritionVisualizer.show(FigureType.HISTOGRAM_PLOTS, menu)
+
+    @staticmethod
+    def draw_histogram_plots(fig: "Figure", menu: DataFrame):
         menu = FastFoodNutritionVisualizer.filter_menu(menu)
         variables = menu.columns
         n = len(variables)
 
-        fig, axes = plt.subplots(1, n, figsize=(20, 5))
+        axes = fig.subplots(1, n, squeeze=False)[0]
 
         for ax, column in zip(axes, variables):
             ax.hist(menu[column], color=FoodNutritionMapping[column][COLOR], bins=20, edgecolor='black')
             ax.set_title(column)
             ax.grid(True)
 
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
 
     @staticmethod
     def filter_menu(menu: DataFrame) -> DataFrame:
-        if FoodNutritionFeatures.MENU_ITEM in menu.keys():
-            return menu.drop(FoodNutritionFeatures.MENU_ITEM, axis=1)
-        else:
-            return menu
+        columns = [column for column in [FoodNutritionFeatures.MENU_ITEM.value, CHAIN] if column in menu.keys()]
+
+        return menu.drop(columns, axis=1) if columns else menu
 
     @staticmethod
     def generate_single_linear_regression(menu: DataFrame, independent_vars: Dict[str, str], target_var: str) -> None:
-        # Setup the matplotlib figure and axes
-        fig, axes = plt.subplots(nrows=2, ncols=3, figsize=(15, 10))
+        FastFoodNutritionVisualizer.show(FigureType.SINGLE_LINEAR_REGRESSION,
+                                         menu,
+                                         independent_vars=independent_vars,
+                                         target_var=target_var)
+
+    @staticmethod
+    def draw_single_linear_regression(fig: "Figure", menu: DataFrame, independent_vars: Dict[str, str], target_var: str) -> None:
+        # Setup the axes
+        axes = fig.subplots(nrows=2, ncols=3)
         axes = axes.flatten()  # Flatten to easily index them
 
         # Remove the last subplot (since we have 5 variables and 6 subplots)
         fig.delaxes(axes[-1])
 
+        # Fit every simple regression at once (or reuse the cached fits)
+        regressions = REGRESSIONS.fit_single(menu, list(independent_vars.keys()), target_var)
+
         # Loop through each independent variable and create plots
         for i, var in enumerate(independent_vars.keys()):
-            # Perform linear regression
-            slope, intercept, r_value, p_value, std_err = linregress(menu[var], menu[target_var])
+            slope, intercept = regressions.loc[var, SLOPE], regressions.loc[var, INTERCEPT]
 
             # Generate values for the regression line
             line = slope * menu[var] + intercept
@@ -117,30 +265,124 @@ class FastFoodNutritionVisualizer:
             axes[i].legend()
 
         # Adjust layout
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
 
     @staticmethod
     def generate_multi_linear_regresssion(menu: DataFrame, independent_vars: Dict[str, str], target_var: str) -> None:
-        # Prepare the data
-        X = menu[independent_vars.keys()]
-        y = menu[target_var]
+        FastFoodNutritionVisualizer.show(FigureType.MULTI_LINEAR_REGRESSION,
+                                         menu,
+                                         independent_vars=independent_vars,
+                                         target_var=target_var)
 
-        # Create and fit the model
-        model = LinearRegression()
-        model.fit(X, y)
+    @staticmethod
+    def draw_multi_linear_regresssion(fig: "Figure", menu: DataFrame, independent_vars: Dict[str, str], target_var: str) -> None:
+        y = menu[target_var]
 
-        # Make predictions
-        y_pred = model.predict(X)
+        # Fit the model once (or reuse the cached fit) and make predictions
+        fit = REGRESSIONS.fit(menu, list(independent_vars.keys()), target_var)
+        y_pred = Regression.predict(fit, menu)
 
         # Plot actual vs predicted values
-        plt.figure(figsize=(10, 6))
-        plt.scatter(y, y_pred, alpha=0.5)
-        plt.plot([y.min(), y.max()], [y.min(), y.max()], '--r', linewidth=2)
-        plt.xlabel('Actual')
-        plt.ylabel('Predicted')
-        plt.title('Actual vs. Predicted Composite Intake Score')
+        ax = fig.subplots()
+        ax.scatter(y, y_pred, alpha=0.5)
+        ax.plot([y.min(), y.max()], [y.min(), y.max()], '--r', linewidth=2)
+        ax.set_xlabel('Actual')
+        ax.set_ylabel('Predicted')
+        ax.set_title('Actual vs. Predicted Composite Intake Score')
+
+    @staticmethod
+    def draw(fig: "Figure", figure_type: FigureType, menu: DataFrame, **options: Any) -> None:
+        if figure_type == FigureType.SCATTER_PLOTS:
+            FastFoodNutritionVisualizer.draw_scatter_plots(fig, menu, **options)
+        elif figure_type == FigureType.BOX_PLOT:
+            FastFoodNutritionVisualizer.draw_box_plot(fig, menu, **options)
+        elif figure_type == FigureType.HISTOGRAM_PLOTS:
+            FastFoodNutritionVisualizer.draw_histogram_plots(fig, menu, **options)
+        elif figure_type == FigureType.SINGLE_LINEAR_REGRESSION:
+            FastFoodNutritionVisualizer.draw_single_linear_regression(fig, menu, **options)
+        elif figure_type == FigureType.MULTI_LINEAR_REGRESSION:
+            FastFoodNutritionVisualizer.draw_multi_linear_regresssion(fig, menu, **options)
+        else:
+            raise ValueError(f"Unsupported figure type: {figure_type}")
+
+    @staticmethod
+    def show(figure_type: FigureType, menu: DataFrame, **options: Any) -> None:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=FIGURE_SIZES[figure_type])
+        FastFoodNutritionVisualizer.draw(fig, figure_type, menu, **options)
         plt.show()
 
+    @staticmethod
+    def render(figure_type: FigureType,
+               menu: DataFrame,
+               render_format: RenderFormat = RenderFormat.PNG,
+               path: Optional[str] = None,
+               **options: Any) -> Union[bytes, str]:
+        """
+        Draws the figure headlessly and returns its bytes, or writes them to `path` and returns the path.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=FIGURE_SIZES[figure_type])
+        FigureCanvasAgg(fig)
+        FastFoodNutritionVisualizer.draw(fig, figure_type, menu, **options)
+
+        if path is not None:
+            fig.savefig(path, format=render_format.value)
+
+            return path
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=render_format.value)
+
+        return buffer.getvalue()
+
+    @staticmethod
+    def render_by_chain(menu: DataFrame,
+                        figure_types: List[FigureType],
+                        output_dir: str,
+                        render_format: RenderFormat = RenderFormat.PNG,
+                        figure_options: Optional[Dict[FigureType, Dict[str, Any]]] = None,
+                        by: str = CHAIN,
+                        executor_type: ExecutorType = ExecutorType.PROCESS,
+                        max_workers: Optional[int] = None) -> Dict[Tuple[str, FigureType], str]:
+        """
+        Renders every (chain, figure type) combination to `output_dir`, one job per combination on the executor, and
+        returns the file of each combination.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        figure_options = figure_options or {}
+        jobs = {(chain, figure_type): (figure_type,
+                                       chain_menu.drop(columns=[by]),
+                                       render_format,
+                                       os.path.join(output_dir, f"{chain}_{figure_type.value}.{render_format.value}"),
+                                       figure_options.get(figure_type, {}))
+                for chain, chain_menu in menu.groupby(by, sort=False, observed=True)
+                for figure_type in figure_types}
+
+        if executor_type == ExecutorType.SERIAL:
+            paths = [_render(*job) for job in jobs.values()]
+        else:
+            with FastFoodNutritionVisualizer.create_executor(executor_type, max_workers) as executor:
+                paths = list(executor.map(_render, *zip(*jobs.values())))
+
+        return dict(zip(jobs.keys(), paths))
+
+    @staticmethod
+    def create_executor(executor_type: ExecutorType, max_workers: Optional[int]) -> Executor:
+        if executor_type == ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        elif executor_type == ExecutorType.THREAD:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unsupported executor type: {executor_type}")
 
 
+def _render(figure_type: FigureType,
+            menu: DataFrame,
+            render_format: RenderFormat,
+            path: str,
+            options: Dict[str, Any]) -> str:
+    return FastFoodNutritionVisualizer.render(figure_type, menu, render_format, path, **options)
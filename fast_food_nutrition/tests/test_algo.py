@@ -0,0 +1,219 @@
+import copy
+import itertools
+
+import numpy as np
+import pytest
+
+from fast_food_nutrition.algo import (DEVIATION,
+                                      ITEMS,
+                                      ROWS,
+                                      SCORE_DELTA,
+                                      SWAP_POSITION,
+                                      MealPlanner,
+                                      NutritionCalculator,
+                                      SwapIndex)
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import (CHAIN,
+                                       FOOD_INTAKE_CONF,
+                                       FOOD_INTAKE_FEATURES,
+                                       FoodIntakeScore,
+                                       FoodIntakeType,
+                                       FoodNutritionFeatures,
+                                       FoodRankingType,
+                                       NUTRIENTS,
+                                       STARBUCKS,
+                                       Nutrition,
+                                       Sex)
+
+MENU = FastFoodMenuETL().load_menu_items()
+
+
+def test_score_frame_matches_scalar_scores():
+    for sex in Sex:
+        scored_menu = NutritionCalculator.score_frame(MENU, sex)
+
+        for row in scored_menu.head(50).itertuples(index=False):
+            nutrition = Nutrition(item=row.menu_item,
+                                  calories=row.calories,
+                                  fiber=row.fiber,
+                                  fat=row.fat,
+                                  carb=row.carbohydrates,
+                                  protein=row.protein)
+
+            assert row.caloric_intake_score == NutritionCalculator.get_caloric_intake_score(nutrition, sex)
+            assert row.fat_intake_score == NutritionCalculator.get_fat_intake_score(nutrition, sex)
+            assert row.carbohydrate_intake_score == NutritionCalculator.get_carbohyrate_intake_score(nutrition, sex)
+            assert row.fiber_intake_score == NutritionCalculator.get_fiber_intake_score(nutrition, sex)
+            assert row.protein_intake_score == NutritionCalculator.get_protein_intake_score(nutrition, sex)
+            assert row.composite_nutrition_score == NutritionCalculator.get_composite_nutrition_score(nutrition, sex)
+
+
+def test_score_frame_returns_new_columns():
+    scored_menu = NutritionCalculator.score_frame(MENU, Sex.FEMALE)
+
+    assert list(scored_menu.columns) == list(MENU.columns) + [score.value for score in FoodIntakeScore]
+    assert FoodIntakeScore.COMPOSITE.value not in MENU.columns
+    assert np.isfinite(scored_menu[FoodIntakeScore.COMPOSITE.value]).all()
+
+
+def test_daily_food_intake_table():
+    daily_food_intake = NutritionCalculator.daily_food_intake
+
+    assert daily_food_intake.shape == (len(FoodIntakeType), len(Sex))
+    assert not daily_food_intake.flags.writeable
+    assert NutritionCalculator.get_daily_food_intake(FoodIntakeType.CALORIES, Sex.COMBINE) == 4250
+    assert NutritionCalculator.get_daily_food_intake(FoodIntakeType.CALORIES, Sex.MALE) == 4500
+    assert NutritionCalculator.get_daily_food_intake(FoodIntakeType.CALORIES, Sex.FEMALE) == 4000
+
+    with pytest.raises(ValueError):
+        daily_food_intake[0, 0] = 0
+
+
+def test_load_food_intake_conf():
+    nutrition = Nutrition(item="Baconator", calories=950, fiber=2, fat=62, carb=40, protein=59)
+    food_intake_conf = copy.deepcopy(FOOD_INTAKE_CONF)
+    food_intake_conf[FoodIntakeType.CALORIES][Sex.FEMALE][FoodRankingType.MAXIMUM] = 3200
+
+    try:
+        NutritionCalculator.load_food_intake_conf(food_intake_conf)
+        custom_score = NutritionCalculator.get_caloric_intake_score(nutrition, Sex.FEMALE)
+    finally:
+        NutritionCalculator.load_food_intake_conf(FOOD_INTAKE_CONF)
+
+    assert custom_score == pytest.approx(950 / 4400 / 3)
+    assert NutritionCalculator.get_caloric_intake_score(nutrition, Sex.FEMALE) == pytest.approx(950 / 4000 / 3)
+
+
+def test_meal_planner_matches_brute_force():
+    menu = MENU.sample(n=60, random_state=5310)
+    planner = MealPlanner(Sex.FEMALE)
+
+    actual_plan = planner.plan(menu, k=10)
+    expect_deviations = brute_force_deviations(menu, Sex.FEMALE, k=10)
+
+    assert np.allclose(actual_plan[DEVIATION].to_numpy(), expect_deviations)
+    assert all(1 <= len(items) <= 3 for items in actual_plan[ITEMS])
+
+
+def test_meal_planner_respects_ceilings():
+    plan = MealPlanner(Sex.FEMALE).plan(MENU, k=20)
+
+    assert len(plan) == 20
+    assert (plan[FoodNutritionFeatures.CALORIES.value] <= 2400).all()
+    assert (plan[FoodNutritionFeatures.FAT.value] <= 20).all()
+    assert plan[DEVIATION].is_monotonic_increasing
+
+
+def test_meal_planner_follows_calculator_targets():
+    menu = MENU.sample(n=40, random_state=7)
+    food_intake_conf = copy.deepcopy(FOOD_INTAKE_CONF)
+    food_intake_conf[FoodIntakeType.PROTEIN][Sex.FEMALE][FoodRankingType.MAXIMUM] = 400
+
+    try:
+        NutritionCalculator.load_food_intake_conf(food_intake_conf)
+        actual_plan = MealPlanner(Sex.FEMALE).plan(menu, k=5)
+        expect_deviations = brute_force_deviations(menu, Sex.FEMALE, k=5)
+    finally:
+        NutritionCalculator.load_food_intake_conf(FOOD_INTAKE_CONF)
+
+    assert np.allclose(actual_plan[DEVIATION].to_numpy(), expect_deviations)
+
+
+def test_meal_planner_rejects_invalid_k():
+    planner = MealPlanner(Sex.FEMALE)
+
+    for k in [0, -1]:
+        with pytest.raises(ValueError):
+            planner.plan(MENU, k)
+
+        with pytest.raises(ValueError):
+            planner.plan_by_chain(MENU.assign(**{CHAIN: "chain"}), k)
+
+
+def test_meal_planner_by_chain():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+    plan = MealPlanner(Sex.MALE, max_items=2).plan_by_chain(menu, k=3)
+
+    assert list(plan[CHAIN].unique()) == ["starbucks", "mcdonalds", "burger_king", "wendys", "chick_fila"]
+    assert (plan.groupby(CHAIN, sort=False).size() == 3).all()
+
+    for chain, rows in zip(plan[CHAIN], plan[ROWS]):
+        assert (menu.loc[list(rows), CHAIN] == chain).all()
+
+
+def brute_force_deviations(menu, sex: Sex, k: int) -> np.ndarray:
+    food_intake_types = [FoodIntakeType.CALORIES, FoodIntakeType.FAT, FoodIntakeType.CARBOHYDRATES,
+                         FoodIntakeType.FIBER, FoodIntakeType.PROTEIN]
+    targets = [NutritionCalculator.get_daily_food_intake(food_intake_type, sex) for food_intake_type in food_intake_types]
+    weights = [.35, .30, .20, .10, .05]
+    female = sex == Sex.FEMALE
+    rows = menu[[FOOD_INTAKE_FEATURES[food_intake_type] for food_intake_type in food_intake_types]].to_numpy()
+    deviations = []
+
+    for size in (1, 2, 3):
+        for combination in itertools.combinations(range(len(rows)), size):
+            totals = rows[list(combination)].sum(axis=0)
+            deviation = 0
+
+            for total, weight, target in zip(totals, weights, targets):
+                deviation += weight * abs(total / target - 1)
+
+            if totals[0] <= (2400 if female else 3000) and totals[1] <= (20 if female else 30):
+                deviations.append(deviation)
+
+    return np.sort(deviations)[:k]
+
+
+def brute_force_swap_distances(index, position, k, min_score_delta, same_chain=False):
+    swappable = index.valid & (index.scores[position] - index.scores > min_score_delta)
+    swappable[position] = False
+
+    if same_chain:
+        swappable &= index.group_codes == index.group_codes[position]
+
+    distances = np.linalg.norm(index.vectors[swappable] - index.vectors[position], axis=1)
+
+    return np.sort(distances)[:k]
+
+
+@pytest.mark.parametrize("k, min_score_delta, same_chain", [(1, 0.0, False), (5, 0.0, False), (3, 0.05, True)])
+def test_swap_index_matches_brute_force(k, min_score_delta, same_chain):
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+    index = SwapIndex(menu, by=CHAIN)
+
+    actual_swaps, actual_distances = index.query(np.arange(len(menu)), k, min_score_delta, same_chain=same_chain)
+
+    for position in range(0, len(menu), 7):
+        expect_distances = brute_force_swap_distances(index, position, k, min_score_delta, same_chain)
+        n_swaps = len(expect_distances)
+
+        assert np.allclose(actual_distances[position, :n_swaps], expect_distances)
+        assert np.all(actual_swaps[position, n_swaps:] == -1)
+        assert np.all(index.scores[position] - index.scores[actual_swaps[position, :n_swaps]] > min_score_delta)
+
+
+def test_swap_index_filters_by_chain():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+    index = SwapIndex(menu, by=CHAIN)
+
+    actual_swaps, _ = index.query(np.arange(len(menu)), k=3, chain=STARBUCKS)
+
+    assert (actual_swaps >= 0).any()
+    assert (menu[CHAIN].to_numpy()[actual_swaps[actual_swaps >= 0]] == STARBUCKS).all()
+
+    with pytest.raises(ValueError):
+        SwapIndex(MENU).query([0], same_chain=True)
+
+
+def test_swap_table():
+    menu = MENU.copy()
+    menu.loc[0, NUTRIENTS[0]] = np.nan
+    index = SwapIndex(menu)
+
+    swap_table = index.swap_table(k=2)
+    expect_swaps, _ = index.query(np.arange(len(menu)), k=2)
+
+    assert len(swap_table) == (expect_swaps >= 0).sum()
+    assert 0 not in swap_table[SWAP_POSITION].to_numpy()
+    assert (swap_table[SCORE_DELTA] > 0).all()
+    assert np.array_equal(swap_table[SWAP_POSITION].to_numpy(), expect_swaps[expect_swaps >= 0])
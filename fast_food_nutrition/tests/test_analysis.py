@@ -1,8 +1,27 @@
-import numpy as np
-
+import itertools
 
-from fast_food_nutrition.analysis import CoLinearity, TTest, ZTest
-from fast_food_nutrition.model import HypothesisTestConclusion, Test
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+
+from fast_food_nutrition.analysis import (ChiSquaredTest,
+                                          CoLinearity,
+                                          MultipleComparison,
+                                          Outliers,
+                                          QuantileCache,
+                                          RunningStatistics,
+                                          TTest,
+                                          ZTest)
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import (CHAIN,
+                                       NUTRIENTS,
+                                       Distribution,
+                                       HypothesisTestConclusion,
+                                       MultipleComparisonCorrection,
+                                       OutlierMethod,
+                                       Test)
 
 
 def test_calculate_proportion_two_tailed():
@@ -178,7 +197,7 @@ def test_calculate_two_means():
     test = Test.TWO_TAILED
 
     expect_t = -0.66
-    expect_p_value = 0.520
+    expect_p_value = 0.516
 
     actual_t, actual_p_value = TTest.calculate_two_means(x_bar_1=x_bar_1,
                                                          x_bar_2=x_bar_2,
@@ -204,7 +223,7 @@ def test_calculate_two_means_confidence_interval():
     alpha = 0.05
     test = Test.TWO_TAILED
 
-    expect_confidence_interval = (-0.544, 0.291)
+    expect_confidence_interval = (-0.527, 0.274)
     actual_confidence_interval = TTest.calculate_two_means_confidence_interval(x_bar_1=x_bar_1,
                                                                                x_bar_2=x_bar_2,
                                                                                sigma_1=sigma_1,
@@ -255,3 +274,340 @@ def test_convert_r_to_t():
 
 
 
+
+
+def test_calculate_correlation_matrix():
+    menu = FastFoodMenuETL().load_menu_items()
+    alpha = 0.05
+
+    actual_matrix = CoLinearity.calculate_correlation_matrix(menu, alpha=alpha)
+
+    assert actual_matrix.n == len(menu)
+    assert list(actual_matrix.r.columns) == NUTRIENTS
+
+    for x, y in itertools.combinations(NUTRIENTS, 2):
+        expect_r, expect_p_value = stats.pearsonr(menu[x], menu[y])
+        expect_confidence_interval = CoLinearity.pearson_r_confidence_interval(menu[x].to_numpy(), menu[y].to_numpy(),
+                                                                               alpha)
+
+        assert np.isclose(actual_matrix.r.loc[x, y], expect_r)
+        assert actual_matrix.r.loc[x, y] == actual_matrix.r.loc[y, x]
+        assert np.isclose(actual_matrix.p_value.loc[x, y], expect_p_value, atol=1e-12)
+        assert (round(actual_matrix.ci_lower.loc[x, y], 3), round(actual_matrix.ci_upper.loc[x, y], 3)) == \
+            expect_confidence_interval
+
+
+def test_calculate_correlation_matrix_drops_incomplete_rows():
+    menu = pd.DataFrame({"x": [4.5, 10.2, 4.4, np.nan, 3.9, 0.7, 8.5],
+                         "y": [5.5, 24.3, 8.6, 0.1, 6.1, np.nan, 25.3]})
+
+    actual_matrix = CoLinearity.calculate_correlation_matrix(menu, ["x", "y"])
+    expect_menu = menu.dropna()
+
+    assert actual_matrix.n == 5
+    assert actual_matrix.r.loc["x", "y"] == CoLinearity.calculate_r_matrix(expect_menu.to_numpy())[0, 1]
+    assert np.isclose(actual_matrix.t.loc["x", "y"],
+                      TTest.convert_from_r_to_t(actual_matrix.r.loc["x", "y"], 5), atol=1e-3)
+
+
+def test_calculate_correlation_matrices_by_chain():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+
+    actual_matrices = CoLinearity.calculate_correlation_matrices(menu, CHAIN)
+
+    assert list(actual_matrices.keys()) == ["starbucks", "mcdonalds", "burger_king", "wendys", "chick_fila"]
+    assert sum(matrix.n for matrix in actual_matrices.values()) == len(menu)
+
+
+def test_calculate_proportion_batch_matches_scalar():
+    p0 = np.array([0.10, 0.10, 0.10, 0.35, 0.50])
+    x = np.array([33, 45, 20, 60, 110])
+    n = np.array([362, 362, 362, 150, 200])
+    tests = [Test.TWO_TAILED, Test.RIGHT_TAILED, Test.LEFT_TAILED, Test.TWO_TAILED, Test.RIGHT_TAILED]
+    alpha = 0.05
+
+    actual_results = ZTest.calculate_proportion_batch(p0, x, n, tests, alpha)
+
+    for i, test in enumerate(tests):
+        expect_z, expect_p_value = ZTest.calculate_proportion(p0[i], x[i], n[i], test)
+        expect_confidence_interval = ZTest.calculate_proporation_confidence_interval(x[i], n[i], alpha, test)
+        expect_conclusion = ZTest.calculate_hypothesis_critical_value_test_method(expect_z, alpha, test)
+
+        assert round(actual_results["statistic"][i], 2) == expect_z
+        assert round(actual_results["p_value"][i], 3) == expect_p_value
+        assert (round(actual_results["ci_lower"][i], 3), round(actual_results["ci_upper"][i], 3)) == \
+            expect_confidence_interval
+        assert actual_results["conclusion"][i] == expect_conclusion
+
+
+def test_calculate_mean_batch_broadcasts_scalars():
+    x_bar = np.array([30.9, 39.0, 41.5])
+    expect_conclusions = [HypothesisTestConclusion.REJECT_H_0,
+                          HypothesisTestConclusion.FAIL_TO_REJECT_H0,
+                          HypothesisTestConclusion.REJECT_H_0]
+
+    actual_results = ZTest.calculate_mean_batch(x_bar, mu=40, sigma=2.9, n=15, tests=Test.TWO_TAILED)
+
+    assert actual_results.dtype.names == ("statistic", "p_value", "ci_lower", "ci_upper", "conclusion")
+    assert round(actual_results["statistic"][0], 2) == ZTest.calculate_mean(30.9, 40, 2.9, 15, Test.TWO_TAILED)[0]
+    assert list(actual_results["conclusion"]) == expect_conclusions
+
+
+def test_calculate_two_means_batch_matches_scalar():
+    x_bar_2 = np.array([3.993333, 3.5, 4.5])
+    tests = [Test.TWO_TAILED, Test.RIGHT_TAILED, Test.LEFT_TAILED]
+    alpha = 0.05
+
+    actual_results = TTest.calculate_two_means_batch(3.866667, x_bar_2, 0, 0, 0.563001, 0.39, 12, 15, tests, alpha)
+
+    for i, test in enumerate(tests):
+        expect_t, expect_p_value = TTest.calculate_two_means(3.866667, x_bar_2[i], 0, 0, 0.563001, 0.39, 12, 15, test)
+        expect_confidence_interval = TTest.calculate_two_means_confidence_interval(3.866667, x_bar_2[i], 0.563001, 0.39,
+                                                                                   12, 15, alpha, test)
+        df = TTest.df(TTest.A(0.563001, 12), TTest.B(0.39, 15), 12, 15)
+        expect_conclusion = TTest.calculate_hypothesis_critical_value_test_method(actual_results["statistic"][i], alpha,
+                                                                                  df, test)
+
+        assert round(actual_results["statistic"][i], 2) == expect_t
+        assert round(actual_results["p_value"][i], 3) == expect_p_value
+        assert (round(actual_results["ci_lower"][i], 3), round(actual_results["ci_upper"][i], 3)) == \
+            expect_confidence_interval
+        assert actual_results["conclusion"][i] == expect_conclusion
+
+
+def test_calculate_two_means_batch_matches_welch_t_test():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+    mcdonalds = menu[menu[CHAIN] == "mcdonalds"]["calories"].dropna().to_numpy()
+    wendys = menu[menu[CHAIN] == "wendys"]["calories"].dropna().to_numpy()
+    alternatives = {Test.TWO_TAILED: "two-sided", Test.RIGHT_TAILED: "greater", Test.LEFT_TAILED: "less"}
+
+    actual_results = TTest.calculate_two_means_batch(np.full(3, mcdonalds.mean()), wendys.mean(), 0, 0,
+                                                     mcdonalds.std(ddof=1), wendys.std(ddof=1), len(mcdonalds),
+                                                     len(wendys), list(alternatives.keys()))
+
+    for i, alternative in enumerate(alternatives.values()):
+        expect_result = stats.ttest_ind(mcdonalds, wendys, equal_var=False, alternative=alternative)
+
+        assert np.isclose(actual_results["statistic"][i], expect_result.statistic)
+        assert np.isclose(actual_results["p_value"][i], expect_result.pvalue)
+
+    expect_confidence_interval = stats.ttest_ind(mcdonalds, wendys, equal_var=False).confidence_interval(0.95)
+
+    assert np.isclose(actual_results["ci_lower"][0], expect_confidence_interval.low)
+    assert np.isclose(actual_results["ci_upper"][0], expect_confidence_interval.high)
+
+
+def test_adjust_p_values():
+    p_values = np.array([0.01, 0.04, 0.03, 0.005, np.nan])
+
+    expect_p_values = {MultipleComparisonCorrection.BONFERRONI: [0.04, 0.16, 0.12, 0.02],
+                       MultipleComparisonCorrection.HOLM: [0.03, 0.06, 0.06, 0.02],
+                       MultipleComparisonCorrection.BENJAMINI_HOCHBERG: [0.02, 0.04, 0.04, 0.02]}
+
+    for correction, expect_p_value in expect_p_values.items():
+        actual_p_values = MultipleComparison.adjust_p_values(p_values, correction)
+
+        assert np.allclose(actual_p_values[:4], expect_p_value)
+        assert np.isnan(actual_p_values[4])
+
+
+def test_adjust_p_values_benjamini_hochberg_matches_scipy():
+    p_values = np.random.default_rng(12).random(5000) ** 4
+
+    actual_p_values = MultipleComparison.adjust_p_values(p_values, MultipleComparisonCorrection.BENJAMINI_HOCHBERG)
+
+    assert np.allclose(actual_p_values, stats.false_discovery_control(p_values))
+
+
+def test_correct_hypothesis_test_batch():
+    results = ZTest.calculate_mean_batch(np.array([30.9, 39.0, 41.5]), mu=40, sigma=2.9, n=15, tests=Test.TWO_TAILED)
+
+    expect_conclusions = [HypothesisTestConclusion.REJECT_H_0,
+                          HypothesisTestConclusion.FAIL_TO_REJECT_H0,
+                          HypothesisTestConclusion.FAIL_TO_REJECT_H0]
+    actual_results = MultipleComparison.correct(results, 0.05, MultipleComparisonCorrection.HOLM)
+
+    assert list(actual_results["conclusion"]) == expect_conclusions
+    assert np.array_equal(actual_results["statistic"], results["statistic"])
+    assert results["conclusion"][2] == HypothesisTestConclusion.REJECT_H_0
+
+
+def test_quantile_cache_hits_and_misses():
+    quantiles = QuantileCache(maxsize=2)
+
+    for _ in range(3):
+        for alpha in [0.01, 0.05]:
+            quantiles.get_critical_value(Distribution.STUDENT_T, alpha, Test.TWO_TAILED, 20)
+
+    assert (quantiles.hits, quantiles.misses) == (4, 2)
+    assert quantiles.get_critical_value(Distribution.NORMAL, 0.05, Test.TWO_TAILED) == stats.norm.ppf(0.975)
+    assert quantiles.get_critical_value(Distribution.STUDENT_T, 0.01, Test.TWO_TAILED, 20) == stats.t.ppf(0.995, 20)
+    assert (quantiles.hits, quantiles.misses) == (4, 4)
+    assert len(quantiles.cache) == 2
+
+
+def test_quantile_cache_prebuilt_table():
+    quantiles = QuantileCache()
+    quantiles.prebuild([0.05], max_df=500)
+
+    for df in [30, 47.3, 123.51, 500]:
+        actual_critical_value = quantiles.get_critical_value(Distribution.STUDENT_T, 0.05, Test.RIGHT_TAILED, df)
+
+        assert abs(actual_critical_value - stats.t.ppf(0.95, df)) < 1e-5
+
+    assert quantiles.interpolations == 4
+
+    actual_critical_value = quantiles.get_critical_value(Distribution.STUDENT_T, 0.05, Test.RIGHT_TAILED, 3.5)
+
+    assert actual_critical_value == stats.t.ppf(0.95, 3.5)
+    assert quantiles.misses == 1
+
+    with pytest.raises(ValueError):
+        quantiles.get_critical_value(Distribution.STUDENT_T, 0.05, Test.RIGHT_TAILED)
+
+
+def test_running_statistics_from_chunks():
+    etl = FastFoodMenuETL()
+    menu = etl.load_menu_items_with_chain()
+
+    actual_statistics = RunningStatistics.from_chunks(etl.iter_menu_items_by_chain(64), thresholds={"calories": [500]})
+
+    for chain, chain_menu in menu.groupby(CHAIN, sort=False, observed=True):
+        for nutrient in NUTRIENTS:
+            assert actual_statistics[chain].get_count(nutrient) == chain_menu[nutrient].count()
+            assert np.isclose(actual_statistics[chain].get_mean(nutrient), chain_menu[nutrient].mean())
+            assert np.isclose(actual_statistics[chain].get_std(nutrient), chain_menu[nutrient].std())
+            assert actual_statistics[chain].get_min(nutrient) == chain_menu[nutrient].min()
+            assert actual_statistics[chain].get_max(nutrient) == chain_menu[nutrient].max()
+
+        expect_threshold_count = ((chain_menu["calories"] > 500).sum(), len(chain_menu))
+        assert actual_statistics[chain].get_threshold_count("calories", 500) == expect_threshold_count
+
+
+def test_running_statistics_merge():
+    menu = FastFoodMenuETL().load_menu_items()
+    menu.loc[menu.index[:10], "fiber"] = np.nan
+
+    expect_statistics = RunningStatistics().update(menu)
+    actual_statistics = RunningStatistics().update(menu.iloc[:400]).merge(RunningStatistics().update(menu.iloc[400:]))
+
+    assert np.array_equal(actual_statistics.count, expect_statistics.count)
+    assert np.allclose(actual_statistics.mean, expect_statistics.mean)
+    assert np.allclose(actual_statistics.m2, expect_statistics.m2)
+    assert actual_statistics.get_count("fiber") == len(menu) - 10
+
+
+def test_running_statistics_feed_tests():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+    statistics = RunningStatistics.from_chunks((chain, chain_menu) for chain, chain_menu
+                                               in menu.groupby(CHAIN, sort=False, observed=True))
+    mcdonalds = menu[menu[CHAIN] == "mcdonalds"]["calories"]
+    wendys = menu[menu[CHAIN] == "wendys"]["calories"]
+
+    expect_z = ZTest.calculate_mean(mcdonalds.mean(), 400, mcdonalds.std(), len(mcdonalds), Test.TWO_TAILED)
+    actual_z = ZTest.calculate_mean(statistics["mcdonalds"].get_mean("calories"),
+                                    400,
+                                    statistics["mcdonalds"].get_std("calories"),
+                                    statistics["mcdonalds"].get_count("calories"),
+                                    Test.TWO_TAILED)
+    assert actual_z == expect_z
+
+    expect_t = TTest.calculate_two_means(mcdonalds.mean(), wendys.mean(), 0, 0, mcdonalds.std(), wendys.std(),
+                                         len(mcdonalds), len(wendys), Test.TWO_TAILED)
+    actual_t = TTest.calculate_two_means(statistics["mcdonalds"].get_mean("calories"),
+                                         statistics["wendys"].get_mean("calories"),
+                                         0,
+                                         0,
+                                         statistics["mcdonalds"].get_std("calories"),
+                                         statistics["wendys"].get_std("calories"),
+                                         statistics["mcdonalds"].get_count("calories"),
+                                         statistics["wendys"].get_count("calories"),
+                                         Test.TWO_TAILED)
+    assert actual_t == expect_t
+
+    expect_chi_squared, _ = ChiSquaredTest.calculate(len(wendys), wendys.std(), 200)
+    actual_chi_squared, _ = ChiSquaredTest.calculate(statistics["wendys"].get_count("calories"),
+                                                     statistics["wendys"].get_std("calories"),
+                                                     200)
+    assert np.isclose(actual_chi_squared, expect_chi_squared)
+
+
+def test_filter_outliers():
+    menu = FastFoodMenuETL().load_menu_items()
+    # A shuffled, non-contiguous index must not shift the mask
+    menu.index = np.random.default_rng(3).permutation(len(menu)) * 2 + 1000
+
+    expect_mask = pd.Series(True, index=menu.index)
+
+    for nutrient in NUTRIENTS:
+        Q1 = menu[nutrient].quantile(0.25)
+        Q3 = menu[nutrient].quantile(0.75)
+        IQR = Q3 - Q1
+        expect_mask &= (menu[nutrient] >= Q1 - 1.5 * IQR) & (menu[nutrient] <= Q3 + 1.5 * IQR)
+
+    actual_menu = Outliers.filter_outliers(menu, NUTRIENTS)
+
+    assert actual_menu.equals(menu[expect_mask])
+    assert len(actual_menu) == 892
+
+
+def test_calculate_sketch_fences():
+    etl = FastFoodMenuETL()
+    menu = etl.load_menu_items()
+    expect_lower_bounds, expect_upper_bounds = Outliers.calculate_fences(menu, NUTRIENTS)
+    IQR = (expect_upper_bounds - expect_lower_bounds) / 4
+
+    actual_lower_bounds, actual_upper_bounds = Outliers.calculate_sketch_fences(etl.iter_menu_items(100), NUTRIENTS,
+                                                                                seed=0)
+
+    assert np.all(np.abs(actual_lower_bounds - expect_lower_bounds) <= 0.2 * IQR)
+    assert np.all(np.abs(actual_upper_bounds - expect_upper_bounds) <= 0.2 * IQR)
+
+
+def test_calculate_grouped_fences_iqr_matches_per_chain():
+    menu = FastFoodMenuETL().load_menu_items_with_chain()
+
+    actual_mask, actual_fences = Outliers.calculate_grouped_fences(menu, NUTRIENTS, CHAIN)
+
+    for chain, chain_menu in menu.groupby(CHAIN, sort=False, observed=True):
+        expect_lower_bounds, expect_upper_bounds = Outliers.calculate_fences(chain_menu, NUTRIENTS)
+
+        assert np.allclose(actual_fences.loc[chain, (slice(None), "lower")], expect_lower_bounds)
+        assert np.allclose(actual_fences.loc[chain, (slice(None), "upper")], expect_upper_bounds)
+        assert menu[actual_mask][menu[actual_mask][CHAIN] == chain].equals(Outliers.filter_outliers(chain_menu, NUTRIENTS))
+
+
+def test_calculate_grouped_fences_mad_and_z_score():
+    menu = pd.DataFrame({"group": ["a", "a", "a", "a", "a", "b", "b", "b", "b", "b"],
+                         "calories": [100, 110, 120, 130, 900, 1000, 1010, 990, 1005, 995]},
+                        index=range(100, 110))
+
+    actual_mask, actual_fences = Outliers.calculate_grouped_fences(menu, ["calories"], "group", OutlierMethod.MAD)
+
+    assert list(actual_mask[~actual_mask].index) == [104]
+    assert actual_fences.loc["a", ("calories", "lower")] == 120 - 3.5 * 1.4826 * 10
+
+    actual_mask, actual_fences = Outliers.calculate_grouped_fences(menu, ["calories"], "group", OutlierMethod.Z_SCORE,
+                                                                    threshold=1.5)
+    expect_std = menu[menu["group"] == "b"]["calories"].std()
+
+    assert list(actual_mask[~actual_mask].index) == [104]
+    assert np.isclose(actual_fences.loc["b", ("calories", "upper")], 1000 + 1.5 * expect_std)
+    assert len(Outliers.filter_grouped_outliers(menu, ["calories"], "group", OutlierMethod.Z_SCORE, 1.5)) == 9
+
+
+def test_calculate_grouped_fences_single_row_group():
+    menu = pd.DataFrame({"group": ["a", "a", "a", "a", "a", "b"],
+                         "calories": [100, 110, 120, 130, 900, 1000],
+                         "sugar": [1, 2, 3, 4, 5, np.nan]})
+
+    for method in OutlierMethod:
+        actual_mask, _ = Outliers.calculate_grouped_fences(menu, ["calories"], "group", method)
+
+        assert actual_mask[5]
+
+    actual_mask, actual_fences = Outliers.calculate_grouped_fences(menu, ["calories", "sugar"], "group",
+                                                                    OutlierMethod.Z_SCORE)
+
+    assert actual_fences.loc["b", ("sugar", "lower")] == -np.inf
+    assert actual_fences.loc["b", ("sugar", "upper")] == np.inf
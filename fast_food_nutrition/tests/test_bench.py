@@ -0,0 +1,118 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from fast_food_nutrition.bench import (HOT_PATH,
+                                       METADATA,
+                                       METRIC,
+                                       PEAK_ALLOCATED_BYTES,
+                                       PEAK_RSS_BYTES,
+                                       REGRESSION,
+                                       RESULTS,
+                                       ROWS,
+                                       SCALE,
+                                       WALL_TIME,
+                                       benchmark_dtype_pushdown,
+                                       benchmark_score_frame,
+                                       compare_results,
+                                       load_results,
+                                       run_suite,
+                                       save_results,
+                                       synthesize_menu)
+from fast_food_nutrition.cli import main
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import NUTRIENTS
+
+
+def test_benchmark_dtype_pushdown():
+    results = benchmark_dtype_pushdown(replication=2)
+
+    assert results["post_hoc_astype"][ROWS] == results["dtype_pushdown"][ROWS] == 2 * 1117
+    assert results["dtype_pushdown"][PEAK_ALLOCATED_BYTES] < results["post_hoc_astype"][PEAK_ALLOCATED_BYTES]
+
+
+def test_benchmark_score_frame():
+    results = benchmark_score_frame(replication=1)
+
+    assert results["scalar_scoring"][ROWS] == results["score_frame"][ROWS] == 1117
+
+
+def test_synthesize_menu():
+    menu = FastFoodMenuETL().load_menu_items()
+
+    actual_menu = synthesize_menu(3, seed=1)
+
+    assert len(actual_menu) == 3 * len(menu)
+    assert list(actual_menu.columns) == list(menu.columns)
+    assert np.array_equal(actual_menu[NUTRIENTS].iloc[:len(menu)].to_numpy(), menu[NUTRIENTS].to_numpy(), equal_nan=True)
+    assert actual_menu.equals(synthesize_menu(3, seed=1))
+    assert not actual_menu.equals(synthesize_menu(3, seed=2))
+
+
+def test_run_suite(tmp_path):
+    results = run_suite(scales=[1, 2], hot_paths=["score_frame", "calculate_r"], repeat=1, isolate=False,
+                        max_scales={"calculate_r": 1})
+    save_results(results, str(tmp_path / "results.json"))
+
+    actual_results = load_results(str(tmp_path / "results.json"))
+
+    assert [(result[HOT_PATH], result[SCALE]) for result in actual_results[RESULTS]] == [("score_frame", 1),
+                                                                                         ("score_frame", 2),
+                                                                                         ("calculate_r", 1)]
+    assert actual_results[RESULTS][1][ROWS] == 2 * 1117
+    assert all(result[WALL_TIME] > 0 and result[PEAK_ALLOCATED_BYTES] > 0 and result[PEAK_RSS_BYTES] > 0
+               for result in actual_results[RESULTS])
+    assert actual_results[METADATA]["seed"] == 0
+
+
+def test_run_suite_isolated():
+    results = run_suite(scales=[1], hot_paths=["calculate_r"], repeat=1)
+
+    assert results[RESULTS][0][ROWS] == 1117
+    assert results[METADATA]["isolate"]
+
+
+def test_compare_results():
+    current = {RESULTS: [{HOT_PATH: "score_frame", SCALE: 1, WALL_TIME: 1.3, PEAK_ALLOCATED_BYTES: 100, PEAK_RSS_BYTES: 100},
+                         {HOT_PATH: "calculate_r", SCALE: 1, WALL_TIME: 1.0, PEAK_ALLOCATED_BYTES: 100, PEAK_RSS_BYTES: 100}]}
+    baseline = {RESULTS: [{HOT_PATH: "score_frame", SCALE: 1, WALL_TIME: 1.0, PEAK_ALLOCATED_BYTES: 100, PEAK_RSS_BYTES: 100},
+                          {HOT_PATH: "score_frame", SCALE: 100, WALL_TIME: 1.0, PEAK_ALLOCATED_BYTES: 100, PEAK_RSS_BYTES: 100}]}
+
+    comparison = compare_results(current, baseline, threshold=0.2)
+    regressions = comparison[comparison[REGRESSION]]
+
+    assert len(comparison) == 3
+    assert list(zip(regressions[HOT_PATH], regressions[METRIC])) == [("score_frame", WALL_TIME)]
+    assert not compare_results(current, baseline, threshold=0.5)[REGRESSION].any()
+
+
+def test_bench_cli_baseline(tmp_path, capsys):
+    arguments = ["bench", "--scales", "1", "--hot-paths", "calculate_r", "--repeat", "1", "--no-isolate"]
+    main(arguments + ["--output", str(tmp_path / "baseline.json")])
+    baseline = load_results(str(tmp_path / "baseline.json"))
+    baseline[RESULTS][0][PEAK_ALLOCATED_BYTES] /= 10
+    save_results(baseline, str(tmp_path / "faster.json"))
+
+    assert main(arguments + ["--baseline", str(tmp_path / "faster.json")]) == 1
+    assert main(arguments + ["--baseline", str(tmp_path / "faster.json"), "--threshold", "100"]) == 0
+
+
+def test_bench_cli_max_scale(tmp_path):
+    arguments = ["bench", "--scales", "1", "2", "--hot-paths", "calculate_r", "--repeat", "1", "--no-isolate"]
+    main(arguments + ["--max-scale", "calculate_r=1", "--output", str(tmp_path / "results.json")])
+
+    assert [result[SCALE] for result in load_results(str(tmp_path / "results.json"))[RESULTS]] == [1]
+
+    for max_scale in ["calculate_r", "unknown=1"]:
+        with pytest.raises(SystemExit):
+            main(arguments + ["--max-scale", max_scale])
+
+
+def test_bench_module_runs_cli():
+    output = subprocess.run([sys.executable, "-m", "fast_food_nutrition.bench", "--scales", "1", "--hot-paths",
+                             "calculate_r", "--repeat", "1", "--no-isolate"],
+                            capture_output=True, text=True, check=True).stdout
+
+    assert "calculate_r" in output
@@ -0,0 +1,118 @@
+from dataclasses import replace
+import os
+import shutil
+
+from fast_food_nutrition.cache import CachedFastFoodMenuETL
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import CHAIN, MENU_CHAINS, WENDYS, CacheFormat
+from fast_food_nutrition.util import TEST_DIR
+
+
+def test_load_menu_items_warm_start(tmp_path):
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=copy_test_data(tmp_path)))
+
+    expect_menu = etl.load_menu_items()
+    assert etl.refreshed_chains == ["starbucks", "mcdonalds", "burger_king", "wendys", "chick_fila"]
+
+    actual_menu = etl.load_menu_items()
+    assert etl.refreshed_chains == []
+    assert actual_menu.equals(expect_menu)
+    assert len(actual_menu) == 1117
+    assert CHAIN not in actual_menu.columns
+
+
+def test_load_menu_items_with_chain_matches_uncached_dtype(tmp_path):
+    menu_etl = FastFoodMenuETL()
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), menu_etl)
+    expect_menu = menu_etl.load_menu_items_with_chain()
+
+    for _ in range(2):
+        actual_menu = etl.load_menu_items_with_chain()
+
+        assert actual_menu[CHAIN].dtype == expect_menu[CHAIN].dtype
+        assert actual_menu.equals(expect_menu)
+
+
+def test_load_menu_items_refreshes_all_chains_on_schema_change(tmp_path, monkeypatch):
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"))
+    etl.load_menu_items()
+    monkeypatch.setitem(MENU_CHAINS, WENDYS, [replace(source, na_values=("-",)) for source in MENU_CHAINS[WENDYS]])
+
+    etl.load_menu_items()
+
+    assert etl.refreshed_chains == ["starbucks", "mcdonalds", "burger_king", "wendys", "chick_fila"]
+
+
+def test_load_menu_items_parquet(tmp_path):
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), cache_format=CacheFormat.PARQUET)
+
+    etl.load_menu_items()
+    actual_menu = etl.load_menu_items()
+
+    assert etl.refreshed_chains == []
+    assert actual_menu.equals(FastFoodMenuETL().load_menu_items())
+
+
+def test_load_menu_items_refreshes_changed_chain_only(tmp_path):
+    data_dir = copy_test_data(tmp_path)
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=data_dir))
+    etl.load_menu_items()
+
+    with open(os.path.join(data_dir, "wendys/wendys.csv"), "a") as wendys:
+        wendys.write("Side Salad,Salads,25,0,0,0,0,15,5,2,3,1,0\n")
+
+    menu = etl.load_menu_items_with_chain()
+
+    assert etl.refreshed_chains == ["wendys"]
+    assert len(menu) == 1118
+    assert (menu[CHAIN] == "wendys").sum() == 44
+
+
+def test_load_menu_items_ignores_touched_source(tmp_path):
+    data_dir = copy_test_data(tmp_path)
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=data_dir))
+    etl.load_menu_items()
+
+    os.utime(os.path.join(data_dir, "mcdonalds/mcdonalds.csv"), (0, 0))
+    etl.load_menu_items()
+
+    assert etl.refreshed_chains == []
+
+
+def test_load_menu_items_records_touched_source(tmp_path, monkeypatch):
+    data_dir = copy_test_data(tmp_path)
+    etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=data_dir))
+    etl.load_menu_items()
+    os.utime(os.path.join(data_dir, "mcdonalds/mcdonalds.csv"), (0, 0))
+    etl.load_menu_items()
+
+    def fingerprint_file(file_name):
+        raise AssertionError(f"{file_name} was hashed again")
+
+    monkeypatch.setattr("fast_food_nutrition.cache.fingerprint_file", fingerprint_file)
+    etl.load_menu_items()
+
+    assert etl.refreshed_chains == []
+
+
+def test_load_menu_items_keeps_manifest_per_format(tmp_path):
+    data_dir = copy_test_data(tmp_path)
+    feather_etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=data_dir))
+    parquet_etl = CachedFastFoodMenuETL(str(tmp_path / "cache"), FastFoodMenuETL(data_dir=data_dir), CacheFormat.PARQUET)
+    feather_etl.load_menu_items()
+
+    with open(os.path.join(data_dir, "wendys/wendys.csv"), "a") as wendys:
+        wendys.write("Side Salad,Salads,25,0,0,0,0,15,5,2,3,1,0\n")
+
+    parquet_etl.load_menu_items()
+    actual_menu = feather_etl.load_menu_items()
+
+    assert feather_etl.refreshed_chains == ["wendys"]
+    assert len(actual_menu) == 1118
+
+
+def copy_test_data(tmp_path) -> str:
+    data_dir = str(tmp_path / "data")
+    shutil.copytree(TEST_DIR, data_dir)
+
+    return data_dir
@@ -0,0 +1,66 @@
+import io
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from fast_food_nutrition.cli import main
+
+IMPORT_TIME_BUDGET = 1.0
+HEAVY_MODULES = ["scipy", "sklearn", "matplotlib"]
+
+
+@pytest.mark.parametrize("module, heavy_modules", [("fast_food_nutrition.model", HEAVY_MODULES + ["pandas"]),
+                                                   ("fast_food_nutrition.cli", HEAVY_MODULES + ["pandas"]),
+                                                   ("fast_food_nutrition.etl", HEAVY_MODULES),
+                                                   ("fast_food_nutrition.analysis", HEAVY_MODULES),
+                                                   ("fast_food_nutrition.viz", HEAVY_MODULES)])
+def test_import_stays_light(module, heavy_modules):
+    script = (f"import sys, time\n"
+              f"start = time.perf_counter()\n"
+              f"import {module}\n"
+              f"print(time.perf_counter() - start)\n"
+              f"print(','.join(m for m in {heavy_modules!r} if m in sys.modules))\n")
+    import_time, heavy_modules = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                                check=True).stdout.split("\n")[:2]
+
+    assert heavy_modules == ""
+    assert float(import_time) < IMPORT_TIME_BUDGET
+
+
+def test_cli_load(tmp_path, capsys):
+    assert main(["load"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == "total 1117"
+
+    main(["load", "--output", str(tmp_path / "menu.csv")])
+    assert len(pd.read_csv(tmp_path / "menu.csv")) == 1117
+
+
+def test_cli_score(capsys):
+    main(["score", "--chain", "wendys", "--top", "3", "--descending"])
+    scores = pd.read_csv(io.StringIO(capsys.readouterr().out))
+
+    assert len(scores) == 3
+    assert (scores["chain"] == "wendys").all()
+    assert scores["composite_nutrition_score"].is_monotonic_decreasing
+
+
+def test_cli_test(capsys):
+    main(["test", "--chains", "mcdonalds", "wendys", "burger_king", "--correction", "holm"])
+    report = pd.read_csv(io.StringIO(capsys.readouterr().out))
+
+    assert list(zip(report["chain_1"], report["chain_2"])) == [("mcdonalds", "wendys"),
+                                                                ("mcdonalds", "burger_king"),
+                                                                ("wendys", "burger_king")]
+    assert report["p_value"].between(0, 1).all()
+
+    with pytest.raises(SystemExit):
+        main(["test", "--chains", "mcdonalds", "unknown"])
+
+
+def test_cli_plot(tmp_path, capsys):
+    main(["plot", "box_plot", "multi_linear_regression", "--output-dir", str(tmp_path), "--format", "svg"])
+
+    assert capsys.readouterr().out.split() == [str(tmp_path / "box_plot.svg"), str(tmp_path / "multi_linear_regression.svg")]
+    assert (tmp_path / "multi_linear_regression.svg").stat().st_size > 0
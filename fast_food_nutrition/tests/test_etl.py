@@ -1,12 +1,14 @@
+import pandas as pd
 from pandas import DataFrame
 
 from fast_food_nutrition.etl import (BurgerKingMenuETL,
                                      ChickFilaMenuETL,
                                      FastFoodMenuETL,
                                      McDonaldsMenuETL,
+                                     MenuSourceETL,
                                      StarbucksMenuETL,
                                      WendysdMenuETL)
-from fast_food_nutrition.model import FoodNutritionFeatures
+from fast_food_nutrition.model import MENU_COLUMNS, ExecutorType, FoodNutritionFeatures, MenuSource
 
 FOOD_NUTRITION_FEATURES = [nutrition.value for nutrition in FoodNutritionFeatures]
 
@@ -75,6 +77,77 @@ def test_load_all_menu_items():
     assert_menu_items(menu, "menu")
 
 
+def test_load_all_menu_items_process_pool():
+    etl = FastFoodMenuETL(executor_type=ExecutorType.PROCESS, max_workers=2)
+    menu = etl.load_menu_items()
+    assert_menu_items(menu, "menu")
+
+
+def test_load_all_menu_items_parallel_is_deterministic():
+    expect_menu = FastFoodMenuETL(executor_type=ExecutorType.SERIAL).load_menu_items()
+    actual_menu = FastFoodMenuETL(executor_type=ExecutorType.THREAD).load_menu_items()
+
+    assert actual_menu.equals(expect_menu)
+
+
+def test_load_menu_items_by_chain():
+    etl = FastFoodMenuETL()
+    menus = etl.load_menu_items_by_chain()
+
+    assert list(menus.keys()) == ["starbucks", "mcdonalds", "burger_king", "wendys", "chick_fila"]
+    assert_menu_items(menus["starbucks"], "starbucks_menu")
+    assert_menu_items(menus["chick_fila"], "chick_fila_menu")
+
+
+def test_extract_parses_only_mapped_columns():
+    etl = McDonaldsMenuETL()
+    mcdonalds_menu = etl.extract_mcdonalds_menu()
+
+    assert sorted(mcdonalds_menu.columns) == sorted(["Item", "Calories", "Total Fat", "Carbohydrates", "Dietary Fiber", "Protein"])
+
+
+def test_load_registered_menu_source():
+    source = MenuSource(name="wendys_lite",
+                        file_name="wendys/wendys.csv",
+                        columns={"Calories": FoodNutritionFeatures.CALORIES.value,
+                                 "Fat (g)": FoodNutritionFeatures.FAT.value,
+                                 "Total Carb (g)": FoodNutritionFeatures.CARBOHYDRATES.value,
+                                 "Dietary Fiber (g)": FoodNutritionFeatures.FIBER.value,
+                                 "Protein (g)": FoodNutritionFeatures.PROTEIN.value},
+                        menu_item_columns=("Category", "Item"))
+    etl = MenuSourceETL(source)
+    wendys_menu = etl.load_menu_items()
+
+    assert list(wendys_menu.columns) == MENU_COLUMNS
+    assert wendys_menu[FoodNutritionFeatures.MENU_ITEM.value].str.startswith("Burgers ").any()
+    assert_menu_items(wendys_menu, "wendys_menu")
+
+
+def test_iter_menu_items():
+    etl = FastFoodMenuETL()
+    chunks = list(etl.iter_menu_items(chunksize=50))
+
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert pd.concat(chunks, ignore_index=True).equals(etl.load_menu_items())
+
+
+def test_iter_starbucks_menu_items_filters_missing_rows():
+    etl = StarbucksMenuETL()
+    starbucks_drinks = pd.concat(etl.source_etls["starbucks_drinks"].iter_menu_items(chunksize=10))
+
+    assert_menu_items(starbucks_drinks, "starbucks_drinks")
+
+
+def test_iter_menu_items_by_chain():
+    etl = FastFoodMenuETL()
+    chain_counts = {}
+
+    for chain, chunk in etl.iter_menu_items_by_chain(chunksize=100):
+        chain_counts[chain] = chain_counts.get(chain, 0) + len(chunk)
+
+    assert chain_counts == {"starbucks": 447, "mcdonalds": 260, "burger_king": 77, "wendys": 43, "chick_fila": 290}
+
+
 def assert_menu_items(food_menu_items: DataFrame, menu_item: str) -> None:
     for feature in food_menu_items.columns:
         assert feature in FOOD_NUTRITION_FEATURES
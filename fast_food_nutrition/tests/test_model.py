@@ -0,0 +1,52 @@
+import numpy as np
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import Nutrition, NutritionTable, Sex
+
+MENU = FastFoodMenuETL().load_menu_items()
+
+
+def test_nutrition_table_shares_menu_columns():
+    table = NutritionTable.from_frame(MENU)
+    actual_menu = table.to_frame()
+
+    assert len(table) == 1117
+    assert len(table.names) < len(table)
+    assert actual_menu.equals(MENU)
+
+    for nutrient, values in table.columns.items():
+        assert np.shares_memory(values, MENU[nutrient].to_numpy())
+        assert np.shares_memory(actual_menu[nutrient].to_numpy(), values)
+
+
+def test_nutrition_table_float32():
+    table = NutritionTable.from_frame(MENU, dtype="float32")
+
+    assert all(values.dtype == np.float32 for values in table.columns.values())
+    assert np.allclose(table.to_frame()["calories"], MENU["calories"])
+
+
+def test_nutrition_row_scores_match_nutrition():
+    nutrition = Nutrition(item="Baconator", calories=950, fiber=2, fat=62, carb=40, protein=59)
+    row = NutritionTable.from_nutritions([nutrition])[0]
+
+    assert row.item == "Baconator"
+    assert row.to_nutrition() == nutrition
+    assert not hasattr(row, "__dict__")
+
+    for sex in Sex:
+        expect_score = NutritionCalculator.get_composite_nutrition_score(nutrition, sex)
+        actual_score = NutritionCalculator.get_composite_nutrition_score(row, sex)
+
+        assert actual_score == expect_score
+
+
+def test_nutrition_table_memory_mapped(tmp_path):
+    NutritionTable.from_frame(MENU).save(str(tmp_path / "menu"))
+
+    table = NutritionTable.load(str(tmp_path / "menu"))
+
+    assert all(isinstance(values, np.memmap) for values in table.columns.values())
+    assert table.to_frame().equals(MENU)
+    assert table[-1].item == MENU["menu_item"].iloc[-1]
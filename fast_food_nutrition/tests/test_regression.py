@@ -0,0 +1,68 @@
+import warnings
+
+import numpy as np
+from scipy import stats
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import NUTRIENTS, FoodIntakeScore
+from fast_food_nutrition.regression import Regression
+
+MENU = FastFoodMenuETL().load_menu_items()
+FEATURES = ["fat", "carbohydrates", "fiber", "protein"]
+
+
+def test_fit_single_matches_linregress():
+    actual_regressions = Regression().fit_single(MENU, FEATURES, "calories")
+
+    for feature in FEATURES:
+        expect_regression = stats.linregress(MENU[feature], MENU["calories"])
+
+        assert np.isclose(actual_regressions.loc[feature, "slope"], expect_regression.slope)
+        assert np.isclose(actual_regressions.loc[feature, "intercept"], expect_regression.intercept)
+        assert np.isclose(actual_regressions.loc[feature, "r_value"], expect_regression.rvalue)
+        assert np.isclose(actual_regressions.loc[feature, "p_value"], expect_regression.pvalue, atol=1e-12)
+        assert np.isclose(actual_regressions.loc[feature, "std_err"], expect_regression.stderr)
+
+
+def test_fit_single_constant_feature_without_warnings():
+    menu = MENU[["fat", "calories"]].dropna().assign(constant=1.0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        actual_regressions = Regression().fit_single(menu, ["constant", "fat"], "calories")
+
+    assert np.isnan(actual_regressions.loc["constant", ["slope", "r_value", "p_value"]]).all()
+    assert np.isfinite(actual_regressions.loc["fat", "slope"])
+
+
+def test_fit_matches_lstsq_and_predicts():
+    menu = MENU.copy()
+    menu.loc[menu.index[:5], "fiber"] = np.nan
+    complete_menu = menu.dropna()
+    design = np.column_stack((np.ones(len(complete_menu)), complete_menu[FEATURES].to_numpy()))
+    expect_beta, _, _, _ = np.linalg.lstsq(design, complete_menu["calories"].to_numpy(), rcond=None)
+
+    actual_fit = Regression().fit(menu, FEATURES, "calories")
+
+    assert actual_fit.n == len(menu) - 5
+    assert np.isclose(actual_fit.intercept, expect_beta[0])
+    assert np.allclose(actual_fit.coefficients, expect_beta[1:])
+    assert np.allclose(Regression.predict(actual_fit, complete_menu), design @ expect_beta)
+    assert 0.9 < actual_fit.r_squared < 1
+
+
+def test_fit_composite_score_is_cached():
+    regression = Regression()
+
+    expect_fit = regression.fit_composite_score(MENU)
+    actual_fit = regression.fit_composite_score(MENU.copy())
+
+    assert actual_fit is expect_fit
+    assert (regression.hits, regression.misses) == (1, 1)
+    assert np.allclose(Regression.predict(actual_fit, MENU),
+                       NutritionCalculator.score_frame(MENU)[FoodIntakeScore.COMPOSITE.value])
+    assert actual_fit.features == NUTRIENTS
+
+    regression.fit_composite_score(MENU.iloc[1:])
+    assert regression.misses == 2
@@ -0,0 +1,56 @@
+import numpy as np
+from scipy import stats
+
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import CHAIN, ExecutorType, Test
+from fast_food_nutrition.resampling import Resampling
+
+MENU = FastFoodMenuETL().load_menu_items_with_chain()
+MCDONALDS_CALORIES = MENU[MENU[CHAIN] == "mcdonalds"]["calories"].to_numpy()
+WENDYS_CALORIES = MENU[MENU[CHAIN] == "wendys"]["calories"].to_numpy()
+
+
+def test_resampling_is_reproducible_across_executors():
+    serial = Resampling(n_resamples=2000, seed=42, executor_type=ExecutorType.SERIAL, batch_size=300)
+    process = Resampling(n_resamples=2000, seed=42, executor_type=ExecutorType.PROCESS, max_workers=2, batch_size=300)
+
+    expect_result = serial.bootstrap_r(MENU["calories"], MENU["fat"])
+    actual_result = process.bootstrap_r(MENU["calories"], MENU["fat"])
+
+    assert (actual_result.ci_lower, actual_result.ci_upper) == (expect_result.ci_lower, expect_result.ci_upper)
+    assert actual_result.elapsed_seconds > 0
+
+
+def test_bootstrap_mean_difference():
+    resampling = Resampling(n_resamples=20000, seed=1, executor_type=ExecutorType.SERIAL)
+
+    actual_result = resampling.bootstrap_mean_difference(MCDONALDS_CALORIES, WENDYS_CALORIES)
+
+    assert actual_result.statistic == MCDONALDS_CALORIES.mean() - WENDYS_CALORIES.mean()
+    assert actual_result.ci_lower < actual_result.statistic < actual_result.ci_upper
+    assert actual_result.ci_upper < 0
+
+
+def test_permutation_test_mean_difference_matches_scipy():
+    resampling = Resampling(n_resamples=20000, seed=2, executor_type=ExecutorType.SERIAL)
+
+    expect_p_value = stats.permutation_test((MCDONALDS_CALORIES, WENDYS_CALORIES),
+                                            lambda x, y: x.mean() - y.mean(),
+                                            n_resamples=20000,
+                                            random_state=2).pvalue
+    actual_result = resampling.permutation_test_mean_difference(MCDONALDS_CALORIES, WENDYS_CALORIES)
+
+    assert abs(actual_result.p_value - expect_p_value) < 0.003
+
+
+def test_permutation_test_r():
+    x = MENU["calories"].to_numpy()[:40]
+    y = MENU["protein"].to_numpy()[:40]
+    resampling = Resampling(n_resamples=20000, seed=3, executor_type=ExecutorType.SERIAL)
+
+    expect_r, expect_p_value = stats.pearsonr(x, y)
+    actual_result = resampling.permutation_test_r(x, y, Test.TWO_TAILED)
+
+    assert np.isclose(actual_result.statistic, expect_r)
+    assert abs(actual_result.p_value - expect_p_value) < 0.01
+    assert resampling.permutation_test_r(x, y, Test.LEFT_TAILED).p_value > 0.9
@@ -0,0 +1,66 @@
+import numpy as np
+
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import NutritionTable
+from fast_food_nutrition.search import FUZZY_LIMIT, MenuSearchIndex
+
+MENU = FastFoodMenuETL().load_menu_items()
+INDEX = MenuSearchIndex.from_frame(MENU)
+
+
+def test_search_tokens_matches_scan():
+    menu_items = MENU["menu_item"].str.casefold()
+    expect_positions = np.flatnonzero((menu_items.str.contains(r"\blatte\b") & menu_items.str.contains(r"\bgrande\b"))
+                                      .to_numpy())
+
+    actual_positions = INDEX.search_tokens("Grande LATTE")
+
+    assert len(actual_positions) > 0
+    assert np.array_equal(actual_positions, expect_positions)
+
+
+def test_search_ignores_accents():
+    expect_positions = INDEX.search_tokens("Caffè Latte")
+    actual_positions = INDEX.search_tokens("caffe latte")
+
+    assert np.array_equal(actual_positions, expect_positions)
+    assert "Caffè Latte" in MENU["menu_item"].iloc[actual_positions].tolist()
+
+
+def test_search_prefix():
+    actual_menu_items = MENU["menu_item"].iloc[INDEX.search_prefix("whop chee")]
+
+    assert len(actual_menu_items) > 0
+    assert actual_menu_items.str.contains("Whopper").all()
+    assert actual_menu_items.str.contains("Cheese").all()
+    assert len(INDEX.search_tokens("whop chee")) == 0
+
+
+def test_search_fuzzy():
+    actual_positions, actual_similarities = INDEX.search_fuzzy("whoper chese", limit=3)
+
+    assert MENU["menu_item"].iloc[actual_positions[0]] == "Whopper® Sandwich with Cheese"
+    assert np.all(np.diff(actual_similarities) <= 0)
+    assert len(INDEX.search_fuzzy("zzzz")[0]) == 0
+
+
+def test_search_falls_back():
+    assert np.array_equal(INDEX.search("big mac"), INDEX.search_tokens("big mac"))
+    assert np.array_equal(INDEX.search("grande caff"), INDEX.search_prefix("grande caff"))
+    assert np.array_equal(INDEX.search("bigg mac", limit=1), INDEX.search_fuzzy("bigg mac", limit=1)[0])
+    assert len(INDEX.search("")) == 0
+    assert len(INDEX.search_tokens("grande caffe latte 2% milk")) == 0
+    assert len(INDEX.search("grande caffe latte 2% milk")) == FUZZY_LIMIT
+
+
+def test_search_index_saved_with_table(tmp_path):
+    table = NutritionTable.from_frame(MENU)
+    table.save(str(tmp_path / "menu"))
+    MenuSearchIndex.from_table(table).save(str(tmp_path / "menu"))
+
+    index = MenuSearchIndex.load(str(tmp_path / "menu"))
+    table = NutritionTable.load(str(tmp_path / "menu"))
+
+    assert isinstance(index.token_names, np.memmap)
+    assert np.array_equal(index.search("grande latte"), INDEX.search("grande latte"))
+    assert {table.get_name(position) for position in index.search_tokens("big mac")} == {"Big Mac"}
@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import numpy as np
+
+from fast_food_nutrition.algo import NutritionCalculator
+from fast_food_nutrition.analysis import ZTest
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import CHAIN, MCDONALDS, ExecutorType, FoodIntakeScore, Nutrition, Sex, Test
+from fast_food_nutrition.service import MenuService, MicroBatcher
+
+MENU = FastFoodMenuETL().load_menu_items_with_chain()
+
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() +
+                 payload)
+    await writer.drain()
+    head, _, response = (await reader.read()).partition(b"\r\n\r\n")
+    writer.close()
+
+    return int(head.split()[1]), json.loads(response)
+
+
+def run_service(requests, followup_requests=()):
+    async def run():
+        service = MenuService(MENU, executor_type=ExecutorType.THREAD, max_workers=2)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+
+        try:
+            responses = await asyncio.gather(*[request(port, *args) for args in requests])
+
+            return responses + [await request(port, *args) for args in followup_requests]
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    return asyncio.run(run())
+
+
+def test_service_scores_ranks_and_searches():
+    item = {"menu_item": "Baconator", "calories": 950, "fat": 62, "carbohydrates": 40, "fiber": 2, "protein": 59}
+    nutrition = Nutrition(item="Baconator", calories=950, fiber=2, fat=62, carb=40, protein=59)
+
+    (score_status, score), (_, lookup), (_, ranking), (_, search) = run_service([
+        ("POST", "/score", {"items": [item], "sex": Sex.FEMALE.value}),
+        ("POST", "/score", {"positions": [3]}),
+        ("POST", "/rank", {"k": 5, "chain": MCDONALDS}),
+        ("POST", "/search", {"query": "big mac"})])
+
+    composite = FoodIntakeScore.COMPOSITE.value
+    expect_scores = NutritionCalculator.score_frame(MENU, Sex.COMBINE)[composite]
+
+    assert score_status == 200
+    assert np.isclose(score[composite][0], NutritionCalculator.get_composite_nutrition_score(nutrition, Sex.FEMALE))
+    assert np.isclose(lookup[composite][0], expect_scores.iloc[3])
+    assert (MENU[CHAIN].iloc[ranking["positions"]] == MCDONALDS).all()
+    assert ranking[composite] == sorted(expect_scores[MENU[CHAIN] == MCDONALDS])[:5]
+    assert search["menu_item"] == ["Big Mac"]
+
+
+def test_service_micro_batches_hypothesis_tests():
+    requests = [("POST", "/test", {"test": "mean", "cases": {"x_bar": [i / 10], "mu": 0, "sigma": 1, "n": 30}})
+                for i in range(50)]
+    responses = run_service(requests, [("GET", "/stats")])
+    expect_results = ZTest.calculate_mean_batch(np.arange(50) / 10, 0, 1, 30, Test.TWO_TAILED)
+
+    *results, (_, stats) = responses
+
+    assert np.allclose([result["p_value"][0] for _, result in results], expect_results["p_value"])
+    assert stats["batches"]["test/mean"]["requests"] == 50
+    assert stats["batches"]["test/mean"]["batches"] < 50
+    assert stats["latency"]["/test"]["count"] == 50
+    assert stats["latency"]["/test"]["p50_ms"] <= stats["latency"]["/test"]["p99_ms"]
+
+
+def test_service_rejects_bad_requests():
+    responses = run_service([("POST", "/test", {"test": "anova"}),
+                             ("POST", "/score", {"items": [{"calories": 1}]}),
+                             ("POST", "/rank", {"k": -1}),
+                             ("POST", "/score", {"positions": [-1]}),
+                             ("POST", "/score", {"positions": [len(MENU)]}),
+                             ("POST", "/score", {"items": [1]}),
+                             ("POST", "/score", {"items": "x"}),
+                             ("GET", "/score"),
+                             ("GET", "/missing")])
+
+    assert [status for status, _ in responses] == [400, 400, 400, 400, 400, 400, 400, 405, 404]
+
+
+def test_service_reports_internal_errors():
+    async def fail(request):
+        raise RuntimeError("boom")
+
+    service = MenuService(MENU, executor_type=ExecutorType.SERIAL)
+    service.routes[("POST", "/rank")] = fail
+
+    actual_status, actual_response = asyncio.run(service.dispatch("POST", "/rank", b"{}"))
+
+    assert actual_status == 500
+    assert actual_response == {"error": "RuntimeError: boom"}
+
+
+def test_micro_batcher_isolates_batches():
+    async def run():
+        batcher = MicroBatcher(lambda payloads: [payload * len(payloads) for payload in payloads], max_delay=0.01)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(4)])
+        batcher.close()
+
+        return results
+
+    assert asyncio.run(run()) == [0, 4, 8, 12]
+
+
+def test_micro_batcher_close_fails_pending_payloads():
+    async def run():
+        batcher = MicroBatcher(lambda payloads: payloads, max_delay=10)
+        submissions = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        batcher.close()
+
+        return await asyncio.gather(*submissions, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
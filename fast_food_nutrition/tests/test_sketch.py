@@ -0,0 +1,42 @@
+import numpy as np
+
+from fast_food_nutrition.sketch import QuantileSketch
+
+
+def test_quantile_sketch_rank_error():
+    values = np.random.default_rng(7).lognormal(0, 1, 200000)
+    sorted_values = np.sort(values)
+    q = np.array([0.01, 0.25, 0.5, 0.75, 0.99])
+
+    sketch = QuantileSketch(k=200, seed=0)
+
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+
+    actual_ranks = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+
+    assert sketch.count == len(values)
+    assert sum(len(items) for items in sketch.compactors) < 1000
+    assert np.all(np.abs(actual_ranks - q) < 0.02)
+
+
+def test_quantile_sketch_merge():
+    values = np.random.default_rng(8).normal(100, 15, 100000)
+    values[::10] = np.nan
+    q = np.array([0.25, 0.75])
+
+    sketches = [QuantileSketch(seed=seed).update(chunk) for seed, chunk in enumerate(np.array_split(values, 4))]
+    actual_sketch = sketches[0]
+
+    for sketch in sketches[1:]:
+        actual_sketch.merge(sketch)
+
+    expect_quantiles = np.nanpercentile(values, q * 100)
+
+    assert actual_sketch.count == 90000
+    assert np.allclose(actual_sketch.quantile(q), expect_quantiles, atol=0.5)
+
+
+def test_quantile_sketch_empty():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    assert QuantileSketch().update([1.0, 2.0, 3.0]).quantile(0.5) == 2.0
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from fast_food_nutrition.analysis import Outliers
+from fast_food_nutrition.etl import FastFoodMenuETL
+from fast_food_nutrition.model import CHAIN, NUTRIENTS, ExecutorType, FigureType, RenderFormat, ScatterMode
+from fast_food_nutrition.viz import FastFoodNutritionVisualizer
+
+MENU = FastFoodMenuETL().load_menu_items_with_chain()
+
+
+def test_render_png_and_svg_bytes():
+    png = FastFoodNutritionVisualizer.render(FigureType.HISTOGRAM_PLOTS, MENU)
+    svg = FastFoodNutritionVisualizer.render(FigureType.BOX_PLOT, MENU[NUTRIENTS], RenderFormat.SVG, merge=True)
+
+    assert png.startswith(b"\x89PNG")
+    assert b"<svg" in svg
+
+
+def test_render_to_path(tmp_path):
+    path = str(tmp_path / "scatter_plots.png")
+
+    actual_path = FastFoodNutritionVisualizer.render(FigureType.SCATTER_PLOTS, MENU, path=path)
+
+    assert actual_path == path
+    assert os.path.getsize(path) > 0
+
+
+def test_render_by_chain(tmp_path):
+    menu = MENU[MENU[CHAIN].isin(["wendys", "burger_king"])]
+    figure_types = [FigureType.HISTOGRAM_PLOTS, FigureType.MULTI_LINEAR_REGRESSION]
+    figure_options = {FigureType.MULTI_LINEAR_REGRESSION: {"independent_vars": {"fat": "fat", "protein": "protein"},
+                                                           "target_var": "calories"}}
+
+    actual_paths = FastFoodNutritionVisualizer.render_by_chain(menu,
+                                                               figure_types,
+                                                               str(tmp_path),
+                                                               figure_options=figure_options,
+                                                               executor_type=ExecutorType.PROCESS,
+                                                               max_workers=2)
+
+    assert list(actual_paths.keys()) == [("burger_king", FigureType.HISTOGRAM_PLOTS),
+                                         ("burger_king", FigureType.MULTI_LINEAR_REGRESSION),
+                                         ("wendys", FigureType.HISTOGRAM_PLOTS),
+                                         ("wendys", FigureType.MULTI_LINEAR_REGRESSION)]
+    assert actual_paths[("wendys", FigureType.HISTOGRAM_PLOTS)] == str(tmp_path / "wendys_histogram_plots.png")
+    assert all(os.path.getsize(path) > 0 for path in actual_paths.values())
+
+
+def test_calculate_pair_counts_matches_histogram2d():
+    x = MENU["fat"].to_numpy()
+    y = MENU["calories"].to_numpy()
+    bins = 16
+
+    x_codes, x_edges = FastFoodNutritionVisualizer.calculate_bin_codes(x, bins)
+    y_codes, y_edges = FastFoodNutritionVisualizer.calculate_bin_codes(y, bins)
+    expect_counts, _, _ = np.histogram2d(y, x, bins=[y_edges, x_edges])
+
+    actual_counts = FastFoodNutritionVisualizer.calculate_pair_counts(x_codes, y_codes, bins)
+
+    assert actual_counts.shape == (bins, bins)
+    assert actual_counts.sum() == len(MENU)
+    assert np.abs(actual_counts - expect_counts).sum() <= 2
+
+
+def test_sample_menu_keeps_outliers():
+    menu = pd.concat([MENU] * 20, ignore_index=True)
+    lower_bounds, upper_bounds = Outliers.calculate_fences(menu, NUTRIENTS)
+    values = menu[NUTRIENTS].to_numpy()
+    expect_maximum = menu["calories"].max()
+
+    actual_menu = FastFoodNutritionVisualizer.sample_menu(menu, sample_size=4000, by=CHAIN, seed=0)
+    actual_values = actual_menu[NUTRIENTS].to_numpy()
+    actual_outliers = ((actual_values < lower_bounds) | (actual_values > upper_bounds)).any(axis=1)
+
+    assert abs(len(actual_menu) - 4000) <= 5
+    assert actual_outliers.sum() >= 2000
+    assert actual_menu["calories"].max() == expect_maximum
+    assert actual_menu.index.is_monotonic_increasing
+    assert np.isclose((actual_menu[~actual_outliers][CHAIN] == "starbucks").mean(),
+                      (menu[~((values < lower_bounds) | (values > upper_bounds)).any(axis=1)][CHAIN] == "starbucks").mean(),
+                      atol=0.01)
+
+
+def test_render_density_scatter_plots():
+    menu = pd.concat([MENU] * 50, ignore_index=True)
+
+    for mode in [ScatterMode.HISTOGRAM_2D, ScatterMode.HEXBIN, ScatterMode.SAMPLED]:
+        svg = FastFoodNutritionVisualizer.render(FigureType.SCATTER_PLOTS, menu, RenderFormat.SVG, mode=mode,
+                                                 sample_size=2000, by=CHAIN, seed=0)
+
+        assert b"<svg" in svg
+        assert len(svg) < 5_000_000